@@ -6,6 +6,8 @@
 
 import pandas as pd
 import numpy as np
+from functools import lru_cache
+from pathlib import Path
 from sklearn.preprocessing import StandardScaler, OneHotEncoder, FunctionTransformer
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
@@ -13,12 +15,170 @@ from sklearn.impute import SimpleImputer
 from sklearn.base import BaseEstimator, TransformerMixin
 import logging
 
+from config import ML_CONFIG
+
 logger = logging.getLogger(__name__)
 
+# Тип матрицы признаков для обучения: float32 вдвое компактнее float64, и XGBoost,
+# LightGBM и деревья sklearn работают с ним без внутренних копий
+FEATURE_DTYPE = np.float32
+
+def as_feature_matrix(values):
+    """Матрица признаков в контракте обучения: C-непрерывная float32 (uint8 бины - как есть)"""
+    values = np.asarray(values)
+    if values.dtype == np.uint8:
+        return np.ascontiguousarray(values)
+    return np.ascontiguousarray(values, dtype=FEATURE_DTYPE)
+
+# Исходы трудоустройства: известны только после выпуска и поиска работы, поэтому
+# не входят в признаки модели, которая оценивает новых студентов
+POST_OUTCOME_COLUMNS = ('salary_byn', 'job_search_duration')
+
+# Реестр производных признаков: имя -> зависимости и функция вычисления.
+# Порядок регистрации совпадает с порядком колонок при полном вычислении.
+FEATURE_REGISTRY = {}
+
+def register_feature(name, depends_on=()):
+    """Декоратор регистрации производного признака с явными зависимостями"""
+    def decorator(compute):
+        for dependency in depends_on:
+            if dependency not in FEATURE_REGISTRY:
+                raise ValueError(f"Признак {name} зависит от незарегистрированного {dependency}")
+        FEATURE_REGISTRY[name] = {'depends_on': tuple(depends_on), 'compute': compute}
+        return compute
+    return decorator
+
+@lru_cache(maxsize=64)
+def resolve_feature_order(features=None):
+    """Топологический порядок вычисления для подграфа нужных признаков
+    
+    Имена, которых нет в реестре (исходные колонки), пропускаются.
+    """
+    if features is None:
+        features = tuple(FEATURE_REGISTRY)
+    
+    needed = set()
+    stack = [f for f in features if f in FEATURE_REGISTRY]
+    while stack:
+        name = stack.pop()
+        if name not in needed:
+            needed.add(name)
+            stack.extend(FEATURE_REGISTRY[name]['depends_on'])
+    
+    # Реестр заполняется в порядке зависимостей, поэтому он уже топологически упорядочен
+    return tuple(name for name in FEATURE_REGISTRY if name in needed)
+
+# Временные признаки
+@register_feature('years_since_graduation')
+def _years_since_graduation(X, transformer):
+    current_year = 2025
+    return current_year - X['graduation_year']
+
+@register_feature('is_recent_graduate', depends_on=['years_since_graduation'])
+def _is_recent_graduate(X, transformer):
+    return (X['years_since_graduation'] <= 1).astype(int)
+
+@register_feature('skills_diversity')
+def _skills_diversity(X, transformer):
+    # Используем только существующие колонки
+    if 'internships' in X.columns and 'projects' in X.columns and 'certificates' in X.columns:
+        return (
+            (X['internships'] > 0).astype(int) * 2 +
+            (X['projects'] > 0).astype(int) * 1.5 +
+            (X['certificates'] > 0).astype(int) * 1
+        )
+    return 0
+
+@register_feature('total_experience_score', depends_on=['skills_diversity'])
+def _total_experience_score(X, transformer):
+    return (
+        X['internships'] * 0.4 + 
+        X['projects'] * 0.3 + 
+        X['certificates'] * 0.2 +
+        X['skills_diversity'] * 0.1
+    )
+
+@register_feature('academic_performance_index')
+def _academic_performance_index(X, transformer):
+    return X['gpa'] * 0.6 + (X['projects'] / 10) * 0.4
+
+# Индекс карьерной готовности
+@register_feature('career_readiness_index', depends_on=['total_experience_score', 'skills_diversity'])
+def _career_readiness_index(X, transformer):
+    index = (
+        X['gpa'] * 0.25 +
+        X['total_experience_score'] * 0.35 +
+        X['skills_diversity'] * 0.20 +
+        (X['graduation_year'] - 2010) * 0.10
+    )
+    # Срок поиска работы не учитывается: у оцениваемых студентов его еще нет
+    return index
+
+# Признаки взаимодействия
+@register_feature('gpa_experience_interaction', depends_on=['total_experience_score'])
+def _gpa_experience_interaction(X, transformer):
+    return X['gpa'] * X['total_experience_score']
+
+@register_feature('location_premium')
+def _location_premium(X, transformer):
+    if 'location' in X.columns:
+        return X['location'].map({'Минск': 1.5, 'Гродно': 1.2, 'Брест': 1.2}).fillna(1.0)
+    return 1.0
+
+# Таргет-энкодинг
+@register_feature('faculty_employment_rate')
+def _faculty_employment_rate(X, transformer):
+    if transformer.faculty_employment_rates is not None and 'faculty' in X.columns:
+        return X['faculty'].map(transformer.faculty_employment_rates).fillna(0.5)
+    return 0.5
+
+@register_feature('university_prestige_score')
+def _university_prestige_score(X, transformer):
+    if transformer.university_prestige_scores is not None and 'university' in X.columns:
+        return X['university'].map(transformer.university_prestige_scores).fillna(5.0)
+    return 5.0
+
+@register_feature('location_economic_score')
+def _location_economic_score(X, transformer):
+    if transformer.location_economic_scores is not None and 'location' in X.columns:
+        return X['location'].map(transformer.location_economic_scores).fillna(5.0)
+    return 5.0
+
+# Бинарные признаки
+@register_feature('has_high_gpa')
+def _has_high_gpa(X, transformer):
+    return (X['gpa'] >= 7.5).astype(int)
+
+@register_feature('has_multiple_internships')
+def _has_multiple_internships(X, transformer):
+    return (X['internships'] >= 1).astype(int)
+
+@register_feature('has_projects')
+def _has_projects(X, transformer):
+    return (X['projects'] >= 2).astype(int)
+
+@register_feature('has_certificates')
+def _has_certificates(X, transformer):
+    return (X['certificates'] >= 1).astype(int)
+
+# Индекс конкурентоспособности на рынке труда
+@register_feature('market_competitiveness_index', depends_on=[
+    'university_prestige_score', 'faculty_employment_rate',
+    'career_readiness_index', 'location_economic_score'
+])
+def _market_competitiveness_index(X, transformer):
+    return (
+        X['university_prestige_score'] * 0.3 +
+        X['faculty_employment_rate'] * 0.3 +
+        X['career_readiness_index'] * 0.2 +
+        X['location_economic_score'] * 0.2
+    )
+
 class FeatureEngineeringTransformer(BaseEstimator, TransformerMixin):
     """Трансформер для создания расширенных признаков"""
     
-    def __init__(self):
+    def __init__(self, required_features=None):
+        self.required_features = required_features
         self.faculty_employment_rates = None
         self.university_prestige_scores = None
         self.location_economic_scores = None
@@ -26,7 +186,7 @@ class FeatureEngineeringTransformer(BaseEstimator, TransformerMixin):
     def fit(self, X, y=None):
         # Вычисляем таргет-энкодинг для категориальных переменных
         if y is not None:
-            self.faculty_employment_rates = X.groupby('faculty')['employed'].mean()
+            faculty_stats = X.groupby('faculty')['employed'].mean()
             
             # Рассчитываем престиж университета на основе зарплат выпускников
             university_stats = X.groupby('university').agg({
@@ -35,136 +195,256 @@ class FeatureEngineeringTransformer(BaseEstimator, TransformerMixin):
                 'gpa': 'mean'
             })
             
-            if len(university_stats) > 1:
-                salary_min = university_stats['salary_byn'].min()
-                salary_max = university_stats['salary_byn'].max()
-                if salary_max > salary_min:
-                    self.university_prestige_scores = (
-                        (university_stats['salary_byn'] - salary_min) / 
-                        (salary_max - salary_min) * 10
-                    )
-                else:
-                    self.university_prestige_scores = pd.Series(5.0, index=university_stats.index)
-            else:
-                self.university_prestige_scores = pd.Series(5.0, index=university_stats.index)
-            
             # Экономический показатель региона
             location_stats = X.groupby('location').agg({
                 'salary_byn': 'mean',
                 'employed': 'mean'
             })
             
-            if len(location_stats) > 1:
-                salary_min = location_stats['salary_byn'].min()
-                salary_max = location_stats['salary_byn'].max()
-                if salary_max > salary_min:
-                    self.location_economic_scores = (
-                        (location_stats['salary_byn'] - salary_min) / 
-                        (salary_max - salary_min) * 10
-                    )
-                else:
-                    self.location_economic_scores = pd.Series(5.0, index=location_stats.index)
-            else:
-                self.location_economic_scores = pd.Series(5.0, index=location_stats.index)
+            self._set_target_encodings(faculty_stats, university_stats, location_stats)
+            # Накопленные суммы позволяют потом дообновлять энкодинги через partial_fit
+            self._stream_sums = self._group_sums(X)
             
         return self
     
-    def transform(self, X):
-        X_transformed = X.copy()
+    def partial_fit(self, X, y=None):
+        """Потоковое обучение таргет-энкодинга по частям данных
         
-        # Временные признаки
-        current_year = 2025
-        X_transformed['years_since_graduation'] = current_year - X_transformed['graduation_year']
-        X_transformed['is_recent_graduate'] = (X_transformed['years_since_graduation'] <= 1).astype(int)
+        Накапливает суммы и количества по группам, поэтому результат после
+        прохода по всем частям совпадает с fit на полном DataFrame.
+        """
+        if y is None:
+            return self
         
-        # 🔥 ИСПРАВЛЕНО: Правильное вычисление skills_diversity
-        # Используем только существующие колонки
-        if 'internships' in X_transformed.columns and 'projects' in X_transformed.columns and 'certificates' in X_transformed.columns:
-            X_transformed['skills_diversity'] = (
-                (X_transformed['internships'] > 0).astype(int) * 2 +
-                (X_transformed['projects'] > 0).astype(int) * 1.5 +
-                (X_transformed['certificates'] > 0).astype(int) * 1
-            )
-        else:
-            X_transformed['skills_diversity'] = 0
+        if not hasattr(self, '_stream_sums') or self._stream_sums is None:
+            self._stream_sums = {}
         
-        # 🔥 ИСПРАВЛЕНО: Используем skills_diversity только после его создания
-        X_transformed['total_experience_score'] = (
-            X_transformed['internships'] * 0.4 + 
-            X_transformed['projects'] * 0.3 + 
-            X_transformed['certificates'] * 0.2 +
-            X_transformed['skills_diversity'] * 0.1
-        )
+        for key, stats in self._group_sums(X).items():
+            if key in self._stream_sums:
+                self._stream_sums[key] = self._stream_sums[key].add(stats, fill_value=0)
+            else:
+                self._stream_sums[key] = stats
         
-        X_transformed['academic_performance_index'] = (
-            X_transformed['gpa'] * 0.6 + 
-            (X_transformed['projects'] / 10) * 0.4
+        means = {key: stats['sum'] / stats['count'] for key, stats in self._stream_sums.items()}
+        self._set_target_encodings(
+            means['faculty'],
+            means['university'].to_frame('salary_byn'),
+            means['location'].to_frame('salary_byn')
         )
+        return self
+    
+    @staticmethod
+    def _group_sums(X):
+        """Суммы и количества по группам для таргет-энкодинга"""
+        return {
+            'faculty': X.groupby('faculty')['employed'].agg(['sum', 'count']).astype(float),
+            'university': X.groupby('university')['salary_byn'].agg(['sum', 'count']).astype(float),
+            'location': X.groupby('location')['salary_byn'].agg(['sum', 'count']).astype(float)
+        }
+    
+    def supports_partial_fit(self):
+        """Есть ли накопленные статистики для дообновления энкодингов"""
+        return getattr(self, '_stream_sums', None) is not None
+    
+    def _set_target_encodings(self, faculty_stats, university_stats, location_stats):
+        """Нормализация групповых статистик в таргет-энкодинги"""
+        self.faculty_employment_rates = faculty_stats
+        self.university_prestige_scores = self._scale_salary_scores(university_stats)
+        self.location_economic_scores = self._scale_salary_scores(location_stats)
+    
+    @staticmethod
+    def _scale_salary_scores(group_stats):
+        """Перевод средних зарплат группы в шкалу 0-10"""
+        if len(group_stats) > 1:
+            salary_min = group_stats['salary_byn'].min()
+            salary_max = group_stats['salary_byn'].max()
+            if salary_max > salary_min:
+                return (
+                    (group_stats['salary_byn'] - salary_min) / 
+                    (salary_max - salary_min) * 10
+                )
+        return pd.Series(5.0, index=group_stats.index)
+    
+    def transform(self, X, features=None):
+        """Вычисление производных признаков
         
-        # Индекс карьерной готовности
-        X_transformed['career_readiness_index'] = (
-            X_transformed['gpa'] * 0.25 +
-            X_transformed['total_experience_score'] * 0.35 +
-            X_transformed['skills_diversity'] * 0.20 +
-            (X_transformed['graduation_year'] - 2010) * 0.10
-        )
+        features - список нужных признаков; если не задан, берется required_features,
+        а если и он не задан - вычисляются все признаки из FEATURE_REGISTRY.
+        Считается только нужный подграф зависимостей в топологическом порядке.
+        """
+        if features is None:
+            features = getattr(self, 'required_features', None)
         
-        # Добавляем проверку для job_search_duration
-        if 'job_search_duration' in X_transformed.columns:
-            X_transformed['career_readiness_index'] += (X_transformed['job_search_duration'] <= 30).astype(int) * 0.10
+        X_transformed = X.copy()
+        for name in resolve_feature_order(None if features is None else tuple(features)):
+            X_transformed[name] = FEATURE_REGISTRY[name]['compute'](X_transformed, self)
         
-        # Признаки взаимодействия
-        X_transformed['gpa_experience_interaction'] = X_transformed['gpa'] * X_transformed['total_experience_score']
+        return X_transformed
+
+class StreamingMedianSketch:
+    """Потоковая оценка медиан по столбцам через равномерную выборку фиксированного размера
+    
+    Каждому значению присваивается случайный ключ, и хранятся sample_size значений
+    с наименьшими ключами (bottom-k) - это равномерная выборка из всего потока,
+    поэтому память не зависит от числа строк.
+    """
+    
+    def __init__(self, n_columns, sample_size=200_000, random_state=42):
+        self.n_columns = n_columns
+        self.sample_size = sample_size
+        self.random_state = np.random.RandomState(random_state)
+        self.values = [np.empty(0) for _ in range(n_columns)]
+        self.keys = [np.empty(0) for _ in range(n_columns)]
+    
+    def update(self, X):
+        """Добавление части данных (массив n_rows x n_columns)"""
+        for j in range(self.n_columns):
+            column = X[:, j]
+            column = column[~np.isnan(column)]
+            if len(column) == 0:
+                continue
+            
+            values = np.concatenate([self.values[j], column])
+            keys = np.concatenate([self.keys[j], self.random_state.random_sample(len(column))])
+            if len(values) > self.sample_size:
+                keep = np.argpartition(keys, self.sample_size - 1)[:self.sample_size]
+                values, keys = values[keep], keys[keep]
+            self.values[j], self.keys[j] = values, keys
+        return self
+    
+    def medians(self):
+        """Оценка медианы каждого столбца (NaN - в столбце не было ни одного значения)"""
+        return np.array([np.median(v) if len(v) else np.nan for v in self.values])
+
+class StreamingNumericPreprocessor(BaseEstimator, TransformerMixin):
+    """Потоковый аналог пайплайна SimpleImputer(median) + StandardScaler
+    
+    Статистики набираются через partial_fit по частям данных, поэтому
+    препроцессор можно обучить на выборке, которая не помещается в память.
+    Как и SimpleImputer, столбцы без единого значения пропускаются с
+    предупреждением: в результате остаются только feature_names_out_.
+    """
+    
+    def __init__(self, feature_names=None, sample_size=200_000, random_state=42):
+        self.feature_names = feature_names
+        self.sample_size = sample_size
+        self.random_state = random_state
+    
+    def partial_fit(self, X, y=None):
+        """Обновление медиан и моментов по очередной части данных"""
+        values = self._to_array(X)
+        if not hasattr(self, 'scaler_'):
+            self.scaler_ = StandardScaler()
+            self.sketch_ = StreamingMedianSketch(values.shape[1], self.sample_size, self.random_state)
+            self.n_missing_ = np.zeros(values.shape[1])
         
-        # 🔥 ИСПРАВЛЕНО: Безопасное применение location_premium
-        if 'location' in X_transformed.columns:
-            X_transformed['location_premium'] = X_transformed['location'].apply(
-                lambda x: 1.5 if x == 'Минск' else 1.2 if x in ['Гродно', 'Брест'] else 1.0
-            )
-        else:
-            X_transformed['location_premium'] = 1.0
+        # StandardScaler игнорирует NaN при partial_fit, пропуски учтем при финализации
+        self.scaler_.partial_fit(values)
+        self.sketch_.update(values)
+        self.n_missing_ += np.isnan(values).sum(axis=0)
+        return self
+    
+    def finalize(self):
+        """Фиксация медиан и поправка моментов на импутированные значения"""
+        medians = self.sketch_.medians()
+        self.valid_features_ = ~np.isnan(medians)
+        names = self.feature_names if self.feature_names is not None else [f'x{j}' for j in range(len(medians))]
+        self.feature_names_out_ = [name for name, valid in zip(names, self.valid_features_) if valid]
+        if not self.valid_features_.all():
+            skipped = [name for name, valid in zip(names, self.valid_features_) if not valid]
+            logger.warning(f"⚠️ Признаки без единого значения пропущены при импутации: {', '.join(skipped)}")
         
-        # Таргет-энкодинг
-        if self.faculty_employment_rates is not None and 'faculty' in X_transformed.columns:
-            X_transformed['faculty_employment_rate'] = X_transformed['faculty'].map(self.faculty_employment_rates)
-            X_transformed['faculty_employment_rate'].fillna(0.5, inplace=True)
-        else:
-            X_transformed['faculty_employment_rate'] = 0.5
-            
-        if self.university_prestige_scores is not None and 'university' in X_transformed.columns:
-            X_transformed['university_prestige_score'] = X_transformed['university'].map(self.university_prestige_scores)
-            X_transformed['university_prestige_score'].fillna(5.0, inplace=True)
-        else:
-            X_transformed['university_prestige_score'] = 5.0
-            
-        if self.location_economic_scores is not None and 'location' in X_transformed.columns:
-            X_transformed['location_economic_score'] = X_transformed['location'].map(self.location_economic_scores)
-            X_transformed['location_economic_score'].fillna(5.0, inplace=True)
-        else:
-            X_transformed['location_economic_score'] = 5.0
+        # Моменты скейлера считаются только по оставшимся столбцам
+        valid = self.valid_features_
+        self.statistics_ = medians[valid]
+        self.n_missing_ = self.n_missing_[valid]
+        self.scaler_.mean_ = self.scaler_.mean_[valid]
+        self.scaler_.var_ = self.scaler_.var_[valid]
+        self.scaler_.n_samples_seen_ = (np.asarray(self.scaler_.n_samples_seen_)
+                                        * np.ones(len(valid), dtype=np.int64))[valid]
         
-        # Бинарные признаки
-        X_transformed['has_high_gpa'] = (X_transformed['gpa'] >= 7.5).astype(int)
-        X_transformed['has_multiple_internships'] = (X_transformed['internships'] >= 1).astype(int)
-        X_transformed['has_projects'] = (X_transformed['projects'] >= 2).astype(int)
-        X_transformed['has_certificates'] = (X_transformed['certificates'] >= 1).astype(int)
+        n_observed = np.asarray(self.scaler_.n_samples_seen_, dtype=float) * np.ones(len(self.statistics_))
+        n_total = n_observed + self.n_missing_
+        mean = np.nan_to_num(self.scaler_.mean_)
+        var = np.nan_to_num(self.scaler_.var_)
         
-        # Индекс конкурентоспособности на рынке труда
-        X_transformed['market_competitiveness_index'] = (
-            X_transformed['university_prestige_score'] * 0.3 +
-            X_transformed['faculty_employment_rate'] * 0.3 +
-            X_transformed['career_readiness_index'] * 0.2 +
-            X_transformed['location_economic_score'] * 0.2
-        )
+        # Пропуски заменяются медианой, поэтому добавляем их в первые два момента
+        new_mean = (n_observed * mean + self.n_missing_ * self.statistics_) / n_total
+        second_moment = (n_observed * (var + mean ** 2) + self.n_missing_ * self.statistics_ ** 2) / n_total
+        new_var = np.maximum(second_moment - new_mean ** 2, 0.0)
         
-        return X_transformed
+        self.scaler_.mean_ = new_mean
+        self.scaler_.var_ = new_var
+        self.scaler_.scale_ = np.where(new_var > 0, np.sqrt(new_var), 1.0)
+        self.scaler_.n_samples_seen_ = n_total.astype(np.int64)
+        return self
+    
+    def fit(self, X, y=None):
+        return self.partial_fit(X).finalize()
+    
+    def transform(self, X):
+        """DataFrame - по именам оставшихся признаков, массив - по всем исходным столбцам"""
+        valid = getattr(self, 'valid_features_', None)  # None - препроцессор сохранен до пропуска столбцов
+        if isinstance(X, pd.DataFrame) and self.feature_names is not None:
+            values = X[getattr(self, 'feature_names_out_', self.feature_names)].to_numpy(dtype=np.float64)
+        else:
+            values = self._to_array(X)
+            values = values if valid is None else values[:, valid]
+        missing = np.isnan(values)
+        if missing.any():
+            values = np.where(missing, self.statistics_, values)
+        return (values - self.scaler_.mean_) / self.scaler_.scale_
+    
+    def _to_array(self, X):
+        if isinstance(X, pd.DataFrame):
+            columns = self.feature_names if self.feature_names is not None else list(X.columns)
+            return X[columns].to_numpy(dtype=np.float64)
+        return np.asarray(X, dtype=np.float64)
+
+class QuantileBinner(BaseEstimator, TransformerMixin):
+    """Квантование признаков в uint8 бины по квантилям
+    
+    Выборка квантуется один раз, и все фолды и пробы поиска получают подмножества
+    готовой uint8 матрицы: копии в 8 раз меньше float64, а гистограммы бустингов
+    строятся по уже не более чем max_bins значениям признака. Деревья на бинах
+    строят те же разбиения по границам бинов, поэтому при прогнозе к данным
+    применяется тот же биннер.
+    """
+    
+    def __init__(self, max_bins=255, sample_size=200_000, random_state=42):
+        self.max_bins = max_bins
+        self.sample_size = sample_size
+        self.random_state = random_state
+    
+    def fit(self, X, y=None):
+        X = np.asarray(X)
+        rows = np.arange(len(X))
+        if len(X) > self.sample_size:
+            rows = np.random.RandomState(self.random_state).choice(len(X), self.sample_size, replace=False)
+        
+        # Внутренние квантили - границы бинов; одинаковые границы (дискретные признаки) схлопываются
+        quantiles = np.linspace(0, 1, min(self.max_bins, 255) + 1)[1:-1]
+        self.bin_edges_ = [np.unique(np.quantile(X[rows, j].astype(np.float64), quantiles))
+                           for j in range(X.shape[1])]
+        return self
+    
+    def transform(self, X):
+        # Без приведения всей матрицы к float64 - сравниваются отдельные столбцы
+        X = np.asarray(X)
+        binned = np.empty(X.shape, dtype=np.uint8)
+        for j, edges in enumerate(self.bin_edges_):
+            binned[:, j] = np.searchsorted(edges, X[:, j], side='right')
+        return binned
 
 class AdvancedFeatureEngineer:
     """Продвинутый инжиниринг признаков для прогнозирования трудоустройства"""
     
-    def __init__(self):
+    def __init__(self, required_features=None):
+        # required_features - подмножество признаков для урезанных моделей и экспериментов с отбором
+        self.required_features = required_features
         self.preprocessor = None
-        self.feature_transformer = FeatureEngineeringTransformer()
+        self.binner = None
+        self.feature_transformer = FeatureEngineeringTransformer(required_features)
         self.numeric_features = []
         self.categorical_features = []
         
@@ -176,24 +456,7 @@ class AdvancedFeatureEngineer:
         df_transformed = self.feature_transformer.fit_transform(df)
         
         # 🔥 ИСПРАВЛЕНО: Определяем признаки, которые действительно существуют
-        all_possible_features = [
-            # Базовые признаки
-            'gpa', 'internships', 'projects', 'certificates', 'graduation_year',
-            'salary_byn', 'job_search_duration',
-            
-            # Созданные признаки
-            'years_since_graduation', 'total_experience_score', 'academic_performance_index',
-            'gpa_experience_interaction', 'location_premium', 'faculty_employment_rate',
-            'university_prestige_score', 'location_economic_score', 'career_readiness_index',
-            'market_competitiveness_index', 'skills_diversity',
-            
-            # Бинарные признаки
-            'is_recent_graduate', 'has_high_gpa', 'has_multiple_internships', 
-            'has_projects', 'has_certificates'
-        ]
-        
-        # Фильтруем только те признаки, которые действительно есть в данных
-        self.numeric_features = [f for f in all_possible_features if f in df_transformed.columns]
+        self._select_numeric_features(df_transformed)
         
         # 🔥 ИСПРАВЛЕНО: Исключаем категориальные признаки из обработки
         self.categorical_features = []
@@ -212,11 +475,35 @@ class AdvancedFeatureEngineer:
                 ('num', numeric_transformer, valid_features),
             ],
             remainder='drop',
-            n_jobs=-1
+            n_jobs=None  # один трансформер - процессы joblib только добавляют накладные расходы
         )
         
         return self.preprocessor
     
+    def _select_numeric_features(self, df_transformed):
+        """Выбор числовых признаков, которые действительно есть в данных"""
+        all_possible_features = [
+            # Базовые признаки
+            'gpa', 'internships', 'projects', 'certificates', 'graduation_year',
+            # salary_byn и job_search_duration (POST_OUTCOME_COLUMNS) - исходы, а не признаки
+            
+            # Созданные признаки
+            'years_since_graduation', 'total_experience_score', 'academic_performance_index',
+            'gpa_experience_interaction', 'location_premium', 'faculty_employment_rate',
+            'university_prestige_score', 'location_economic_score', 'career_readiness_index',
+            'market_competitiveness_index', 'skills_diversity',
+            
+            # Бинарные признаки
+            'is_recent_graduate', 'has_high_gpa', 'has_multiple_internships', 
+            'has_projects', 'has_certificates'
+        ]
+        
+        # Фильтруем только те признаки, которые действительно есть в данных
+        required_features = getattr(self, 'required_features', None)
+        self.numeric_features = [f for f in all_possible_features if f in df_transformed.columns
+                                 and (required_features is None or f in required_features)]
+        return self.numeric_features
+    
     def prepare_features(self, df, target_column='employed', fit=True):
         """Подготовка признаков для обучения"""
         try:
@@ -227,7 +514,8 @@ class AdvancedFeatureEngineer:
                 if self.preprocessor is None:
                     self.build_preprocessor(df_processed)
             else:
-                df_processed = self.feature_transformer.transform(df)
+                # Считаем только признаки, которые нужны обученному препроцессору
+                df_processed = self.feature_transformer.transform(df, features=self.numeric_features)
             
             # Разделяем на признаки и целевую переменную
             if target_column in df_processed.columns:
@@ -240,11 +528,16 @@ class AdvancedFeatureEngineer:
             # 🔥 ИСПРАВЛЕНО: Убедимся, что все признаки существуют
             available_features = [col for col in X.columns if col in self.numeric_features]
             
-            # Применяем препроцессор
+            # Применяем препроцессор (результат - C-непрерывная float32 матрица)
             if fit:
-                X_processed = self.preprocessor.fit_transform(X[available_features])
+                X_processed = as_feature_matrix(self.preprocessor.fit_transform(X[available_features]))
+                self.binner = self._fit_binner(X_processed)
             else:
-                X_processed = self.preprocessor.transform(X[available_features])
+                X_processed = as_feature_matrix(self.preprocessor.transform(X[available_features]))
+            
+            # Большие выборки квантуются один раз и дальше обучаются на uint8 бинах
+            if getattr(self, 'binner', None) is not None:
+                X_processed = self.binner.transform(X_processed)
             
             # Получаем имена признаков
             feature_names = self.get_feature_names()
@@ -257,6 +550,118 @@ class AdvancedFeatureEngineer:
             logger.error(traceback.format_exc())
             raise
     
+    @staticmethod
+    def _fit_binner(X_processed):
+        """Биннер для выборок от ML_CONFIG['binning']['min_rows'] строк, иначе None"""
+        settings = ML_CONFIG.get('binning', {})
+        if not settings.get('enabled', False) or len(X_processed) < settings.get('min_rows', 100_000):
+            return None
+        
+        binner = QuantileBinner(
+            max_bins=settings.get('max_bins', 255),
+            sample_size=settings.get('sample_size', 200_000)
+        ).fit(X_processed)
+        logger.info(f"🧊 Признаки квантованы в uint8: {len(X_processed)} строк")
+        return binner
+    
+    def prepare_features_chunked(self, source, output_path, target_column='employed', fit=True,
+                                 chunk_size=200_000):
+        """Подготовка признаков по частям для выборок, которые не помещаются в память
+
+        source - DataFrame или путь к CSV. Статистики таргет-энкодинга, медианы и
+        моменты скейлера набираются потоково, а результат пишется по частям в
+        memory-mapped .npy массив output_path. Файл принадлежит вызывающему коду
+        и удаляется им, когда матрица больше не нужна.
+        """
+        if output_path is None:
+            raise ValueError("Нужен путь output_path для memory-mapped матрицы признаков")
+        try:
+            if fit:
+                # Проход 1: таргет-энкодинг по группам (нужен для производных признаков)
+                n_rows = 0
+                self.feature_transformer._stream_sums = None
+                for chunk in self._iter_chunks(source, chunk_size):
+                    has_target = target_column in chunk.columns
+                    self.feature_transformer.partial_fit(chunk, chunk[target_column] if has_target else None)
+                    n_rows += len(chunk)
+
+                # Проход 2: медианы и моменты для импутации и масштабирования
+                self.preprocessor = None
+                self.binner = None
+                for chunk in self._iter_chunks(source, chunk_size):
+                    chunk_processed = self.feature_transformer.transform(chunk)
+                    if self.preprocessor is None:
+                        self._select_numeric_features(chunk_processed)
+                        self.categorical_features = []
+                        self.preprocessor = StreamingNumericPreprocessor(feature_names=self.numeric_features)
+                    self.preprocessor.partial_fit(chunk_processed)
+                self.preprocessor.finalize()
+                # Признаки без значений пропущены импутером - как в SimpleImputer
+                self.numeric_features = list(self.preprocessor.feature_names_out_)
+            else:
+                n_rows = sum(len(chunk) for chunk in self._iter_chunks(source, chunk_size, usecols=[0]))
+
+            feature_names = self.get_feature_names()
+            binner = getattr(self, 'binner', None)
+            X_out = np.lib.format.open_memmap(
+                output_path, mode='w+', dtype=np.uint8 if binner is not None else FEATURE_DTYPE,
+                shape=(n_rows, len(feature_names))
+            )
+            y_out = None
+
+            # Проход 3: трансформация частями прямо в выходной массив
+            offset = 0
+            for chunk in self._iter_chunks(source, chunk_size):
+                chunk_processed = self.feature_transformer.transform(chunk, features=self.numeric_features)
+                values = self.preprocessor.transform(chunk_processed[self.numeric_features])
+                if binner is not None:
+                    values = binner.transform(values)
+                X_out[offset:offset + len(chunk)] = values
+
+                if target_column in chunk.columns:
+                    if y_out is None:
+                        y_out = np.zeros(n_rows, dtype=np.int8)
+                    y_out[offset:offset + len(chunk)] = chunk[target_column].astype(int).to_numpy()
+                offset += len(chunk)
+
+            X_out.flush()
+            logger.info(f"✅ Признаки подготовлены частями: {n_rows} строк → {output_path}")
+
+            return X_out, y_out, feature_names
+
+        except Exception as e:
+            logger.error(f"❌ Ошибка потоковой подготовки признаков: {e}")
+            import traceback
+            logger.error(traceback.format_exc())
+            raise
+
+    @staticmethod
+    def _iter_chunks(source, chunk_size, usecols=None):
+        """Итерация по DataFrame или CSV-файлу частями по chunk_size строк"""
+        if isinstance(source, pd.DataFrame):
+            for start in range(0, len(source), chunk_size):
+                chunk = source.iloc[start:start + chunk_size]
+                yield chunk if usecols is None else chunk.iloc[:, usecols]
+        else:
+            yield from pd.read_csv(Path(source), chunksize=chunk_size, usecols=usecols)
+
+    def add_missing_columns(self, df):
+        """Пустые (NaN) исходные колонки, которых нет в данных для прогноза
+        
+        Пропущенные показатели студента заполняются медианами импьютера обученного
+        препроцессора. Исходы трудоустройства (POST_OUTCOME_COLUMNS) не заполняются:
+        модель, обученная на них до исключения из признаков, по медиане зарплаты
+        дает всем студентам одну вероятность - такую модель нужно переобучить.
+        """
+        missing = [f for f in self.numeric_features if f not in FEATURE_REGISTRY and f not in df.columns]
+        if not missing:
+            return df
+        outcomes = [column for column in missing if column in POST_OUTCOME_COLUMNS]
+        if outcomes:
+            raise ValueError(f"Модель обучена на исходах трудоустройства ({', '.join(outcomes)}), "
+                             f"которых нет у оцениваемых студентов - переобучите модель")
+        return df.assign(**{column: np.nan for column in missing})
+    
     def get_feature_names(self):
         """Получение имен признаков после преобразования"""
         if self.preprocessor is None:
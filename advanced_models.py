@@ -14,12 +14,28 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.svm import SVC
 from sklearn.metrics import (accuracy_score, precision_score, recall_score, 
                            f1_score, roc_auc_score, classification_report,
-                           confusion_matrix, precision_recall_curve, average_precision_score)
-from sklearn.calibration import CalibratedClassifierCV
-from xgboost import XGBClassifier
-from lightgbm import LGBMClassifier
-from sklearn.base import BaseEstimator, ClassifierMixin
+                           confusion_matrix, precision_recall_curve, average_precision_score,
+                           mean_absolute_error, r2_score)
+from sklearn.isotonic import IsotonicRegression
+from xgboost import XGBClassifier, XGBRegressor
+from lightgbm import LGBMClassifier, LGBMRegressor
+import lightgbm as lgb
+from sklearn.base import BaseEstimator, ClassifierMixin, RegressorMixin, clone
 import joblib
+from config import ML_CONFIG
+from hyperparameter_search import BudgetedHyperparameterSearch
+from hyperparameter_store import HyperparameterStore, data_fingerprint, drift_score
+from parallelism import get_parallelism_budget
+from training_checkpoint import TrainingCheckpoint, training_run_key
+from training_scheduler import TrainingScheduler
+from quantile_forest import QuantileRegressionForest
+from memory_usage import StageMemoryReport
+from model_bundle import LazyComponent, ModelBundle, attach_bundle, new_version_id, save_bundle
+from model_distillation import distill_predictor
+from model_compiler import compile_predictor
+from model_explanations import ModelExplainer
+import copy
+from pathlib import Path
 import logging
 from datetime import datetime
 import warnings
@@ -27,12 +43,129 @@ warnings.filterwarnings('ignore')
 
 logger = logging.getLogger(__name__)
 
+class PiecewiseLinearCalibrator(BaseEstimator):
+    """Калибровка вероятностей в виде кусочно-линейной таблицы узлов (x_ -> y_)
+    
+    isotonic - изотоническая регрессия (одна сортировка прогнозов), sigmoid -
+    шкалирование Платта, протабулированное на сетке из n_knots узлов. Прогноз -
+    линейная интерполяция по таблице, вне диапазона - крайние значения.
+    """
+    
+    def __init__(self, method='isotonic', n_knots=101):
+        self.method = method
+        self.n_knots = n_knots
+    
+    def fit(self, scores, y):
+        scores = np.asarray(scores, dtype=np.float64).ravel()
+        y = np.asarray(y)
+        
+        if self.method == 'isotonic':
+            isotonic = IsotonicRegression(out_of_bounds='clip', y_min=0.0, y_max=1.0).fit(scores, y)
+            self.x_, self.y_ = isotonic.X_thresholds_, isotonic.y_thresholds_
+        elif self.method == 'sigmoid':
+            platt = LogisticRegression(C=1e6, max_iter=1000).fit(scores.reshape(-1, 1), y)
+            self.x_ = np.linspace(scores.min(), scores.max(), self.n_knots)
+            self.y_ = platt.predict_proba(self.x_.reshape(-1, 1))[:, 1]
+        else:
+            raise ValueError(f"Неизвестный метод калибровки: {self.method}")
+        return self
+    
+    def predict(self, scores):
+        return np.interp(np.asarray(scores, dtype=np.float64), self.x_, self.y_)
+
+class EarlyStoppingBoostedClassifier(ClassifierMixin, BaseEstimator):
+    """XGBoost/LightGBM с ранней остановкой на внутренней валидационной выборке
+    
+    Число деревьев не подбирается поиском: модель растет до max_estimators, пока
+    eval_metric на отложенной части улучшается, и затем обрезается до лучшей итерации.
+    Параметры вложенной модели задаются с префиксом estimator__ (estimator__max_depth).
+    """
+    
+    def __init__(self, estimator, early_stopping_rounds=50, validation_fraction=0.1,
+                 max_estimators=2000, eval_metric='logloss', random_state=42):
+        self.estimator = estimator
+        self.early_stopping_rounds = early_stopping_rounds
+        self.validation_fraction = validation_fraction
+        self.max_estimators = max_estimators
+        self.eval_metric = eval_metric
+        self.random_state = random_state
+    
+    def fit(self, X, y):
+        model = clone(self.estimator).set_params(n_estimators=self.max_estimators)
+        return self._fit_with_early_stopping(model, X, y)
+    
+    def update(self, X, y, max_new_estimators=100):
+        """Продолжение бустинга на новых данных поверх уже построенных деревьев"""
+        model = clone(self.estimator_).set_params(n_estimators=max_new_estimators)
+        return self._fit_with_early_stopping(model, X, y, init_model=self.estimator_)
+    
+    def _fit_with_early_stopping(self, model, X, y, init_model=None):
+        X_train, X_val, y_train, y_val = train_test_split(
+            X, y, test_size=self.validation_fraction,
+            random_state=self.random_state, stratify=y
+        )
+        
+        if isinstance(model, XGBClassifier):
+            model.set_params(early_stopping_rounds=self.early_stopping_rounds, eval_metric=self.eval_metric)
+            model.fit(X_train, y_train, eval_set=[(X_val, y_val)], verbose=False,
+                      xgb_model=None if init_model is None else init_model.get_booster())
+            # Уже построенные деревья при дообучении не удаляем
+            n_initial = 0 if init_model is None else init_model.get_booster().num_boosted_rounds()
+            self.best_iteration_ = max(int(model.best_iteration) + 1, n_initial)
+            # Обрезаем лишние деревья после лучшей итерации - модель меньше и быстрее
+            model._Booster = model.get_booster()[:self.best_iteration_]
+            model.set_params(n_estimators=self.best_iteration_, early_stopping_rounds=None)
+        elif isinstance(model, LGBMClassifier):
+            model.fit(
+                X_train, y_train, eval_set=[(X_val, y_val)],
+                eval_metric='binary_' + self.eval_metric if self.eval_metric == 'logloss' else self.eval_metric,
+                callbacks=[lgb.early_stopping(self.early_stopping_rounds, verbose=False)],
+                init_model=None if init_model is None else init_model.booster_
+            )
+            n_initial = 0 if init_model is None else init_model.booster_.current_iteration()
+            self.best_iteration_ = max(int(model.best_iteration_ or model.booster_.current_iteration()), n_initial)
+            model._Booster = lgb.Booster(model_str=model.booster_.model_to_string(num_iteration=self.best_iteration_))
+            model.set_params(n_estimators=self.best_iteration_)
+        else:
+            raise ValueError(f"Ранняя остановка не поддерживается для {type(model).__name__}")
+        
+        self.estimator_ = model
+        self.classes_ = model.classes_
+        self.best_score_ = self._best_validation_score(model)
+        return self
+    
+    @staticmethod
+    def _best_validation_score(model):
+        """Значение метрики на валидации в лучшей итерации"""
+        try:
+            if isinstance(model, XGBClassifier):
+                return float(model.get_booster().attr('best_score') or np.nan)
+            scores = next(iter(model.best_score_.values()))
+            return float(next(iter(scores.values())))
+        except Exception:
+            return np.nan
+    
+    @property
+    def feature_importances_(self):
+        return self.estimator_.feature_importances_
+    
+    def predict_proba(self, X):
+        return self.estimator_.predict_proba(X)
+    
+    def predict(self, X):
+        return self.estimator_.predict(X)
+
 class AdvancedEmploymentClassifier(BaseEstimator, ClassifierMixin):
     """Продвинутый классификатор для прогнозирования трудоустройства"""
     
-    def __init__(self, model_type='xgboost', random_state=42):
+    def __init__(self, model_type='xgboost', random_state=42, search_strategy=None, early_stopping=None):
         self.model_type = model_type
         self.random_state = random_state
+        # None - из ML_CONFIG['early_stopping']['enabled']
+        self.early_stopping = early_stopping
+        # None - стратегия из ML_CONFIG['hyperparameter_tuning']['strategy']
+        self.search_strategy = search_strategy
+        self.search_summary_ = None
         self.model = None
         self.base_model = None  # 🔥 ДОБАВЛЕНО: храним базовую модель отдельно
         self.is_calibrated = False
@@ -61,7 +194,26 @@ class AdvancedEmploymentClassifier(BaseEstimator, ClassifierMixin):
                 max_iter=1000
             )
         }
-        return models.get(model_type, models['xgboost'])
+        # Потоки модели берутся из общего бюджета, а не все ядра на каждом уровне
+        model = models.get(model_type, models['xgboost'])
+        if self._uses_early_stopping(model_type):
+            settings = ML_CONFIG.get('early_stopping', {})
+            model = EarlyStoppingBoostedClassifier(
+                model,
+                early_stopping_rounds=settings.get('rounds', 50),
+                validation_fraction=settings.get('validation_fraction', 0.1),
+                max_estimators=settings.get('max_estimators', 2000),
+                eval_metric=settings.get('eval_metric', 'logloss'),
+                random_state=self.random_state
+            )
+        return get_parallelism_budget().configure_estimator(model)
+    
+    def _uses_early_stopping(self, model_type):
+        """Ранняя остановка применяется только к бустингам XGBoost/LightGBM"""
+        enabled = self.early_stopping
+        if enabled is None:
+            enabled = ML_CONFIG.get('early_stopping', {}).get('enabled', False)
+        return enabled and model_type in ('xgboost', 'lightgbm')
     
     def _get_param_distribution(self, model_type):
         """Параметры для RandomizedSearchCV"""
@@ -102,62 +254,203 @@ class AdvancedEmploymentClassifier(BaseEstimator, ClassifierMixin):
                 'subsample': [0.8, 0.9, 1.0]
             }
         }
-        return param_distributions.get(model_type, {})
+        distribution = param_distributions.get(model_type, {})
+        
+        # С ранней остановкой число деревьев определяется по валидации, а не перебором
+        if self._uses_early_stopping(model_type):
+            distribution = {f'estimator__{name}': values for name, values in distribution.items()
+                            if name != 'n_estimators'}
+        return distribution
     
-    def fit(self, X, y, optimize_hyperparams=True, cv_folds=5):
-        """Обучение модели с оптимизацией гиперпараметров"""
+    def fit(self, X, y, optimize_hyperparams=True, cv_folds=5, calibrate=True, feature_names=None):
+        """Обучение модели с оптимизацией гиперпараметров
+        
+        calibrate=False пропускает калибровку - ее выполняет ансамбль на out-of-fold прогнозах.
+        При calibrate=True часть выборки откладывается под калибратор, а модель
+        обучается на остальных строках. feature_names - ключ набора признаков
+        в хранилище результатов поиска.
+        """
         try:
             logger.info(f"🎯 Обучение модели {self.model_type}...")
             
             base_model = self._get_base_model(self.model_type)
             self.classes_ = np.unique(y)
             
+            if calibrate:
+                settings = ML_CONFIG.get('calibration', {})
+                X, X_calibration, y, y_calibration = train_test_split(
+                    X, y, test_size=settings.get('holdout_fraction', 0.1),
+                    random_state=self.random_state, stratify=y
+                )
+            
             if optimize_hyperparams and self._get_param_distribution(self.model_type):
                 # Оптимизация гиперпараметров
                 param_dist = self._get_param_distribution(self.model_type)
-                
-                search = RandomizedSearchCV(
-                    base_model,
-                    param_dist,
-                    n_iter=20,  # Уменьшено для скорости
-                    cv=StratifiedKFold(n_splits=min(cv_folds, 3), shuffle=True, random_state=self.random_state),
-                    scoring='roc_auc',
-                    random_state=self.random_state,
-                    n_jobs=-1,
-                    verbose=0
+                self.base_model = self._optimize_hyperparameters(
+                    base_model, param_dist, X, y, cv_folds, feature_names
                 )
                 
-                search.fit(X, y)
-                self.base_model = search.best_estimator_  # 🔥 ИСПРАВЛЕНО: сохраняем базовую модель
-                logger.info(f"✅ Лучшие параметры: {search.best_params_}")
-                logger.info(f"✅ Лучший ROC-AUC: {search.best_score_:.4f}")
-                
             else:
                 # Простое обучение
                 self.base_model = base_model
                 self.base_model.fit(X, y)
             
+            if isinstance(self.base_model, EarlyStoppingBoostedClassifier):
+                logger.info(f"🛑 Ранняя остановка: {self.base_model.best_iteration_} деревьев")
+            
             # 🔥 ИСПРАВЛЕНО: Сохранение важности признаков ДО калибровки
             if hasattr(self.base_model, 'feature_importances_'):
                 self.feature_importance_ = self.base_model.feature_importances_
             elif hasattr(self.base_model, 'coef_'):
                 self.feature_importance_ = np.abs(self.base_model.coef_[0])
             
-            # Калибровка вероятностей
-            self.model = CalibratedClassifierCV(
-                self.base_model,  # 🔥 ИСПРАВЛЕНО: используем базовую модель
-                cv=min(3, cv_folds),
-                method='isotonic'
-            )
-            self.model.fit(X, y)
+            if not calibrate:
+                self.model = self.base_model
+                self.is_calibrated = False
+                logger.info(f"✅ Модель {self.model_type} успешно обучена")
+                return self
+            
+            # Калибровка вероятностей на отложенной части - без дополнительных обучений модели
+            self.model = self.base_model
+            self.calibrator_ = PiecewiseLinearCalibrator(method=settings.get('method', 'isotonic'))
+            self.calibrator_.fit(self.base_model.predict_proba(X_calibration)[:, 1], y_calibration)
             self.is_calibrated = True
             
             logger.info(f"✅ Модель {self.model_type} успешно обучена и откалибрована")
+            return self
             
         except Exception as e:
             logger.error(f"❌ Ошибка обучения модели: {e}")
             raise
     
+    def _optimize_hyperparameters(self, base_model, param_dist, X, y, cv_folds, feature_names=None):
+        """Поиск гиперпараметров с учетом прошлых поисков на похожих данных
+        
+        Если распределение данных почти не изменилось с последнего поиска
+        (дрейф ниже skip_search_drift), лучшая прошлая конфигурация обучается
+        без поиска; иначе лучшие прошлые конфигурации проверяются первыми.
+        """
+        settings = ML_CONFIG.get('hyperparameter_store', {})
+        store = HyperparameterStore() if settings.get('enabled', False) else None
+        warm_start_params = None
+        
+        if store is not None:
+            fingerprint = data_fingerprint(X, y, feature_names)
+            previous = store.latest_search(self.model_type, fingerprint['feature_set'])
+            if previous is not None and set(previous['best_params']) <= set(param_dist):
+                drift = drift_score(previous['fingerprint'], X, y)
+                if drift < settings.get('skip_search_drift', 0.02):
+                    logger.info(f"⏭️ Поиск {self.model_type} пропущен: дрейф данных {drift:.4f}, "
+                                f"параметры от {previous['timestamp']}")
+                    self.search_summary_ = {'skipped': True, 'drift': drift}
+                    return base_model.set_params(**previous['best_params']).fit(X, y)
+                logger.info(f"🔄 Дрейф данных {drift:.4f} - поиск со стартом от прошлых конфигураций")
+            warm_start_params = store.best_configurations(
+                self.model_type, fingerprint['feature_set'], settings.get('warm_start_top_k', 5)
+            )
+        
+        search = self._create_search(base_model, param_dist, cv_folds, warm_start_params)
+        search.fit(X, y)
+        
+        if isinstance(search, BudgetedHyperparameterSearch):
+            self.search_summary_ = {
+                'n_trials': len([t for t in search.trials_ if t['state'] != 'waiting']),
+                'elapsed': search.elapsed_,
+                'trials_per_second': search.trials_per_second_,
+                'timed_out': search.timed_out_
+            }
+        logger.info(f"✅ Лучшие параметры: {search.best_params_}")
+        logger.info(f"✅ Лучший ROC-AUC: {search.best_score_:.4f}")
+        
+        if store is not None:
+            store.record_search(self.model_type, fingerprint, self._search_trials(search),
+                                search.best_params_, float(search.best_score_))
+        return search.best_estimator_  # 🔥 ИСПРАВЛЕНО: сохраняем базовую модель
+    
+    @staticmethod
+    def _search_trials(search):
+        """Пробы поиска в едином формате хранилища"""
+        if isinstance(search, BudgetedHyperparameterSearch):
+            return [{key: trial[key] for key in ('params', 'rung', 'score', 'state', 'fit_time')}
+                    for trial in search.trials_ if trial['state'] != 'waiting']
+        
+        results = search.cv_results_
+        return [{'params': params, 'rung': 0, 'score': float(score), 'state': 'completed',
+                 'fit_time': float(fit_time)}
+                for params, score, fit_time in zip(results['params'], results['mean_test_score'],
+                                                   results['mean_fit_time'])]
+    
+    def update(self, X, y, n_new_estimators=100):
+        """Дообучение на новых данных без повторного поиска гиперпараметров
+        
+        Бустинги продолжают обучение с уже построенных деревьев, случайный лес
+        добавляет n_new_estimators деревьев, обученных на новых строках (warm_start).
+        """
+        if self.is_calibrated:
+            raise ValueError("Дообучение откалиброванной модели не поддерживается")
+        
+        model = self.base_model
+        if isinstance(model, EarlyStoppingBoostedClassifier):
+            model.update(X, y, n_new_estimators)
+        elif isinstance(model, XGBClassifier):
+            model = clone(model).set_params(n_estimators=n_new_estimators).fit(
+                X, y, xgb_model=self.base_model.get_booster()
+            )
+        elif isinstance(model, LGBMClassifier):
+            model = clone(model).set_params(n_estimators=n_new_estimators).fit(
+                X, y, init_model=self.base_model.booster_
+            )
+        elif isinstance(model, RandomForestClassifier):
+            model.set_params(warm_start=True, n_estimators=model.n_estimators + n_new_estimators)
+            model.fit(X, y)
+            model.set_params(warm_start=False)
+        else:
+            raise ValueError(f"Дообучение не поддерживается для {type(model).__name__}")
+        
+        self.base_model = model
+        self.model = model
+        if hasattr(model, 'feature_importances_'):
+            self.feature_importance_ = model.feature_importances_
+        logger.info(f"🔁 Модель {self.model_type} дообучена на {len(y)} новых строках")
+        return self
+    
+    def _create_search(self, base_model, param_dist, cv_folds, warm_start_params=None):
+        """Создание поиска гиперпараметров по настройкам ML_CONFIG
+        
+        warm_start_params - стартовые конфигурации (используются только бюджетным поиском).
+        """
+        tuning = ML_CONFIG.get('hyperparameter_tuning', {})
+        strategy = self.search_strategy or tuning.get('strategy', 'successive_halving')
+        
+        if strategy == 'random':
+            n_splits = min(cv_folds, 3)
+            n_iter = tuning.get('n_trials', 20)  # Уменьшено для скорости
+            n_jobs = get_parallelism_budget().configure_nested(base_model, n_iter * n_splits)
+            return RandomizedSearchCV(
+                base_model,
+                param_dist,
+                n_iter=n_iter,
+                cv=StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=self.random_state),
+                scoring='roc_auc',
+                random_state=self.random_state,
+                n_jobs=n_jobs,
+                verbose=0
+            )
+        
+        return BudgetedHyperparameterSearch(
+            base_model,
+            param_dist,
+            n_trials=tuning.get('n_trials', 20),
+            timeout=tuning.get('timeout', 3600),
+            cv=min(cv_folds, 3),
+            scoring='roc_auc',
+            direction=tuning.get('direction', 'maximize'),
+            reduction_factor=tuning.get('reduction_factor', 3),
+            min_resource_samples=tuning.get('min_resource_samples', 500),
+            random_state=self.random_state,
+            initial_params=warm_start_params
+        )
+    
     def predict(self, X):
         """Предсказание классов"""
         if self.model is None:
@@ -168,13 +461,277 @@ class AdvancedEmploymentClassifier(BaseEstimator, ClassifierMixin):
         """Предсказание вероятностей"""
         if self.model is None:
             raise ValueError("Модель не обучена")
-        return self.model.predict_proba(X)
+        if not self.is_calibrated:
+            return self.model.predict_proba(X)
+        
+        probabilities = self.calibrator_.predict(self.model.predict_proba(X)[:, 1])
+        return np.column_stack([1 - probabilities, probabilities])
     
     def predict_employment_probability(self, X):
         """Предсказание вероятности трудоустройства"""
         probabilities = self.predict_proba(X)
         return probabilities[:, 1]  # Вероятность класса 1 (трудоустроен)
 
+class AdvancedSalaryRegressor(RegressorMixin, BaseEstimator):
+    """Регрессор зарплаты на той же матрице признаков, что и классификатор трудоустройства
+    
+    Столбцы exclude_features (сама зарплата) убираются из общей матрицы, обучение идет
+    только на трудоустроенных с известной зарплатой. Число деревьев выбирается ранней
+    остановкой на фолдах классификатора (их out-of-fold прогнозы дают оценку качества),
+    затем модель обучается на всех строках. log_target - обучение на log(зарплаты).
+    quantiles - дополнительно квантильный лес на тех же строках и признаках для полосы
+    зарплат (P10/P50/P90) одним прогнозом.
+    """
+    
+    def __init__(self, model_type='lightgbm', random_state=42,
+                 exclude_features=('salary_byn', 'job_search_duration', 'career_readiness_index'), log_target=True, learning_rate=0.05, max_estimators=2000, early_stopping_rounds=50,
+                 quantiles=None, quantile_params=None):
+        self.model_type = model_type
+        self.random_state = random_state
+        self.exclude_features = exclude_features
+        self.log_target = log_target
+        self.learning_rate = learning_rate
+        self.max_estimators = max_estimators
+        self.early_stopping_rounds = early_stopping_rounds
+        self.quantiles = quantiles
+        self.quantile_params = quantile_params
+    
+    def _get_base_model(self, n_estimators):
+        if self.model_type == 'xgboost':
+            model = XGBRegressor(n_estimators=n_estimators, learning_rate=self.learning_rate,
+                                 max_depth=6, subsample=0.9, colsample_bytree=0.9,
+                                 random_state=self.random_state)
+        elif self.model_type == 'lightgbm':
+            model = LGBMRegressor(n_estimators=n_estimators, learning_rate=self.learning_rate,
+                                  num_leaves=31, subsample=0.9, subsample_freq=1, colsample_bytree=0.9,
+                                  random_state=self.random_state, verbose=-1)
+        else:
+            raise ValueError(f"Неизвестный тип модели зарплаты: {self.model_type}")
+        return get_parallelism_budget().configure_estimator(model)
+    
+    def _fit_fold(self, X_train, y_train, X_val, y_val):
+        """Модель фолда с ранней остановкой на валидационной части"""
+        model = self._get_base_model(self.max_estimators)
+        if isinstance(model, XGBRegressor):
+            model.set_params(early_stopping_rounds=self.early_stopping_rounds)
+            model.fit(X_train, y_train, eval_set=[(X_val, y_val)], verbose=False)
+            return model, int(model.best_iteration) + 1
+        model.fit(X_train, y_train, eval_set=[(X_val, y_val)],
+                  callbacks=[lgb.early_stopping(self.early_stopping_rounds, verbose=False)])
+        return model, int(model.best_iteration_ or model.booster_.current_iteration())
+    
+    def fit(self, X, y, employed=None, folds=None, feature_names=None):
+        """Обучение на строках с трудоустройством (employed) и положительной зарплатой y
+        
+        folds - список (train_idx, val_idx) по всем строкам X, например фолды стекинга
+        классификатора; по умолчанию - 3 фолда KFold.
+        """
+        y = np.asarray(y, dtype=np.float64)
+        mask = np.isfinite(y) & (y > 0)
+        if employed is not None:
+            mask &= np.asarray(employed).astype(bool)
+        if mask.sum() < 20:
+            raise ValueError(f"Недостаточно строк с зарплатой для обучения: {mask.sum()}")
+        
+        self.feature_names_ = list(feature_names) if feature_names is not None else None
+        excluded = set(self.exclude_features or ())
+        self.feature_columns_ = np.array([
+            j for j in range(X.shape[1])
+            if self.feature_names_ is None or self.feature_names_[j] not in excluded
+        ])
+        X_salary = X[:, self.feature_columns_]
+        # Логарифм - только строк с положительной зарплатой (остальные в обучение не идут)
+        target = y
+        if self.log_target:
+            target = np.full_like(y, np.nan)
+            target[mask] = np.log(y[mask])
+        
+        if folds is None:
+            from sklearn.model_selection import KFold
+            folds = KFold(n_splits=3, shuffle=True, random_state=self.random_state).split(X)
+        
+        # Те же фолды, что у классификатора, только по строкам с зарплатой
+        self.oof_predictions_ = np.full(len(y), np.nan)
+        best_iterations = []
+        for train_idx, val_idx in folds:
+            train_idx, val_idx = train_idx[mask[train_idx]], val_idx[mask[val_idx]]
+            model, best_iteration = self._fit_fold(X_salary[train_idx], target[train_idx],
+                                                   X_salary[val_idx], target[val_idx])
+            best_iterations.append(best_iteration)
+            self.oof_predictions_[val_idx] = self._to_salary(model.predict(X_salary[val_idx]))
+        
+        self.n_estimators_ = max(10, int(np.median(best_iterations)))
+        self.estimator_ = self._get_base_model(self.n_estimators_).fit(X_salary[mask], target[mask])
+        
+        self.quantile_model_ = None
+        if self.quantiles:
+            self.quantile_model_ = QuantileRegressionForest(
+                quantiles=tuple(self.quantiles), random_state=self.random_state,
+                **(self.quantile_params or {})
+            ).fit(X_salary[mask], y[mask])
+        
+        scored = mask & np.isfinite(self.oof_predictions_)
+        self.cv_mae_ = mean_absolute_error(y[scored], self.oof_predictions_[scored])
+        self.cv_r2_ = r2_score(y[scored], self.oof_predictions_[scored])
+        logger.info(f"✅ Модель зарплаты: {self.n_estimators_} деревьев, "
+                    f"CV MAE {self.cv_mae_:.1f} BYN, R² {self.cv_r2_:.3f}")
+        return self
+    
+    def _to_salary(self, predictions):
+        return np.exp(predictions) if self.log_target else predictions
+    
+    @property
+    def feature_importances_(self):
+        return self.estimator_.feature_importances_
+    
+    def predict(self, X):
+        """Прогноз зарплаты (BYN) по общей матрице признаков"""
+        return self._to_salary(self.estimator_.predict(X[:, self.feature_columns_]))
+    
+    def predict_quantiles(self, X):
+        """Квантили зарплаты (BYN): массив (n, len(quantiles)) за один проход по лесу"""
+        if getattr(self, 'quantile_model_', None) is None:
+            raise ValueError("Квантильная модель зарплаты не обучена (quantiles=None)")
+        return self.quantile_model_.predict_quantiles(X[:, self.feature_columns_])
+    
+    def quantile_columns(self):
+        """Имена колонок квантилей: salary_p10, salary_p50, ..."""
+        if getattr(self, 'quantile_model_', None) is None:
+            return []
+        return [f'salary_p{round(q * 100)}' for q in self.quantiles]
+
+def _fold_probabilities(estimator, X, y, train_idx, val_idx):
+    """Вероятности класса 1 на валидационном фолде (единица работы планировщика)"""
+    fold_model = clone(estimator).fit(X[train_idx], y[train_idx])
+    return fold_model.predict_proba(X[val_idx])[:, 1]
+
+def train_group_models(X, y, groups, model_type='xgboost', min_rows=200, random_state=42,
+                       scheduler=None, **fit_params):
+    """Отдельные модели для групп выборки (например, факультетов), обучаемые параллельно
+    
+    Группы меньше min_rows строк или с одним классом пропускаются.
+    Возвращает словарь {группа: AdvancedEmploymentClassifier}.
+    """
+    y, groups = np.asarray(y), np.asarray(groups)
+    scheduler = scheduler or TrainingScheduler()
+    
+    for group in np.unique(groups):
+        rows = np.flatnonzero(groups == group)
+        if len(rows) < min_rows or len(np.unique(y[rows])) < 2:
+            logger.info(f"⚠️ Группа {group} пропущена: {len(rows)} строк")
+            continue
+        model = AdvancedEmploymentClassifier(model_type, random_state)
+        scheduler.submit(group, model.fit, X[rows], y[rows], cost=len(rows), **fit_params)
+    
+    return scheduler.run()
+
+class OutOfFoldStackingClassifier(BaseEstimator, ClassifierMixin):
+    """Стекинг на кэше out-of-fold вероятностей
+    
+    Каждая базовая модель обучается один раз на каждом фолде, ее out-of-fold
+    вероятности кэшируются, на них же (на тех же фолдах) обучаются кусочно-линейные
+    калибраторы (calibration='isotonic' или 'sigmoid', None - без калибровки) и мета-модель. Для прогноза используются базовые модели, уже
+    обученные на всех данных (например, лучшие модели поиска гиперпараметров).
+    """
+    
+    def __init__(self, estimators, final_estimator=None, cv=3, calibration='isotonic', random_state=42):
+        self.estimators = estimators
+        self.final_estimator = final_estimator
+        self.cv = cv
+        self.calibration = calibration
+        self.random_state = random_state
+    
+    def fit(self, X, y, fitted_estimators=None, checkpoint=None, scheduler=None, folds=None):
+        """Обучение стекинга
+        
+        fitted_estimators - базовые модели, уже обученные на (X, y); если не заданы,
+        каждая модель дополнительно обучается на всех данных. checkpoint -
+        TrainingCheckpoint для сохранения OOF-прогнозов каждой модели. Пары
+        (модель, фолд) выполняются параллельно через scheduler (TrainingScheduler).
+        folds - готовые фолды (общие с другими моделями), по умолчанию StratifiedKFold(cv).
+        """
+        y = np.asarray(y)
+        self.classes_ = np.unique(y)
+        if folds is None:
+            folds = StratifiedKFold(n_splits=self.cv, shuffle=True,
+                                    random_state=self.random_state).split(X, y)
+        folds = list(folds)
+        
+        # Кэш out-of-fold вероятностей: по одному обучению на модель и фолд
+        self.oof_predictions_ = np.zeros((len(y), len(self.estimators)))
+        self.oof_targets_ = y
+        scheduler = scheduler or TrainingScheduler()
+        remaining_folds = {}
+        for j, (name, estimator) in enumerate(self.estimators):
+            if checkpoint is not None and checkpoint.has(f'oof_{name}'):
+                self.oof_predictions_[:, j] = checkpoint.load(f'oof_{name}')
+                continue
+            remaining_folds[j] = len(folds)
+            for k, (train_idx, val_idx) in enumerate(folds):
+                scheduler.submit((j, k), _fold_probabilities, estimator, X, y, train_idx, val_idx)
+        
+        def collect(task, probabilities):
+            j, k = task
+            self.oof_predictions_[folds[k][1], j] = probabilities
+            remaining_folds[j] -= 1
+            if remaining_folds[j] == 0 and checkpoint is not None:
+                checkpoint.save(f'oof_{self.estimators[j][0]}', self.oof_predictions_[:, j].copy())
+        
+        scheduler.run(callback=collect)
+        
+        if fitted_estimators is not None:
+            self.estimators_ = list(fitted_estimators)
+        else:
+            self.estimators_ = [clone(estimator).fit(X, y) for _, estimator in self.estimators]
+        return self.refit_final_estimator()
+    
+    def extend_oof(self, X, y):
+        """Добавление в кэш прогнозов текущих базовых моделей для новых строк
+        
+        Вызывается до дообучения базовых моделей на этих строках, поэтому
+        прогнозы для них остаются out-of-sample.
+        """
+        self.oof_predictions_ = np.vstack([self.oof_predictions_, self._base_probabilities(X)])
+        self.oof_targets_ = np.concatenate([self.oof_targets_, np.asarray(y)])
+        return self
+    
+    def refit_final_estimator(self, fitted_estimators=None):
+        """Переобучение калибраторов и мета-модели на кэше out-of-fold прогнозов"""
+        if fitted_estimators is not None:
+            self.estimators_ = list(fitted_estimators)
+        self.named_estimators_ = dict(zip([name for name, _ in self.estimators], self.estimators_))
+        
+        # Калибровка на тех же фолдах - без дополнительных обучений моделей
+        self.calibrators_ = []
+        if self.calibration:
+            for j in range(len(self.estimators)):
+                calibrator = PiecewiseLinearCalibrator(method=self.calibration)
+                self.calibrators_.append(calibrator.fit(self.oof_predictions_[:, j], self.oof_targets_))
+        
+        meta_model = self.final_estimator or LogisticRegression(random_state=self.random_state, max_iter=1000)
+        self.final_estimator_ = clone(meta_model).fit(self._calibrate(self.oof_predictions_), self.oof_targets_)
+        return self
+    
+    def _calibrate(self, probabilities):
+        if not self.calibrators_:
+            return probabilities
+        return np.column_stack([
+            calibrator.predict(probabilities[:, j]) for j, calibrator in enumerate(self.calibrators_)
+        ])
+    
+    def _base_probabilities(self, X):
+        return np.column_stack([model.predict_proba(X)[:, 1] for model in self.estimators_])
+    
+    def transform(self, X):
+        """Откалиброванные вероятности базовых моделей (признаки мета-модели)"""
+        return self._calibrate(self._base_probabilities(X))
+    
+    def predict_proba(self, X):
+        return self.final_estimator_.predict_proba(self.transform(X))
+    
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
 class EnsembleEmploymentPredictor:
     """Ансамблевый предсказатель для повышения надежности"""
     
@@ -185,8 +742,14 @@ class EnsembleEmploymentPredictor:
         self.feature_names = []
         self.is_trained = False
         
-    def create_ensemble(self, X, y, feature_names):
-        """Создание ансамбля моделей"""
+    def create_ensemble(self, X, y, feature_names, checkpoint=None, folds=None):
+        """Создание ансамбля моделей
+        
+        checkpoint - TrainingCheckpoint: каждая базовая модель, OOF-прогнозы и
+        мета-модель сохраняются по мере готовности и при повторе берутся из него.
+        Поиски по моделям и фолды стекинга выполняются параллельно планировщиком.
+        folds - фолды стекинга, общие с регрессором зарплаты.
+        """
         self.feature_names = feature_names
         
         # Базовые модели
@@ -196,31 +759,74 @@ class EnsembleEmploymentPredictor:
             ('random_forest', AdvancedEmploymentClassifier('random_forest', self.random_state))
         ]
         
-        # Обучаем базовые модели
+        # Обучаем базовые модели (калибровку выполнит стекинг на out-of-fold прогнозах)
+        scheduler = TrainingScheduler()
+        model_costs = ML_CONFIG.get('scheduler', {}).get('model_costs', {})
         for name, model in base_models:
-            logger.info(f"🔧 Обучение {name}...")
-            model.fit(X, y, optimize_hyperparams=True, cv_folds=3)
+            if checkpoint is not None and checkpoint.has(f'base_model_{name}'):
+                self.models[name] = checkpoint.load(f'base_model_{name}')
+            else:
+                logger.info(f"🔧 Обучение {name}...")
+                scheduler.submit(name, model.fit, X, y, cost=model_costs.get(name, 1.0),
+                                 optimize_hyperparams=True, cv_folds=3, calibrate=False,
+                                 feature_names=feature_names)
+        
+        def collect(name, model):
+            # Из воркера возвращается обученная копия модели
             self.models[name] = model
+            if checkpoint is not None:
+                checkpoint.save(f'base_model_{name}', model)
+        
+        scheduler.run(callback=collect)
+        self.models = {name: self.models[name] for name, _ in base_models}
+        base_models = list(self.models.items())
         
         # 🔥 ИСПРАВЛЕНО: используем базовые модели для стекинга
         meta_model = LogisticRegression(random_state=self.random_state, max_iter=1000)
         
-        # Создание стекинга с базовыми моделями
-        self.ensemble_model = StackingClassifier(
+        # Стекинг на кэше out-of-fold прогнозов: на всех данных модели уже обучены поиском
+        self.ensemble_model = OutOfFoldStackingClassifier(
             estimators=[(name, model.base_model) for name, model in base_models],  # 🔥 ИСПРАВЛЕНО: используем base_model
             final_estimator=meta_model,
             cv=3,
-            passthrough=False,
-            n_jobs=-1
+            random_state=self.random_state
         )
         
         # Обучение ансамбля
         logger.info("🏗️ Обучение ансамблевой модели...")
-        self.ensemble_model.fit(X, y)
+        fitted_estimators = [model.base_model for _, model in base_models]
+        if checkpoint is not None and checkpoint.has('meta_model'):
+            self.ensemble_model = checkpoint.load('meta_model')
+            # Базовые модели стекинга - те же объекты, что и в self.models
+            self.ensemble_model.estimators_ = fitted_estimators
+            self.ensemble_model.named_estimators_ = dict(zip(self.models, fitted_estimators))
+        else:
+            self.ensemble_model.fit(X, y, fitted_estimators=fitted_estimators, checkpoint=checkpoint,
+                                    scheduler=scheduler, folds=folds)
+            if checkpoint is not None:
+                checkpoint.save('meta_model', self.ensemble_model)
         
         self.is_trained = True
         logger.info("✅ Ансамблевая модель успешно обучена")
     
+    def supports_update(self):
+        """Можно ли дообучить ансамбль (есть кэш out-of-fold прогнозов)"""
+        return self.is_trained and hasattr(self.ensemble_model, 'oof_targets_')
+    
+    def update(self, X, y, n_new_estimators=100):
+        """Дообучение базовых моделей на новых строках и переобучение только мета-модели"""
+        y = np.asarray(y)
+        # Прогнозы еще не дообученных моделей - честные out-of-fold прогнозы для новых строк
+        self.ensemble_model.extend_oof(X, y)
+        
+        for name, model in self.models.items():
+            model.update(X, y, n_new_estimators)
+        
+        self.ensemble_model.refit_final_estimator(
+            fitted_estimators=[self.models[name].base_model for name, _ in self.ensemble_model.estimators]
+        )
+        logger.info("✅ Мета-модель ансамбля переобучена")
+    
     def predict_proba(self, X):
         """Предсказание вероятностей ансамблем"""
         if not self.is_trained:
@@ -241,17 +847,38 @@ class EnsembleEmploymentPredictor:
 class AdvancedEmploymentPredictor:
     """Продвинутый предсказатель трудоустройства"""
     
+    # Крупные компоненты: при загрузке из пакета читаются при первом обращении
+    model = LazyComponent()
+    ensemble_predictor = LazyComponent()
+    salary_model = LazyComponent()
+    distilled_model = LazyComponent()
+    LAZY_COMPONENTS = ('model', 'ensemble_predictor', 'salary_model', 'distilled_model')
+    
     def __init__(self, use_ensemble=True, random_state=42):
         self.use_ensemble = use_ensemble
         self.random_state = random_state
         self.feature_engineer = None
         self.model = None
         self.ensemble_predictor = None
+        self.salary_model = None
+        self.distilled_model = None
         self.performance_metrics = {}
         self.is_trained = False
+        self.last_update_ = None
+        self.memory_report_ = {}
+        self.model_version = None
+        self.explainer_ = None
+        self.compiled_model_ = None
         
-    def train(self, df, target_column='employed', test_size=0.2):
-        """Обучение продвинутой модели с обработкой ошибок"""
+    def train(self, df, target_column='employed', test_size=0.2, resume=False):
+        """Обучение продвинутой модели с обработкой ошибок
+        
+        Этапы (признаки, базовые модели, OOF-прогнозы, мета-модель) сохраняются
+        в чекпоинты; resume=True продолжает прерванное обучение на тех же данных
+        с последнего завершенного этапа.
+        """
+        checkpoint = None
+        memory = StageMemoryReport()
         try:
             # Импорт здесь чтобы избежать циклических импортов
             from advanced_feature_engineer import AdvancedFeatureEngineer
@@ -278,32 +905,46 @@ class AdvancedEmploymentPredictor:
                     else:
                         df[col] = 0
             
-            # Подготовка данных
-            X_processed, y, feature_names = self.feature_engineer.prepare_features(
-                df, target_column, fit=True
-            )
+            checkpoint = self._create_checkpoint(df, target_column, test_size, resume)
             
-            if len(X_processed) < 50:
-                logger.warning("⚠️ Мало данных для продвинутого обучения")
-                return False
-            
-            # Разделение на train/test
-            from sklearn.model_selection import train_test_split
-            X_train, X_test, y_train, y_test = train_test_split(
-                X_processed, y, 
-                test_size=test_size, 
-                random_state=self.random_state, 
-                stratify=y
-            )
+            if checkpoint is not None and checkpoint.has('features'):
+                (self.feature_engineer, X_train, X_test, y_train, y_test,
+                 salary_train, salary_test, feature_names) = checkpoint.load('features')
+            else:
+                # Подготовка данных
+                X_processed, y, feature_names = self.feature_engineer.prepare_features(
+                    df, target_column, fit=True
+                )
+                
+                if len(X_processed) < 50:
+                    logger.warning("⚠️ Мало данных для продвинутого обучения")
+                    return False
+                
+                # Разделение на train/test (зарплата делится вместе с признаками - для регрессора)
+                salary = pd.to_numeric(df['salary_byn'], errors='coerce').to_numpy(dtype=np.float64)
+                X_train, X_test, y_train, y_test, salary_train, salary_test = self._split_rows(
+                    X_processed, y, salary, test_size
+                )
+                del X_processed
+                
+                if checkpoint is not None:
+                    checkpoint.save('features', (self.feature_engineer, X_train, X_test, y_train, y_test,
+                                                 salary_train, salary_test, feature_names))
+            
+            memory.mark('features')
             
             # 🔥 ЗАПИСЫВАЕМ ИНФОРМАЦИЮ О ПРИЗНАКАХ
             logger.info(f"📊 Используется {len(feature_names)} признаков для обучения")
             logger.info(f"📋 Признаки: {feature_names[:10]}...")  # Показываем первые 10
             
+            # Одни фолды на стекинг и регрессор зарплаты
+            folds = list(StratifiedKFold(n_splits=3, shuffle=True,
+                                         random_state=self.random_state).split(X_train, y_train))
+            
             if self.use_ensemble:
                 # Используем ансамбль
                 self.ensemble_predictor = EnsembleEmploymentPredictor(self.random_state)
-                self.ensemble_predictor.create_ensemble(X_train, y_train, feature_names)
+                self.ensemble_predictor.create_ensemble(X_train, y_train, feature_names, checkpoint, folds)
                 
                 # Оценка на тестовых данных
                 y_pred_proba = self.ensemble_predictor.predict_employment_probability(X_test)
@@ -311,28 +952,205 @@ class AdvancedEmploymentPredictor:
                 
             else:
                 # Используем лучшую одиночную модель
-                best_model = AdvancedEmploymentClassifier('xgboost', self.random_state)
-                best_model.fit(X_train, y_train, optimize_hyperparams=True, cv_folds=3)
+                if checkpoint is not None and checkpoint.has('base_model_xgboost'):
+                    best_model = checkpoint.load('base_model_xgboost')
+                else:
+                    best_model = AdvancedEmploymentClassifier('xgboost', self.random_state)
+                    best_model.fit(X_train, y_train, optimize_hyperparams=True, cv_folds=3,
+                                   feature_names=feature_names)
+                    if checkpoint is not None:
+                        checkpoint.save('base_model_xgboost', best_model)
                 self.model = best_model
                 
                 # Оценка на тестовых данных
                 y_pred_proba = self.model.predict_employment_probability(X_test)
                 self._evaluate_model(y_test, y_pred_proba, "XGBoost")
             
+            memory.mark('employment_models')
+            
+            self._train_salary_model(X_train, y_train, salary_train, X_test, y_test, salary_test,
+                                     feature_names, folds, checkpoint)
+            memory.mark('salary_model')
+            
             self.is_trained = True
-            logger.info("🎉 Продвинутое обучение завершено успешно")
+            self.model_version = self._new_model_version()
+            logger.info(f"🎉 Продвинутое обучение завершено успешно (версия {self.model_version})")
             
             # 🔥 СОХРАНЯЕМ ИНФОРМАЦИЮ О ПРИЗНАКАХ
             self.feature_names = feature_names
             
+            # Обучение завершено - промежуточные этапы больше не нужны
+            if checkpoint is not None and not ML_CONFIG['checkpointing'].get('keep_after_success', False):
+                checkpoint.clear()
+            
             return True
             
         except Exception as e:
             logger.error(f"❌ Ошибка продвинутого обучения: {e}")
             import traceback
             logger.error(traceback.format_exc())
+            if checkpoint is not None and checkpoint.manifest['stages']:
+                logger.info(f"💾 Готовые этапы сохранены в {checkpoint.directory}, "
+                            f"обучение можно продолжить с resume=True")
+            return False
+        finally:
+            self.memory_report_ = memory.stages
+    
+    @staticmethod
+    def _new_model_version():
+        """Версия модели: время обучения или дообновления и случайный суффикс
+        
+        Суффикс различает обучение и дообновление в одну секунду: иначе ученик,
+        дистиллированный до дообновления, выглядел бы актуальным.
+        """
+        return new_version_id()
+    
+    def _split_rows(self, X, y, salary, test_size):
+        """Стратифицированное разделение без копий частей
+        
+        Делятся только индексы; строки матрицы один раз переставляются так, что
+        train идет первым блоком, и обе части - срезы-представления одного
+        C-непрерывного массива (вместо отдельных копий train и test у train_test_split).
+        """
+        train_idx, test_idx = train_test_split(
+            np.arange(len(y)), test_size=test_size, random_state=self.random_state, stratify=y
+        )
+        n_train = len(train_idx)
+        X = X[np.concatenate([train_idx, test_idx])]
+        return (X[:n_train], X[n_train:], y.iloc[train_idx], y.iloc[test_idx],
+                salary[train_idx], salary[test_idx])
+    
+    def _train_salary_model(self, X_train, y_train, salary_train, X_test, y_test, salary_test,
+                            feature_names, folds, checkpoint=None):
+        """Регрессор зарплаты на той же матрице признаков и фолдах, что и классификатор"""
+        settings = ML_CONFIG.get('salary_model', {})
+        if not settings.get('enabled', False):
+            return
+        
+        try:
+            if checkpoint is not None and checkpoint.has('salary_model'):
+                self.salary_model = checkpoint.load('salary_model')
+            else:
+                logger.info("🎯 Обучение модели зарплаты...")
+                self.salary_model = AdvancedSalaryRegressor(
+                    model_type=settings.get('model_type', 'lightgbm'),
+                    random_state=self.random_state,
+                    exclude_features=tuple(settings.get('exclude_features', ['salary_byn', 'job_search_duration',
+                                                                         'career_readiness_index'])),
+                    log_target=settings.get('log_target', True),
+                    learning_rate=settings.get('learning_rate', 0.05),
+                    max_estimators=settings.get('max_estimators', 2000),
+                    early_stopping_rounds=settings.get('early_stopping_rounds', 50),
+                    quantiles=settings.get('quantiles'),
+                    quantile_params=settings.get('quantile_forest')
+                ).fit(X_train, salary_train, employed=y_train, folds=folds, feature_names=feature_names)
+                if checkpoint is not None:
+                    checkpoint.save('salary_model', self.salary_model)
+            
+            mask = np.asarray(y_test).astype(bool) & np.isfinite(salary_test) & (salary_test > 0)
+            if mask.any():
+                salary_pred = self.salary_model.predict(X_test[mask])
+                self.performance_metrics['Salary'] = {
+                    'mae': mean_absolute_error(salary_test[mask], salary_pred),
+                    'r2': r2_score(salary_test[mask], salary_pred)
+                }
+                if self.salary_model.quantile_columns():
+                    # Доля зарплат внутри крайних квантилей (для P10-P90 ожидается ~0.8)
+                    bands = self.salary_model.predict_quantiles(X_test[mask])
+                    inside = (salary_test[mask] >= bands[:, 0]) & (salary_test[mask] <= bands[:, -1])
+                    self.performance_metrics['Salary']['band_coverage'] = float(inside.mean())
+                logger.info(f"📊 Результаты Salary: MAE {self.performance_metrics['Salary']['mae']:.1f} BYN, "
+                            f"R² {self.performance_metrics['Salary']['r2']:.4f}")
+        except Exception as e:
+            # Без зарплаты модель трудоустройства остается рабочей
+            logger.error(f"❌ Ошибка обучения модели зарплаты: {e}")
+            self.salary_model = None
+    
+    def _create_checkpoint(self, df, target_column, test_size, resume):
+        """Чекпоинты этапов обучения (None, если отключены в ML_CONFIG['checkpointing'])"""
+        settings = ML_CONFIG.get('checkpointing', {})
+        if not settings.get('enabled', False):
+            return None
+        
+        # Ключ учитывает данные и все настройки: этапы другого запуска не переиспользуются
+        run_key = training_run_key(
+            df, target_column=target_column, test_size=test_size, random_state=self.random_state,
+            use_ensemble=self.use_ensemble, ml_config=ML_CONFIG
+        )
+        return TrainingCheckpoint(settings.get('directory'), run_key, resume=resume)
+    
+    def update(self, new_df, history_df=None, target_column='employed'):
+        """Инкрементальное дообучение на новой когорте выпускников
+        
+        Таргет-энкодинги дообновляются накопленными статистиками, бустинги продолжают
+        обучение с уже построенных деревьев, а в стекинге переобучается только
+        мета-модель. Часть новой когорты отводится под быструю проверку: если ROC-AUC
+        на ней упал больше допустимого, обновление отменяется и, если передана
+        history_df, выполняется полное переобучение на истории вместе с когортой.
+        """
+        settings = ML_CONFIG.get('incremental_update', {})
+        self.last_update_ = {'n_rows': len(new_df), 'mode': 'incremental'}
+        
+        try:
+            if not (self.is_trained and self.use_ensemble and self.ensemble_predictor is not None
+                    and self.ensemble_predictor.supports_update()
+                    and self.feature_engineer.feature_transformer.supports_partial_fit()):
+                logger.warning("⚠️ Инкрементальное обновление недоступно для этой модели")
+                return self._full_retrain(new_df, history_df, target_column)
+            
+            update_df, gate_df = train_test_split(
+                new_df,
+                test_size=settings.get('validation_fraction', 0.2),
+                random_state=self.random_state,
+                stratify=new_df[target_column]
+            )
+            
+            # Скор текущей модели на отложенной части когорты
+            previous_state = copy.deepcopy((self.feature_engineer, self.ensemble_predictor))
+            baseline_auc = roc_auc_score(gate_df[target_column], self._predict_rows(gate_df))
+            
+            # Дообучение: энкодинги, базовые модели, мета-модель
+            self.feature_engineer.feature_transformer.partial_fit(update_df, update_df[target_column])
+            X_new, y_new, _ = self.feature_engineer.prepare_features(update_df, target_column, fit=False)
+            self.ensemble_predictor.update(X_new, y_new, settings.get('new_estimators', 100))
+            
+            gate_proba = self._predict_rows(gate_df)
+            updated_auc = roc_auc_score(gate_df[target_column], gate_proba)
+            self.last_update_.update(baseline_auc=baseline_auc, updated_auc=updated_auc)
+            
+            if updated_auc < baseline_auc - settings.get('max_auc_drop', 0.01):
+                logger.warning(f"⚠️ Обновление отклонено: ROC-AUC {baseline_auc:.4f} → {updated_auc:.4f}")
+                self.feature_engineer, self.ensemble_predictor = previous_state
+                self.last_update_['mode'] = 'rejected'
+                return self._full_retrain(new_df, history_df, target_column)
+            
+            self._evaluate_model(gate_df[target_column], gate_proba, "Ensemble")
+            self.model_version = self._new_model_version()
+            logger.info(f"🔁 Модель дообучена на {len(new_df)} строках: "
+                        f"ROC-AUC {baseline_auc:.4f} → {updated_auc:.4f}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"❌ Ошибка инкрементального обновления: {e}")
+            import traceback
+            logger.error(traceback.format_exc())
             return False
     
+    def _full_retrain(self, new_df, history_df, target_column):
+        """Полное переобучение на истории вместе с новой когортой"""
+        if history_df is None:
+            logger.error("❌ Для полного переобучения нужны исторические данные")
+            return False
+        
+        logger.info("🔄 Полное переобучение модели...")
+        self.last_update_['mode'] = 'full_retrain'
+        return self.train(pd.concat([history_df, new_df], ignore_index=True), target_column)
+    
+    def _predict_rows(self, df):
+        """Вероятности трудоустройства для всех строк DataFrame"""
+        X_processed, _, _ = self.feature_engineer.prepare_features(df, fit=False)
+        return self.ensemble_predictor.predict_employment_probability(X_processed)
+    
     def _evaluate_model(self, y_true, y_pred_proba, model_name):
         """Оценка модели"""
         try:
@@ -356,8 +1174,77 @@ class AdvancedEmploymentPredictor:
         except Exception as e:
             logger.error(f"❌ Ошибка оценки модели: {e}")
     
-    def predict(self, student_data):
-        """Прогнозирование вероятности трудоустройства"""
+    def uses_distilled_model(self):
+        """Отвечает ли на интерактивные прогнозы дистиллированная модель
+        
+        Да, если ученик прошел пороги верности, обучен на текущей версии модели
+        и это разрешено в ML_CONFIG['distillation'].
+        """
+        if not ML_CONFIG.get('distillation', {}).get('use_for_interactive', True):
+            return False
+        distilled_model = self.distilled_model
+        return (distilled_model is not None and distilled_model.passed
+                and distilled_model.teacher_version == self.model_version)
+    
+    def _compiled_model_for(self, n_rows):
+        """Скомпилированная модель для пачки из n_rows строк или None
+        
+        На малых пачках (до ML_CONFIG['model_compiler']['max_rows']) плоские массивы
+        model_compiler в разы быстрее вызовов XGBoost/LightGBM/леса, на больших -
+        медленнее. Компилируется при первом обращении, один раз на версию модели.
+        """
+        settings = ML_CONFIG.get('model_compiler', {})
+        if not settings.get('use_for_small_batches', True) or n_rows > settings.get('max_rows', 256):
+            return None
+        compiled = getattr(self, 'compiled_model_', None)
+        if compiled is not None and compiled.model_version == self.model_version:
+            return compiled
+        if getattr(self, 'compile_failed_version_', None) == self.model_version:
+            return None
+        
+        try:
+            self.compiled_model_ = compile_predictor(self)
+            return self.compiled_model_
+        except Exception as e:
+            logger.warning(f"⚠️ Модель не компилируется, малые пачки оцениваются исходными моделями: {e}")
+            self.compile_failed_version_ = self.model_version
+            return None
+    
+    def _employment_probability(self, X_processed, interactive=False, use_compiled=True):
+        """Вероятности по подготовленным признакам (None - нет обученной модели)"""
+        if interactive and self.uses_distilled_model():
+            return self.distilled_model.predict_employment_probability(X_processed)
+        compiled = self._compiled_model_for(len(X_processed)) if use_compiled else None
+        if compiled is not None:
+            return compiled.predict_processed(X_processed)
+        if self.use_ensemble and self.ensemble_predictor:
+            return self.ensemble_predictor.predict_employment_probability(X_processed)
+        if self.model:
+            return self.model.predict_employment_probability(X_processed)
+        return None
+    
+    def distill(self, sample=None, n_samples=None):
+        """Дистилляция модели в быстрого ученика для интерактивных прогнозов
+        
+        Ученик сохраняется вместе с отчетом о верности; интерактивные прогнозы
+        переходят на него, только если отчет прошел пороги (см. model_distillation.py).
+        """
+        if not self.is_trained:
+            logger.error("❌ Модель не обучена")
+            return None
+        
+        try:
+            self.distilled_model = distill_predictor(self, sample, n_samples)
+            return self.distilled_model.report_
+        except Exception as e:
+            logger.error(f"❌ Ошибка дистилляции модели: {e}")
+            return None
+    
+    def predict(self, student_data, interactive=True):
+        """Прогнозирование вероятности трудоустройства
+        
+        interactive=True - через дистиллированную модель, если она прошла проверку верности.
+        """
         if not self.is_trained:
             logger.error("❌ Модель не обучена")
             return None
@@ -369,11 +1256,8 @@ class AdvancedEmploymentPredictor:
             )
             
             # Предсказание
-            if self.use_ensemble and self.ensemble_predictor:
-                probability = self.ensemble_predictor.predict_employment_probability(X_processed)
-            elif self.model:
-                probability = self.model.predict_employment_probability(X_processed)
-            else:
+            probability = self._employment_probability(X_processed, interactive)
+            if probability is None:
                 logger.error("❌ Нет обученной модели")
                 return None
             
@@ -383,6 +1267,167 @@ class AdvancedEmploymentPredictor:
             logger.error(f"❌ Ошибка прогнозирования: {e}")
             return None
     
+    def predict_batch(self, student_data, interactive=False, use_compiled=True):
+        """Вероятность трудоустройства и прогноз зарплаты за один вызов
+        
+        Признаки считаются один раз и подаются во все модели. Возвращает DataFrame
+        с колонками employment_probability, salary_prediction (NaN без модели зарплаты)
+        и квантилями зарплаты salary_p10/salary_p50/salary_p90, если они обучены.
+        interactive=True - вероятность от дистиллированной модели, если она прошла проверку.
+        Малые пачки идут через скомпилированную модель; use_compiled=False - только
+        исходные модели (эталон для model_compiler.verify_compiled).
+        """
+        if not self.is_trained:
+            logger.error("❌ Модель не обучена")
+            return None
+        
+        try:
+            X_processed, _, _ = self.feature_engineer.prepare_features(student_data, fit=False)
+            probability = self._employment_probability(X_processed, interactive, use_compiled)
+            if probability is None:
+                logger.error("❌ Нет обученной модели")
+                return None
+            
+            salary_model = getattr(self, 'salary_model', None)
+            compiled = self._compiled_model_for(len(X_processed)) if use_compiled else None
+            if compiled is not None and compiled.salary_model is not None:
+                salary = compiled.predict_salary_processed(X_processed)
+            elif salary_model is not None:
+                salary = salary_model.predict(X_processed)
+            else:
+                salary = np.full(len(probability), np.nan)
+            
+            predictions = pd.DataFrame({'employment_probability': probability, 'salary_prediction': salary},
+                                       index=getattr(student_data, 'index', None))
+            if salary_model is not None and salary_model.quantile_columns():
+                predictions[salary_model.quantile_columns()] = salary_model.predict_quantiles(X_processed)
+            return predictions
+            
+        except Exception as e:
+            logger.error(f"❌ Ошибка пакетного прогнозирования: {e}")
+            return None
+    
+    def score_cohort(self, source, output_path=None, chunk_size=None, keep_columns=None):
+        """Пакетная оценка когорты любого размера
+        
+        source - DataFrame или путь к CSV; данные читаются частями по chunk_size строк,
+        и каждая часть одним вызовом predict_batch проходит через признаки и модели.
+        К колонкам keep_columns (по умолчанию - все исходные) добавляются вероятность
+        трудоустройства, прогноз и полоса зарплаты и model_version. Если задан
+        output_path, результат дописывается в CSV по частям и возвращается путь,
+        иначе возвращается DataFrame.
+        """
+        if not self.is_trained:
+            logger.error("❌ Модель не обучена")
+            return None
+        
+        chunk_size = chunk_size or ML_CONFIG.get('batch_scoring', {}).get('chunk_size', 50_000)
+        if output_path is not None:
+            output_path = Path(output_path)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        scored_parts, n_rows = [], 0
+        for chunk in self.feature_engineer._iter_chunks(source, chunk_size):
+            predictions = self.predict_batch(self.feature_engineer.add_missing_columns(chunk))
+            if predictions is None:
+                raise RuntimeError(f"Не удалось оценить строки {n_rows}-{n_rows + len(chunk)}")
+            
+            scored = chunk[keep_columns] if keep_columns is not None else chunk
+            scored = pd.concat([scored.reset_index(drop=True), predictions.reset_index(drop=True)], axis=1)
+            scored['model_version'] = self.model_version
+            
+            if output_path is not None:
+                scored.to_csv(output_path, mode='w' if n_rows == 0 else 'a', header=n_rows == 0,
+                              index=False, encoding='utf-8')
+            else:
+                scored_parts.append(scored)
+            n_rows += len(chunk)
+        
+        logger.info(f"✅ Оценено {n_rows} строк когорты (модель {self.model_version})")
+        if output_path is not None:
+            return output_path
+        return pd.concat(scored_parts, ignore_index=True) if scored_parts else pd.DataFrame()
+    
+    def get_explainer(self):
+        """Объяснитель текущей версии модели: фоновые значения считаются один раз на версию"""
+        explainer = getattr(self, 'explainer_', None)
+        if explainer is None or explainer.model_version != self.model_version:
+            explainer = ModelExplainer(self)
+            self.explainer_ = explainer
+        return explainer
+    
+    def explain(self, student_data):
+        """Вклады признаков в вероятность трудоустройства каждого студента
+        
+        Возвращает DataFrame: contrib_<признак> для всех признаков модели, base_value
+        (вероятность "среднего" студента) и employment_probability; в каждой строке
+        base_value + сумма вкладов = employment_probability. Главные причины прогноза -
+        model_explanations.top_contributions.
+        """
+        if not self.is_trained:
+            logger.error("❌ Модель не обучена")
+            return None
+        
+        try:
+            X_processed, _, _ = self.feature_engineer.prepare_features(student_data, fit=False)
+            return self.get_explainer().explain_frame(X_processed, index=getattr(student_data, 'index', None))
+        except Exception as e:
+            logger.error(f"❌ Ошибка объяснения прогноза: {e}")
+            return None
+    
+    def explain_cohort(self, source, output_path=None, chunk_size=None, keep_columns=None):
+        """Объяснения для когорты любого размера (части по chunk_size строк, как score_cohort)
+        
+        К колонкам keep_columns (по умолчанию - все исходные) добавляются вклады признаков,
+        base_value и employment_probability. Сводка по когорте - model_explanations.summarize_contributions.
+        """
+        if not self.is_trained:
+            logger.error("❌ Модель не обучена")
+            return None
+        
+        chunk_size = chunk_size or ML_CONFIG.get('explanations', {}).get('chunk_size', 10_000)
+        if output_path is not None:
+            output_path = Path(output_path)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        explainer = self.get_explainer()
+        explained_parts, n_rows = [], 0
+        for chunk in self.feature_engineer._iter_chunks(source, chunk_size):
+            X_processed, _, _ = self.feature_engineer.prepare_features(
+                self.feature_engineer.add_missing_columns(chunk), fit=False
+            )
+            explanations = explainer.explain_frame(X_processed)
+            explained = chunk[keep_columns] if keep_columns is not None else chunk
+            explained = pd.concat([explained.reset_index(drop=True), explanations], axis=1)
+            
+            if output_path is not None:
+                explained.to_csv(output_path, mode='w' if n_rows == 0 else 'a', header=n_rows == 0,
+                                 index=False, encoding='utf-8')
+            else:
+                explained_parts.append(explained)
+            n_rows += len(chunk)
+        
+        logger.info(f"✅ Объяснено {n_rows} строк когорты (модель {self.model_version})")
+        if output_path is not None:
+            return output_path
+        return pd.concat(explained_parts, ignore_index=True) if explained_parts else pd.DataFrame()
+    
+    def predict_salary(self, student_data):
+        """Прогноз зарплаты (BYN) продвинутой моделью"""
+        predictions = self.predict_batch(student_data)
+        if predictions is None:
+            return None
+        salary = predictions['salary_prediction'].to_numpy()
+        return salary[0] if len(salary) == 1 else salary
+    
+    def predict_salary_range(self, student_data):
+        """Полоса зарплат (DataFrame salary_p10/salary_p50/salary_p90) одним вызовом"""
+        predictions = self.predict_batch(student_data)
+        if predictions is None:
+            return None
+        salary_model = getattr(self, 'salary_model', None)
+        return predictions[salary_model.quantile_columns() if salary_model is not None else []]
+    
     def get_feature_importance(self, top_n=15):
         """Получение важности признаков"""
         if not self.is_trained:
@@ -428,7 +1473,10 @@ class AdvancedEmploymentPredictor:
                 'feature_engineer': self.feature_engineer,
                 'model': self.model,
                 'ensemble_predictor': self.ensemble_predictor,
+                'salary_model': self.salary_model,
+                'distilled_model': self.distilled_model,
                 'performance_metrics': self.performance_metrics,
+                'model_version': self.model_version,
                 'is_trained': self.is_trained
             }
             joblib.dump(model_data, filepath)
@@ -443,8 +1491,51 @@ class AdvancedEmploymentPredictor:
             self.feature_engineer = model_data['feature_engineer']
             self.model = model_data['model']
             self.ensemble_predictor = model_data['ensemble_predictor']
+            self.salary_model = model_data.get('salary_model')
+            self.distilled_model = model_data.get('distilled_model')
             self.performance_metrics = model_data['performance_metrics']
+            self.model_version = model_data.get('model_version')
             self.is_trained = model_data['is_trained']
             logger.info(f"📂 Модель загружена из {filepath}")
         except Exception as e:
-            logger.error(f"❌ Ошибка загрузки модели: {e}")
\ No newline at end of file
+            logger.error(f"❌ Ошибка загрузки модели: {e}")
+    
+    def save_model_bundle(self, directory):
+        """Сохранение модели пакетом: компоненты отдельными файлами, метрики - в манифест"""
+        try:
+            components = {
+                'feature_engineer': self.feature_engineer,
+                'model': self.model,
+                'ensemble_predictor': self.ensemble_predictor,
+                'salary_model': self.salary_model,
+                'distilled_model': self.distilled_model
+            }
+            metadata = {
+                'performance_metrics': self.performance_metrics,
+                'is_trained': self.is_trained,
+                'use_ensemble': self.use_ensemble
+            }
+            return save_bundle(directory, components, self.model_version, metadata)
+        except Exception as e:
+            logger.error(f"❌ Ошибка сохранения пакета модели: {e}")
+            return None
+    
+    def load_model_bundle(self, directory, mmap_mode=None):
+        """Загрузка модели из пакета
+        
+        Сразу читаются манифест и признаки; ансамбль, модель и модель зарплаты
+        загружаются при первом обращении (массивы - отображением файла, mmap_mode
+        по умолчанию из ML_CONFIG['model_bundle']).
+        """
+        try:
+            bundle = ModelBundle(directory, mmap_mode=mmap_mode)
+            metadata = bundle.metadata
+            self.feature_engineer = bundle.load('feature_engineer')
+            attach_bundle(self, bundle, self.LAZY_COMPONENTS)
+            self.performance_metrics = metadata.get('performance_metrics', {})
+            self.use_ensemble = metadata.get('use_ensemble', self.use_ensemble)
+            self.model_version = bundle.model_version
+            self.is_trained = metadata.get('is_trained', True)
+            logger.info(f"📂 Пакет модели {bundle.model_version} открыт: {directory}")
+        except Exception as e:
+            logger.error(f"❌ Ошибка загрузки пакета модели: {e}")
\ No newline at end of file
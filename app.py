@@ -24,9 +24,12 @@ try:
     from data_loader import RealDataLoader
     from models import EmploymentPredictor, SimplePredictor
     from visualization import DataVisualizer
-    from config import BELARUS_CONFIG
+    from config import BELARUS_CONFIG, ML_CONFIG
     from data_provider import RealisticDataProvider
     from future_predictor import future_predictor  # НОВЫЙ ИМПОРТ
+    from forecasting import forecast_career, forecast_sweep
+    from prediction_cache import PredictionCache
+    from forecast_cube import ForecastCube
 except ImportError as e:
     st.error(f"Ошибка импорта: {e}")
     st.info("Пожалуйста, убедитесь, что все файлы находятся в правильных директориях")
@@ -426,6 +429,22 @@ def init_predictor():
         st.sidebar.info("Используются упрощенные модели")
         return SimplePredictor()
 
+@st.cache_resource
+def init_prediction_cache():
+    """Кэш прогнозов, общий для всех сессий процесса"""
+    return PredictionCache()
+
+@st.cache_resource
+def init_forecast_cube():
+    """Куб прогнозов страницы "Прогнозирование" (None - расчет напрямую)"""
+    if not ML_CONFIG.get('forecast_cube', {}).get('enabled', False):
+        return None
+    try:
+        return ForecastCube.load_or_build()
+    except Exception as e:
+        st.sidebar.warning(f"Куб прогнозов недоступен: {e}")
+        return None
+
 @st.cache_data(ttl=3600)
 def load_data_with_parser():
     """Загрузка данных с использованием парсера HH"""
@@ -471,6 +490,8 @@ except Exception as e:
 
 # Инициализация моделей
 predictor = init_predictor()
+prediction_cache = init_prediction_cache()
+forecast_cube = init_forecast_cube()
 
 # Стилизованная боковая панель
 with st.sidebar:
@@ -1566,6 +1587,29 @@ elif page == "ML Анализ":
                     - Убедитесь, что есть достаточно записей (минимум 100)
                     - Проверьте логи для подробной информации
                     """)
+        
+        # Дообучение на новой когорте без полного переобучения
+        new_cohort_file = st.file_uploader("CSV с новой когортой выпускников", type=['csv'])
+        if new_cohort_file is not None and st.button("Дообучить на новой когорте", use_container_width=True):
+            with st.spinner("Дообучение моделей на новой когорте..."):
+                try:
+                    if isinstance(predictor, EnhancedEmploymentPredictor) and predictor.is_trained:
+                        new_cohort_df = pd.read_csv(new_cohort_file)
+                        success = predictor.update(new_cohort_df, graduates_df)
+                        if success:
+                            predictor.save_models()
+                            last_update = predictor.advanced_predictor.last_update_ or {}
+                            if last_update.get('mode') == 'incremental':
+                                st.success(f"Модели дообучены на {len(new_cohort_df)} записях: ROC-AUC "
+                                           f"{last_update['baseline_auc']:.4f} → {last_update['updated_auc']:.4f}")
+                            else:
+                                st.info("Дообучение не прошло проверку качества, модели переобучены полностью")
+                        else:
+                            st.error("Не удалось дообучить модели")
+                    else:
+                        st.warning("Сначала обучите улучшенные модели")
+                except Exception as e:
+                    st.error(f"Ошибка дообучения моделей: {str(e)}")
     else:
         st.warning("Улучшенные ML модели недоступны")
         st.info("Установите необходимые библиотеки: xgboost, lightgbm, scikit-learn")
@@ -1574,6 +1618,7 @@ elif page == "ML Анализ":
     if st.button("Перезагрузить модели", use_container_width=True):
         with st.spinner("Перезагрузка моделей..."):
             try:
+                prediction_cache.invalidate()
                 st.cache_resource.clear()
                 st.success("Модели перезагружены!")
                 st.rerun()
@@ -1820,195 +1865,15 @@ elif page == "Прогнозирование":
     </div>
     """, unsafe_allow_html=True)
     
-    # ИСПРАВЛЕННЫЕ ФУНКЦИИ ВНУТРИ СТРАНИЦЫ
-    def calculate_future_adjustment(target_year, faculty, university):
-        """Рассчитывает корректировку для будущих прогнозов - ИСПРАВЛЕННАЯ"""
-        current_year = datetime.now().year
-        years_ahead = target_year - current_year
-        
-        if years_ahead <= 0:
-            return {'salary_multiplier': 1.0, 'employment_boost': 0.0}
-        
-        # ОБНОВЛЕНО НА ОСНОВЕ СТАТИСТИКИ rabota.by
-        industry_growth_rates = {
-            'ИТ': {
-                'salary_growth': 0.11,  # Высокий рост в IT
-                'employment_growth': 0.04,
-                'premium_bonus': 0.15   # Дополнительный бонус для престижных вузов
-            },
-            'Медицина': {
-                'salary_growth': 0.09,
-                'employment_growth': 0.03,
-                'premium_bonus': 0.10
-            },
-            'Инженерия': {
-                'salary_growth': 0.07,
-                'employment_growth': 0.025,
-                'premium_bonus': 0.08
-            },
-            'Экономика': {
-                'salary_growth': 0.06,
-                'employment_growth': 0.02,
-                'premium_bonus': 0.07
-            },
-            'Педагогика': {
-                'salary_growth': 0.14,  # Самый высокий рост из-за дефицита
-                'employment_growth': 0.06,
-                'premium_bonus': 0.12
-            },
-            'Юриспруденция': {
-                'salary_growth': 0.065,
-                'employment_growth': 0.022,
-                'premium_bonus': 0.08
-            }
-        }
-        
-        growth = industry_growth_rates.get(faculty, {
-            'salary_growth': 0.06, 
-            'employment_growth': 0.02, 
-            'premium_bonus': 0.05
-        })
-        
-        # УЧЕТ ПРЕСТИЖА УНИВЕРСИТЕТА (данные из статистики rabota.by)
-        prestigious_universities = {
-            'БГУ': 1.25,    # Высший уровень
-            'БГУИР': 1.30,  # Лучший для IT
-            'БГМУ': 1.20,   # Лучший для медицины
-            'БНТУ': 1.15,
-            'БГЭУ': 1.12,
-            'БГПУ': 1.18,   # Лучший для педагогики
-            'ГрГУ': 1.05,
-            'ВГУ': 1.03,
-            'ГГТУ': 1.02,
-            'ПГУ': 1.00
-        }
-        
-        prestige_factor = prestigious_universities.get(university, 1.0)
-        
-        if faculty == 'Педагогика':
-            # Педагогика: ускоренный рост из-за дефицита
-            salary_multiplier = (1 + growth['salary_growth']) ** years_ahead
-            salary_multiplier *= (1 + (prestige_factor - 1) * 0.8) ** years_ahead
-        elif faculty == 'ИТ' and years_ahead > 3:
-            # ИТ: быстрый рост первые 3 года, затем стабильный
-            early_growth = (1 + growth['salary_growth']) ** min(years_ahead, 3)
-            late_growth = (1 + growth['salary_growth'] * 0.8) ** max(years_ahead - 3, 0)
-            salary_multiplier = early_growth * late_growth
-            salary_multiplier *= (1 + (prestige_factor - 1) * 1.0) ** years_ahead
-        else:
-            # Стандартный рост с учетом престижа
-            salary_multiplier = (1 + growth['salary_growth']) ** years_ahead
-            salary_multiplier *= (1 + (prestige_factor - 1) * 0.6) ** years_ahead
-        
-        # Рост вероятности трудоустройства
-        employment_boost = growth['employment_growth'] * years_ahead
-        employment_boost += (prestige_factor - 1) * 0.03 * years_ahead
-        
-        return {
-            'salary_multiplier': min(salary_multiplier, 4.0),
-            'employment_boost': min(employment_boost, 0.4),
-            'prestige_factor': prestige_factor
-        }
-
-    def apply_university_correction(university, faculty, base_employment, base_salary):
-        """Применяет коррекцию прогноза на основе престижа университета - ИСПРАВЛЕННАЯ"""
-        
-        # РЕАЛЬНЫЕ ДАННЫЕ НА ОСНОВЕ СТАТИСТИКИ rabota.by
-        university_corrections = {
-            'БГУ': {
-                'employment_mult': 1.18, 
-                'salary_mult': 1.22, 
-                'prestige': 'высший',
-                'description': 'Флагманский университет Беларуси'
-            },
-            'БГУИР': {
-                'employment_mult': 1.22, 
-                'salary_mult': 1.28, 
-                'prestige': 'высший',
-                'description': 'Лидер IT-образования в стране'
-            },
-            'БГМУ': {
-                'employment_mult': 1.20, 
-                'salary_mult': 1.20, 
-                'prestige': 'высший',
-                'description': 'Ведущий медицинский университет'
-            },
-            'БНТУ': {
-                'employment_mult': 1.14, 
-                'salary_mult': 1.16, 
-                'prestige': 'высокий',
-                'description': 'Лучший технический университет'
-            },
-            'БГЭУ': {
-                'employment_mult': 1.12, 
-                'salary_mult': 1.14, 
-                'prestige': 'высокий',
-                'description': 'Ведущий экономический университет'
-            },
-            'БГПУ': {
-                'employment_mult': 1.25, 
-                'salary_mult': 1.12, 
-                'prestige': 'высокий',
-                'description': 'Лучший педагогический университет'
-            },
-            'ГрГУ': {
-                'employment_mult': 1.06, 
-                'salary_mult': 1.06, 
-                'prestige': 'средний',
-                'description': 'Крупный региональный университет'
-            },
-            'ВГУ': {
-                'employment_mult': 1.04, 
-                'salary_mult': 1.04, 
-                'prestige': 'средний',
-                'description': 'Университет с сильными традициями'
-            },
-            'ГГТУ': {
-                'employment_mult': 1.03, 
-                'salary_mult': 1.03, 
-                'prestige': 'средний',
-                'description': 'Технический университет в Гомеле'
-            },
-            'ПГУ': {
-                'employment_mult': 1.00, 
-                'salary_mult': 1.00, 
-                'prestige': 'базовый',
-                'description': 'Региональный университет'
-            }
-        }
-        
-        correction = university_corrections.get(university, {
-            'employment_mult': 1.0, 
-            'salary_mult': 1.0, 
-            'prestige': 'базовый',
-            'description': 'Университет'
-        })
-        
-        # ДОПОЛНИТЕЛЬНЫЕ КОРРЕКЦИИ ДЛЯ СПЕЦИФИЧЕСКИХ ФАКУЛЬТЕТОВ
-        special_combinations = {
-            ('БГУИР', 'ИТ'): {'employment_mult': 1.28, 'salary_mult': 1.32},
-            ('БГМУ', 'Медицина'): {'employment_mult': 1.25, 'salary_mult': 1.22},
-            ('БГПУ', 'Педагогика'): {'employment_mult': 1.30, 'salary_mult': 1.15},
-            ('БГЭУ', 'Экономика'): {'employment_mult': 1.16, 'salary_mult': 1.20},
-            ('БНТУ', 'Инженерия'): {'employment_mult': 1.18, 'salary_mult': 1.20},
-            ('БГУ', 'Юриспруденция'): {'employment_mult': 1.15, 'salary_mult': 1.18},
-        }
-        
-        special_key = (university, faculty)
-        if special_key in special_combinations:
-            special_corr = special_combinations[special_key]
-            correction['employment_mult'] = max(correction['employment_mult'], special_corr['employment_mult'])
-            correction['salary_mult'] = max(correction['salary_mult'], special_corr['salary_mult'])
-        
-        corrected_employment = min(0.97, base_employment * correction['employment_mult'])
-        corrected_salary = base_salary * correction['salary_mult']
-        
-        return corrected_employment, corrected_salary, correction['prestige'], correction['description']
-
     def generate_future_recommendations(faculty, university, graduation_year, gpa, internships, projects, certificates,
                                       programming_skills, research_experience, leadership_experience, 
-                                      technical_skills, communication_skills, employment_prob, english_level):
-        """Генерация рекомендаций с учетом будущих трендов - ИСПРАВЛЕННАЯ"""
+                                      technical_skills, communication_skills, employment_prob, english_level,
+                                      sensitivity=None):
+        """Генерация рекомендаций с учетом будущих трендов - ИСПРАВЛЕННАЯ
+        
+        sensitivity - кривые чувствительности прогноза (forecast_sweep по GPA и стажировкам):
+        из них берется ожидаемый эффект +1 стажировки и GPA 8.0.
+        """
         current_year = datetime.now().year
         years_to_graduation = graduation_year - current_year
         
@@ -2087,6 +1952,20 @@ elif page == "Прогнозирование":
         if employment_prob < 0.7:
             recommendations.append("**Интенсифицировать подготовку:** Рассмотреть карьерные консультации и программы менторства")
         
+        # Ожидаемый эффект улучшений по кривым чувствительности
+        if sensitivity is not None:
+            effects = []
+            for label, target in (("+1 стажировка", (gpa, internships + 1)), ("GPA 8.0", (8.0, internships))):
+                point = sensitivity[np.isclose(sensitivity['gpa'], target[0]) & (sensitivity['internships'] == target[1])]
+                if point.empty or (label == "GPA 8.0" and gpa >= 8.0):
+                    continue
+                point = point.iloc[0]
+                if point['employment_probability_delta'] > 0 or point['salary_prediction_delta'] > 0:
+                    effects.append(f"{label}: вероятность {point['employment_probability_delta'] * 100:+.1f} п.п., "
+                                   f"зарплата {point['salary_prediction_delta']:+.0f} BYN")
+            if effects:
+                recommendations.append("**Ожидаемый эффект по прогнозу:** " + "; ".join(effects))
+        
         if not recommendations:
             recommendations.append("**Отличные показатели!** Продолжайте развитие и активно стройте профессиональную сеть.")
         
@@ -2185,81 +2064,35 @@ elif page == "Прогнозирование":
             if graduation_year > current_year:
                 st.info(f"**Прогноз для выпускника {university} ({faculty}) в {graduation_year} году**")
             
-            # УПРОЩЕННЫЙ РАСЧЕТ БЕЗ ОШИБОЧНЫХ ПРИЗНАКОВ
-            # Базовые расчеты на основе реальной статистики
-            
-            # БАЗОВАЯ ВЕРОЯТНОСТЬ ТРУДОУСТРОЙСТВА ПО ФАКУЛЬТЕТУ
-            base_employment_rates = {
-                'ИТ': 0.88,
-                'Медицина': 0.92,
-                'Инженерия': 0.85,
-                'Экономика': 0.82,
-                'Педагогика': 0.95,  # Высокий из-за дефицита
-                'Юриспруденция': 0.80
-            }
-            
-            # БАЗОВЫЕ ЗАРПЛАТЫ ПО ФАКУЛЬТЕТУ (BYN)
-            base_salaries = {
-                'ИТ': 2500,
-                'Медицина': 2200,
-                'Инженерия': 2300,
-                'Экономика': 1900,
-                'Педагогика': 1800,
-                'Юриспруденция': 2100
+            # РАСЧЕТ НА ОСНОВЕ РЕАЛЬНОЙ СТАТИСТИКИ (повторный ввод берется из кэша,
+            # новый - из куба прогнозов, ввод вне сетки куба считается напрямую)
+            forecast_inputs = {
+                'faculty': faculty,
+                'university': university,
+                'graduation_year': graduation_year,
+                'gpa': gpa,
+                'internships': internships,
+                'projects': projects,
+                'certificates': certificates,
+                'english_level': english_level,
+                'current_year': current_year
             }
-            
-            # Начинаем с базовых значений
-            employment_prob = base_employment_rates.get(faculty, 0.8)
-            salary_pred = base_salaries.get(faculty, 2000)
-            
-            # КОРРЕКЦИИ НА ОСНОВЕ ДАННЫХ СТУДЕНТА
-            
-            # Влияние GPA
-            gpa_factor = (gpa - 6.0) * 0.03
-            employment_prob += gpa_factor
-            salary_pred += (gpa - 6.0) * 150
-            
-            # Влияние стажировок
-            internships_factor = internships * 0.04
-            employment_prob += internships_factor
-            salary_pred += internships * 200
-            
-            # Влияние проектов
-            projects_factor = projects * 0.02
-            employment_prob += projects_factor
-            salary_pred += projects * 100
-            
-            # Влияние сертификатов
-            certificates_factor = certificates * 0.015
-            employment_prob += certificates_factor
-            salary_pred += certificates * 80
-            
-            # Влияние английского
-            english_factors = {'A1': 0.0, 'A2': 0.01, 'B1': 0.03, 'B2': 0.05, 'C1': 0.07, 'C2': 0.09}
-            employment_prob += english_factors.get(english_level, 0.03)
-            salary_pred += english_factors.get(english_level, 0.03) * 300
-            
-            # ПРИМЕНЯЕМ КОРРЕКЦИЮ НА ОСНОВЕ УНИВЕРСИТЕТА
-            employment_prob, salary_pred, prestige_level, uni_description = apply_university_correction(
-                university, faculty, employment_prob, salary_pred
+            forecast = prediction_cache.get_or_compute(
+                forecast_inputs,
+                lambda: (forecast_cube.forecast if forecast_cube is not None else forecast_career)(**forecast_inputs),
+                model_version=getattr(predictor, 'model_version', None)
             )
-            
-            # КОРРЕКТИРОВКА ДЛЯ БУДУЩИХ ГОДОВ С УЧЕТОМ УНИВЕРСИТЕТА
-            if graduation_year > current_year:
-                future_adjustment = calculate_future_adjustment(graduation_year, faculty, university)
-                salary_pred = salary_pred * future_adjustment['salary_multiplier']
-                employment_prob = min(0.97, employment_prob * (1 + future_adjustment['employment_boost']))
-            
-            # ОГРАНИЧЕНИЯ ДЛЯ РЕАЛИСТИЧНОСТИ
-            employment_prob = max(0.4, min(0.97, employment_prob))
-            salary_pred = max(1000, min(10000, salary_pred))
-            
-            # ОКРУГЛЕНИЕ
-            employment_prob = round(employment_prob, 3)
-            salary_pred = round(salary_pred, 0)
+            employment_prob = forecast['employment_probability']
+            salary_pred = forecast['salary_prediction']
+            prestige_level = forecast['prestige_level']
+            uni_description = forecast['university_description']
             
             # Отображение результатов
             st.success("Прогноз выполнен на основе реальной статистики и корректировок")
+            cache_stats = prediction_cache.stats()
+            st.caption(f"Кэш прогнозов: {cache_stats['size']} записей, "
+                       f"попаданий {cache_stats['hit_rate']:.0%} ({cache_stats['hits']} из "
+                       f"{cache_stats['hits'] + cache_stats['misses']})")
             
             # ИНФОРМАЦИЯ ОБ УНИВЕРСИТЕТЕ
             st.markdown(f'<div class="subsection-header">Университет: {university}</div>', unsafe_allow_html=True)
@@ -2393,13 +2226,43 @@ elif page == "Прогнозирование":
                             </div>
                             """, unsafe_allow_html=True)
             
+            # КРИВЫЕ ЧУВСТВИТЕЛЬНОСТИ: вся сетка GPA × стажировки одним расчетом
+            sweep_internships = sorted(set(range(0, 6)) | {internships, min(internships + 1, 10)})
+            sensitivity = forecast_sweep(
+                faculty, university, graduation_year, gpa, internships, projects, certificates, english_level,
+                axes={'gpa': sorted(set(np.round(np.arange(5.0, 10.01, 0.5), 1)) | {gpa}),
+                      'internships': sweep_internships},
+                current_year=current_year
+            )
+            
+            st.markdown('<div class="subsection-header">Как GPA и стажировки меняют прогноз</div>', unsafe_allow_html=True)
+            fig, (ax_employment, ax_salary) = plt.subplots(1, 2, figsize=(12, 4.5))
+            colors = plt.cm.viridis(np.linspace(0, 0.9, len(sweep_internships)))
+            for color, (n_internships, curve) in zip(colors, sensitivity.groupby('internships')):
+                width = 2.5 if n_internships == internships else 1.2
+                ax_employment.plot(curve['gpa'], curve['employment_probability'] * 100, color=color,
+                                   linewidth=width, label=f"{n_internships} стаж.")
+                ax_salary.plot(curve['gpa'], curve['salary_prediction'], color=color, linewidth=width)
+            ax_employment.scatter([gpa], [employment_prob * 100], color='#d32f2f', zorder=5, label="Ваш прогноз")
+            ax_salary.scatter([gpa], [salary_pred], color='#d32f2f', zorder=5)
+            ax_employment.set_title("Вероятность трудоустройства, %", fontweight='bold')
+            ax_salary.set_title("Прогнозируемая зарплата, BYN", fontweight='bold')
+            for ax in (ax_employment, ax_salary):
+                ax.set_xlabel("Средний балл (GPA)")
+                ax.grid(alpha=0.3)
+            ax_employment.legend(fontsize=8, ncol=2)
+            plt.tight_layout()
+            st.pyplot(fig)
+            plt.close(fig)
+            
             # РЕКОМЕНДАЦИИ ДЛЯ ВСЕХ СПЕЦИАЛЬНОСТЕЙ
             st.markdown('<div class="subsection-header">Рекомендации для улучшения перспектив</div>', unsafe_allow_html=True)
             
             recommendations = generate_future_recommendations(
                 faculty, university, graduation_year, gpa, internships, projects, certificates,
                 programming_skills, research_experience, leadership_experience, 
-                technical_skills, communication_skills, employment_prob, english_level
+                technical_skills, communication_skills, employment_prob, english_level,
+                sensitivity
             )
             
             st.markdown('<div class="info-box">', unsafe_allow_html=True)
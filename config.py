@@ -63,9 +63,127 @@ ML_CONFIG = {
     'random_state': 42,
     'cv_folds': 5,
     'hyperparameter_tuning': {
-        'n_trials': 100,
+        'n_trials': 20,              # конфигураций на поиск - как n_iter прежнего RandomizedSearchCV
         'timeout': 3600,
-        'direction': 'maximize'
+        'direction': 'maximize',
+        'strategy': 'successive_halving',  # или 'random' - прежний RandomizedSearchCV
+        'reduction_factor': 3,
+        'min_resource_samples': 500
+    },
+    # Хранилище результатов поиска: старт от прошлых конфигураций или пропуск поиска
+    'hyperparameter_store': {
+        'enabled': True,
+        'path': MODELS_DIR / 'hyperparameter_store.jsonl',
+        'warm_start_top_k': 5,       # сколько лучших прошлых конфигураций проверить первыми
+        'skip_search_drift': 0.02    # средний PSI ниже порога - поиск не запускается
+    },
+    # Чекпоинты этапов обучения для продолжения после прерывания
+    'checkpointing': {
+        'enabled': True,
+        'directory': MODELS_DIR / 'checkpoints',
+        'keep_after_success': False
+    },
+    # Ранняя остановка XGBoost/LightGBM на внутренней валидационной выборке
+    'early_stopping': {
+        'enabled': True,
+        'rounds': 50,                # без улучшения метрики столько раундов - остановка
+        'validation_fraction': 0.1,
+        'max_estimators': 2000,      # верхняя граница числа деревьев
+        'eval_metric': 'logloss'
+    },
+    # Калибровка вероятностей одиночной модели на отложенной части выборки
+    'calibration': {
+        'method': 'isotonic',        # или 'sigmoid' (Платт)
+        'holdout_fraction': 0.1
+    },
+    # Квантование обучающей выборки в uint8 бины один раз для всех фолдов и проб поиска
+    'binning': {
+        'enabled': True,
+        'min_rows': 100000,          # меньшие выборки обучаются на исходных значениях
+        'max_bins': 255,
+        'sample_size': 200000        # строк для оценки квантилей
+    },
+    # Дообучение на новой когорте без полного переобучения
+    'incremental_update': {
+        'new_estimators': 100,       # максимум новых деревьев на модель
+        'validation_fraction': 0.2,  # доля когорты для проверки обновления
+        'max_auc_drop': 0.01         # допустимое падение ROC-AUC, иначе полное переобучение
+    },
+    # Регрессор зарплаты на общей с классификатором матрице признаков и фолдах
+    'salary_model': {
+        'enabled': True,
+        'model_type': 'lightgbm',          # или 'xgboost'
+        'log_target': True,                # обучение на log(зарплаты)
+        'exclude_features': ['salary_byn', 'job_search_duration', 'career_readiness_index'],
+        'learning_rate': 0.05,
+        'max_estimators': 2000,            # число деревьев выбирается ранней остановкой на фолдах
+        'early_stopping_rounds': 50,
+        # Полоса зарплат одним квантильным лесом (None - без квантилей)
+        'quantiles': [0.1, 0.5, 0.9],
+        'quantile_forest': {'n_estimators': 100, 'min_samples_leaf': 20, 'max_samples': 0.3}
+    },
+    # Пакетная оценка когорт (ночной скоринг)
+    'batch_scoring': {
+        'chunk_size': 50000          # строк на одну часть: признаки и модели обрабатывают часть целиком
+    },
+    # Скомпилированная модель (model_compiler.py) для малых пачек: сервис оценки, одиночные прогнозы
+    'model_compiler': {
+        'use_for_small_batches': True,
+        'max_rows': 256              # на больших пачках исходные бустинги быстрее плоских массивов
+    },
+    # Кэш прогнозов страницы "Прогнозирование" (общий для всех сессий процесса)
+    'prediction_cache': {
+        'max_size': 1024             # записей; вытесняются давно не использованные
+    },
+    # Предрасчитанный куб прогнозов страницы "Прогнозирование" (python forecast_cube.py).
+    # Выключен: поиск в кубе (~35 мкс) медленнее прямого расчета (~19 мкс), а каждый
+    # процесс держит в памяти ~37 МБ float32 (на диске .npz сжат до ~4 МБ)
+    'forecast_cube': {
+        'enabled': False,
+        'path': None,                # None - MODELS_DIR / 'forecast_cube.npz'
+        'knots': None                # узлы непрерывных осей, None - forecast_cube.DEFAULT_KNOTS
+    },
+    # Пакет модели: манифест и отдельные файлы компонентов (model_bundle.py)
+    'model_bundle': {
+        'mmap_mode': 'r',            # None - загружать массивы в память процесса
+        'keep_versions': 3           # сколько последних версий хранить на диске (>= 1, None - все)
+    },
+    # Дистилляция ансамбля в быструю модель для интерактивных прогнозов (model_distillation.py)
+    'distillation': {
+        'auto': True,                # дистиллировать после обучения и дообновления
+        'use_for_interactive': True, # отвечать на прогнозы дашборда учеником, если он прошел пороги
+        'n_samples': 100_000,        # синтетических выпускников RealisticDataProvider
+        'augment_fraction': 0.3,     # доля строк с перемешанными показателями студента
+        'p99_abs_deviation': 0.1,    # пороги верности относительно ансамбля
+        'mean_abs_deviation': 0.015,
+        'max_auc_delta': 0.005,
+        'params': None               # параметры LightGBM ученика, None - DEFAULT_STUDENT_PARAMS
+    },
+    # Объяснения прогнозов по признакам (model_explanations.py)
+    'explanations': {
+        'method': 'path',            # 'path' - атрибуция по пути; 'tree_shap' - точный TreeSHAP бустингов (медленнее)
+        'chunk_size': 10_000         # строк в пачке при объяснении когорты
+    },
+    # Локальный HTTP-сервис оценки с микропакетами
+    'scoring_server': {
+        'host': '127.0.0.1',
+        'port': 8502,
+        'max_batch_size': 64,        # запросов в одном вызове модели
+        'max_wait_ms': 5,            # сколько первый запрос пачки ждет остальных
+        'request_timeout': 10        # секунд на ответ модели
+    },
+    # Планировщик параллельного обучения (поиски по моделям, фолды стекинга, модели по группам)
+    'scheduler': {
+        'backend': 'loky',            # 'loky' - локальные процессы, 'dask' - кластер
+        'n_workers': None,            # None - по числу ядер бюджета параллелизма
+        'threads_per_worker': None,   # None - ядра, поделенные между воркерами
+        'scheduler_address': None,    # адрес dask-планировщика, например 'tcp://10.0.0.5:8786'
+        'model_costs': {'random_forest': 3.0, 'xgboost': 1.0, 'lightgbm': 1.0}
+    },
+    # Бюджет потоков: ядра делятся между внешними воркерами (поиск, CV) и потоками моделей
+    'parallelism': {
+        'n_cores': -1,          # -1 - все доступные ядра
+        'max_outer_jobs': None  # ограничение числа внешних воркеров
     }
 }
 
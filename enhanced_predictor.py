@@ -25,6 +25,10 @@ except ImportError as e:
 
 import joblib
 
+from config import ML_CONFIG
+from model_bundle import bundle_exists
+from sensitivity import sweep
+
 logger = logging.getLogger(__name__)
 
 class EnhancedEmploymentPredictor:
@@ -61,8 +65,13 @@ class EnhancedEmploymentPredictor:
         # 🔥 ДОБАВЛЕНО для совместимости с dashboard
         self.simple_predictor = SimplePredictor()
     
-    def train(self, df, target_column='employed', validate=True):
-        """Обучение улучшенной модели"""
+    @property
+    def model_version(self):
+        """Версия обученной модели (None для упрощенных моделей)"""
+        return getattr(self.advanced_predictor, 'model_version', None)
+    
+    def train(self, df, target_column='employed', validate=True, resume=False):
+        """Обучение улучшенной модели (resume=True - продолжение с последнего чекпоинта)"""
         try:
             logger.info("🚀 Запуск улучшенного обучения ML моделей...")
             
@@ -71,7 +80,7 @@ class EnhancedEmploymentPredictor:
                 return self._train_fallback(df)
             
             # Обучение продвинутого предсказателя
-            success = self.advanced_predictor.train(df, target_column)
+            success = self.advanced_predictor.train(df, target_column, resume=resume)
             
             if success and validate:
                 # Комплексная валидация
@@ -83,12 +92,43 @@ class EnhancedEmploymentPredictor:
             # Для совместимости создаем заглушки
             self.employment_model = self.advanced_predictor
             
+            if success:
+                self._distill_for_interactive()
+            
             return success
             
         except Exception as e:
             logger.error(f"❌ Ошибка улучшенного обучения: {e}")
             return self._train_fallback(df)
     
+    def update(self, new_df, history_df=None, target_column='employed'):
+        """Дообучение на новой когорте выпускников без полного переобучения
+        
+        history_df нужен только если обновление не пройдет проверку качества
+        и потребуется полное переобучение.
+        """
+        try:
+            if not ADVANCED_MODELS_AVAILABLE or self.advanced_predictor is None:
+                logger.warning("⚠️ Продвинутые модели недоступны, дообучение невозможно")
+                return False
+            
+            success = self.advanced_predictor.update(new_df, history_df, target_column)
+            if success:
+                self.is_trained = True
+                self.performance_metrics = self.advanced_predictor.performance_metrics
+                self.employment_model = self.advanced_predictor
+                self._distill_for_interactive()
+            return success
+            
+        except Exception as e:
+            logger.error(f"❌ Ошибка дообучения: {e}")
+            return False
+    
+    def _distill_for_interactive(self):
+        """Дистилляция новой версии модели для дашборда (если включена в ML_CONFIG)"""
+        if ML_CONFIG.get('distillation', {}).get('auto', False):
+            self.advanced_predictor.distill()
+    
     def _train_fallback(self, df):
         """Резервное обучение если продвинутые модели недоступны"""
         try:
@@ -147,20 +187,161 @@ class EnhancedEmploymentPredictor:
         # Fallback на простую модель
         return self._fallback_employment_prediction(student_data)
     
+    def predict_batch(self, student_data, interactive=False):
+        """Вероятность трудоустройства, зарплата и полоса зарплат для пачки студентов
+        
+        Исходы трудоустройства (зарплата, срок поиска работы) в признаки продвинутой
+        модели не входят. Без обученной продвинутой модели прогноз строится упрощенной
+        моделью (только вероятность и зарплата). interactive=True - вероятность от
+        дистиллированной модели, если она прошла проверку верности.
+        """
+        return self.predict_batch_with_source(student_data, interactive)[0]
+    
+    def predict_batch_with_source(self, student_data, interactive=False):
+        """predict_batch и источник прогноза: (прогнозы, 'advanced' или 'simple', версия модели)
+        
+        Версия - model_version продвинутой модели; для упрощенной модели - None.
+        """
+        if self.is_trained and ADVANCED_MODELS_AVAILABLE and self.advanced_predictor:
+            try:
+                engineer = self.advanced_predictor.feature_engineer
+                predictions = self.advanced_predictor.predict_batch(engineer.add_missing_columns(student_data),
+                                                                    interactive)
+                if predictions is not None:
+                    return predictions, 'advanced', self.model_version
+            except Exception as e:
+                logger.error(f"❌ Ошибка пакетного прогнозирования: {e}")
+        
+        # Fallback на векторизованную простую модель
+        return self._fallback_batch_prediction(student_data), 'simple', None
+    
+    def sensitivity_sweep(self, base_student, axes, interactive=True):
+        """Кривые чувствительности: прогноз для сетки возмущений base_student одним predict_batch
+        
+        axes - оси и их значения (см. sensitivity.build_sweep_grid), например
+        {'gpa': [6.0, 7.0, 8.0, 9.0], 'internships': range(0, 11)}. Возвращает DataFrame:
+        оси, прогнозы и их изменение относительно базового студента.
+        """
+        return sweep(lambda grid: self.predict_batch(grid, interactive), base_student, axes)
+    
+    def score_cohort(self, source, output_path=None, chunk_size=None, keep_columns=None):
+        """Пакетная оценка когорты (DataFrame или CSV любого размера) частями
+        
+        Возвращает DataFrame с вероятностью трудоустройства, зарплатой и версией
+        модели или путь к CSV-файлу, если задан output_path. Без обученной продвинутой
+        модели когорта оценивается векторизованной упрощенной моделью.
+        """
+        if not (self.is_trained and ADVANCED_MODELS_AVAILABLE and self.advanced_predictor):
+            logger.warning("⚠️ Продвинутая модель не обучена, когорта оценивается упрощенной моделью")
+            return self._fallback_score_cohort(source, output_path, chunk_size, keep_columns)
+        try:
+            return self.advanced_predictor.score_cohort(source, output_path, chunk_size, keep_columns)
+        except Exception as e:
+            logger.error(f"❌ Ошибка пакетной оценки когорты: {e}")
+            return None
+    
+    def _fallback_score_cohort(self, source, output_path=None, chunk_size=None, keep_columns=None):
+        """Оценка когорты упрощенной моделью частями (DataFrame или CSV)"""
+        try:
+            chunk_size = chunk_size or ML_CONFIG.get('batch_scoring', {}).get('chunk_size', 50_000)
+            if isinstance(source, pd.DataFrame):
+                chunks = (source.iloc[start:start + chunk_size] for start in range(0, len(source), chunk_size))
+            else:
+                chunks = pd.read_csv(Path(source), chunksize=chunk_size)
+            
+            scored_parts, n_rows = [], 0
+            for chunk in chunks:
+                scored = chunk[keep_columns] if keep_columns is not None else chunk
+                scored = pd.concat([scored, self._fallback_batch_prediction(chunk)], axis=1)
+                scored['model_version'] = None
+                if output_path is not None:
+                    scored.to_csv(output_path, mode='w' if n_rows == 0 else 'a', header=n_rows == 0,
+                                  index=False, encoding='utf-8')
+                else:
+                    scored_parts.append(scored)
+                n_rows += len(chunk)
+            
+            logger.info(f"✅ Оценено {n_rows} строк когорты упрощенной моделью")
+            if output_path is not None:
+                return Path(output_path)
+            return pd.concat(scored_parts, ignore_index=True) if scored_parts else pd.DataFrame()
+        except Exception as e:
+            logger.error(f"❌ Ошибка пакетной оценки когорты: {e}")
+            return None
+    
+    def explain(self, student_data):
+        """Вклады признаков в вероятность трудоустройства (None без продвинутой модели)"""
+        if not (self.is_trained and ADVANCED_MODELS_AVAILABLE and self.advanced_predictor):
+            logger.warning("⚠️ Объяснения доступны только для продвинутой модели")
+            return None
+        engineer = self.advanced_predictor.feature_engineer
+        return self.advanced_predictor.explain(engineer.add_missing_columns(student_data))
+    
+    def explain_cohort(self, source, output_path=None, chunk_size=None, keep_columns=None):
+        """Объяснения для когорты (DataFrame или CSV) частями"""
+        if not (self.is_trained and ADVANCED_MODELS_AVAILABLE and self.advanced_predictor):
+            logger.warning("⚠️ Объяснения доступны только для продвинутой модели")
+            return None
+        return self.advanced_predictor.explain_cohort(source, output_path, chunk_size, keep_columns)
+    
+    def predict_salary_range(self, student_data):
+        """Полоса зарплат P10/P50/P90 (DataFrame) или None, если квантильная модель недоступна"""
+        if not (self.is_trained and ADVANCED_MODELS_AVAILABLE and self.advanced_predictor):
+            return None
+        try:
+            return self.advanced_predictor.predict_salary_range(student_data)
+        except Exception as e:
+            logger.error(f"❌ Ошибка прогноза полосы зарплат: {e}")
+            return None
+    
     def _fallback_employment_prediction(self, student_data):
-        """Резервный прогноз трудоустройства"""
+        """Резервный прогноз трудоустройства (число для одного студента, массив для нескольких)"""
         try:
-            faculty = student_data['faculty'].iloc[0] if 'faculty' in student_data.columns else 'ИТ'
-            gpa = student_data['gpa'].iloc[0] if 'gpa' in student_data.columns else 7.0
-            internships = student_data['internships'].iloc[0] if 'internships' in student_data.columns else 1
+            faculty = student_data['faculty'] if 'faculty' in student_data.columns else 'ИТ'
+            gpa = student_data['gpa'] if 'gpa' in student_data.columns else 7.0
+            internships = student_data['internships'] if 'internships' in student_data.columns else 1
+            faculty, gpa, internships = np.broadcast_arrays(
+                np.asarray(faculty, dtype=object), np.asarray(gpa), np.asarray(internships)
+            )
             
-            return self.simple_predictor.predict_employment_simple(
+            probability = self.simple_predictor.predict_employment_batch(
                 faculty, gpa, internships, 0, 0, 90, 'B1', 2025
             )
+            return probability[0] if len(probability) == 1 else probability
         except Exception as e:
             logger.error(f"❌ Ошибка резервного прогноза: {e}")
             return 0.5
     
+    def _fallback_batch_prediction(self, student_data):
+        """Резервный пакетный прогноз упрощенной моделью: вероятность и зарплата по всем строкам"""
+        n_rows = len(student_data)
+        
+        def column(name, default):
+            if name in student_data.columns:
+                values = student_data[name]
+                if isinstance(values.dtype, pd.CategoricalDtype):
+                    # Категории остаются категориями: коды факультетов берутся без прохода по строкам
+                    if values.isna().any() and default not in values.cat.categories:
+                        values = values.cat.add_categories([default])
+                    return values.fillna(default)
+                return values.fillna(default).to_numpy()
+            return np.full(n_rows, default, dtype=object if isinstance(default, str) else None)
+        
+        faculty, gpa = column('faculty', 'ИТ'), column('gpa', 7.0)
+        internships, projects = column('internships', 0), column('projects', 0)
+        certificates, english_level = column('certificates', 0), column('english_level', 'B1')
+        graduation_year = column('graduation_year', 2025)
+        
+        return pd.DataFrame({
+            'employment_probability': self.simple_predictor.predict_employment_batch(
+                faculty, gpa, internships, projects, certificates,
+                column('job_search_duration', 90), english_level, graduation_year
+            ),
+            'salary_prediction': self.simple_predictor.predict_salary_batch(
+                faculty, gpa, internships, projects, certificates, english_level, graduation_year
+            )
+        }, index=student_data.index)
+    
     # 🔥 ДОБАВЛЕНО МЕТОДЫ ДЛЯ СОВМЕСТИМОСТИ С DASHBOARD
     
     def predict_salary_simple(self, faculty, gpa, internships, projects, certificates, 
@@ -208,7 +389,7 @@ class EnhancedEmploymentPredictor:
             model_dir.mkdir(exist_ok=True)
             
             if ADVANCED_MODELS_AVAILABLE and self.advanced_predictor:
-                self.advanced_predictor.save_model(model_dir / 'advanced_predictor.joblib')
+                self.advanced_predictor.save_model_bundle(model_dir / 'bundle')
             
             logger.info(f"💾 Улучшенные модели сохранены в {model_dir}")
             
@@ -224,7 +405,11 @@ class EnhancedEmploymentPredictor:
                 if self.advanced_predictor is None:
                     self.advanced_predictor = AdvancedEmploymentPredictor()
                 
-                self.advanced_predictor.load_model(model_dir / 'advanced_predictor.joblib')
+                if bundle_exists(model_dir / 'bundle'):
+                    self.advanced_predictor.load_model_bundle(model_dir / 'bundle')
+                else:
+                    # Модель, сохраненная до перехода на пакеты
+                    self.advanced_predictor.load_model(model_dir / 'advanced_predictor.joblib')
                 self.is_trained = True
             
             logger.info(f"📂 Улучшенные модели загружены из {model_dir}")
@@ -0,0 +1,243 @@
+# forecast_cube.py
+"""
+Предрасчитанный куб прогнозов для страницы "Прогнозирование"
+
+Офлайн-задача считает прогноз forecasting.forecast_values на всей сетке:
+факультет × университет × год выпуска × уровень английского (дискретные оси)
+× узлы GPA, стажировок, проектов и сертификатов (непрерывные оси). Результат -
+N-мерный массив float32 в .npz. Страница берет ответ из куба: ячейка по
+дискретным осям и полилинейная интерполяция по 16 соседним узлам непрерывных
+осей. Ввод вне сетки (другой вуз, год после 2035, GPA вне диапазона, устаревший
+куб прошлого года) считается напрямую через forecast_career.
+
+Сетка по умолчанию (6, 10, 10, 6, 6, 6, 6, 6, 2) занимает в памяти процесса ~37 МБ
+float32; ~4 МБ - только размер сжатого .npz на диске. Поиск в кубе медленнее прямого
+расчета, поэтому страница использует куб только при ML_CONFIG['forecast_cube']['enabled'].
+"""
+
+import bisect
+import json
+import time
+from datetime import datetime
+from itertools import product
+from pathlib import Path
+import numpy as np
+import logging
+
+from config import ML_CONFIG, MODELS_DIR
+from forecasting import (BASE_EMPLOYMENT_RATES, UNIVERSITY_CORRECTIONS, ENGLISH_FACTORS, DEFAULT_CORRECTION,
+                         clip_forecast, forecast_career, forecast_values)
+
+logger = logging.getLogger(__name__)
+
+DISCRETE_AXES = ('faculty', 'university', 'graduation_year', 'english_level')
+CONTINUOUS_AXES = ('gpa', 'internships', 'projects', 'certificates')
+OUTPUTS = ('employment_probability', 'salary_prediction')
+
+# Узлы непрерывных осей по умолчанию: гуще там, где чаще вводят значения слайдеров
+DEFAULT_KNOTS = {
+    'gpa': [5.0, 6.0, 7.0, 8.0, 9.0, 10.0],
+    'internships': [0, 1, 2, 3, 5, 10],
+    'projects': [0, 2, 4, 7, 10, 15],
+    'certificates': [0, 1, 2, 4, 6, 10]
+}
+
+def _university_info(university):
+    """Уровень престижа и описание вуза (не зависят от непрерывных осей)"""
+    correction = UNIVERSITY_CORRECTIONS.get(university, DEFAULT_CORRECTION)
+    return correction['prestige'], correction['description']
+
+class ForecastCube:
+    """Сетка прогнозов с полилинейной интерполяцией по непрерывным осям
+    
+    values имеет форму (факультеты, вузы, годы, уровни английского, узлы GPA,
+    узлы стажировок, узлы проектов, узлы сертификатов, 2): последняя ось -
+    вероятность трудоустройства и зарплата до ограничений и округления. До
+    ограничений прогноз линеен по непрерывным осям, поэтому интерполяция между
+    узлами точна, а ограничения применяются уже к интерполированному значению.
+    """
+    
+    def __init__(self, axes, values, current_year):
+        self.axes = axes
+        self.values = values
+        self.current_year = current_year
+        self._index = {name: {value: i for i, value in enumerate(axes[name])} for name in DISCRETE_AXES}
+        self._knots = [[float(k) for k in axes[name]] for name in CONTINUOUS_AXES]
+        self._corners = np.array(list(product([0, 1], repeat=len(CONTINUOUS_AXES))), dtype=bool)
+        self.hits = 0
+        self.fallbacks = 0
+    
+    @classmethod
+    def build(cls, current_year=None, knots=None, max_year=2035):
+        """Расчет всей сетки: один векторизованный вызов на дискретную комбинацию"""
+        current_year = current_year or datetime.now().year
+        knots = {**DEFAULT_KNOTS, **(knots or ML_CONFIG.get('forecast_cube', {}).get('knots') or {})}
+        axes = {
+            'faculty': list(BASE_EMPLOYMENT_RATES),
+            'university': list(UNIVERSITY_CORRECTIONS),
+            'graduation_year': list(range(current_year, max_year + 1)),
+            'english_level': list(ENGLISH_FACTORS),
+            **{name: [float(k) for k in knots[name]] for name in CONTINUOUS_AXES}
+        }
+        
+        start = time.time()
+        mesh = np.meshgrid(*[np.asarray(axes[name], dtype=np.float64) for name in CONTINUOUS_AXES], indexing='ij')
+        shape = tuple(len(axes[name]) for name in DISCRETE_AXES + CONTINUOUS_AXES)
+        values = np.empty(shape + (len(OUTPUTS),), dtype=np.float32)
+        for index in product(*[range(len(axes[name])) for name in DISCRETE_AXES]):
+            faculty, university, graduation_year, english_level = (
+                axes[name][i] for name, i in zip(DISCRETE_AXES, index)
+            )
+            employment_prob, salary_pred, _, _ = forecast_values(
+                faculty, university, graduation_year, *mesh, english_level, current_year, clip=False
+            )
+            values[index] = np.stack([employment_prob, salary_pred], axis=-1)
+        
+        logger.info(f"✅ Куб прогнозов {shape}: {values.size:,} значений за {time.time() - start:.1f} с "
+                    f"({values.nbytes / 1024 ** 2:.1f} МБ)")
+        return cls(axes, values, current_year)
+    
+    def _discrete_index(self, inputs):
+        """Индексы дискретных осей или None, если значение вне сетки"""
+        index = []
+        for name in DISCRETE_AXES:
+            position = self._index[name].get(inputs[name])
+            if position is None:
+                return None
+            index.append(position)
+        return tuple(index)
+    
+    def lookup(self, faculty, university, graduation_year, gpa, internships, projects, certificates,
+               english_level):
+        """Интерполированные (вероятность, зарплата) или None для ввода вне сетки"""
+        index = self._discrete_index({'faculty': faculty, 'university': university,
+                                      'graduation_year': graduation_year, 'english_level': english_level})
+        if index is None:
+            return None
+        
+        point = (gpa, internships, projects, certificates)
+        cell, weights = list(index), []
+        for knots, x in zip(self._knots, point):
+            if not knots[0] <= x <= knots[-1]:
+                return None
+            i = min(bisect.bisect_right(knots, x) - 1, len(knots) - 2)
+            cell.append(slice(i, i + 2))
+            weights.append((x - knots[i]) / (knots[i + 1] - knots[i]))
+        
+        # 16 соседних узлов гиперкуба и их веса (произведение весов по осям)
+        block = self.values[tuple(cell)].reshape(-1, len(OUTPUTS))
+        weights = np.array(weights)
+        corner_weights = np.where(self._corners, weights, 1 - weights).prod(axis=1)
+        return clip_forecast(*(corner_weights @ block))
+    
+    def forecast(self, faculty, university, graduation_year, gpa, internships, projects, certificates,
+                 english_level, current_year=None):
+        """Прогноз в формате forecast_career: из куба или напрямую, если ввод вне сетки"""
+        current_year = current_year or datetime.now().year
+        result = None
+        if current_year == self.current_year:
+            result = self.lookup(faculty, university, graduation_year, gpa, internships, projects,
+                                 certificates, english_level)
+        if result is None:
+            self.fallbacks += 1
+            return forecast_career(faculty, university, graduation_year, gpa, internships, projects,
+                                   certificates, english_level, current_year)
+        
+        self.hits += 1
+        prestige_level, uni_description = _university_info(university)
+        return {
+            'employment_probability': round(float(result[0]), 3),
+            'salary_prediction': round(float(result[1]), 0),
+            'prestige_level': prestige_level,
+            'university_description': uni_description
+        }
+    
+    def save(self, path=None):
+        path = Path(path or ML_CONFIG.get('forecast_cube', {}).get('path') or MODELS_DIR / 'forecast_cube.npz')
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {'axes': self.axes, 'current_year': self.current_year, 'outputs': list(OUTPUTS)}
+        np.savez_compressed(path, values=self.values, meta=np.array(json.dumps(meta, ensure_ascii=False)))
+        logger.info(f"💾 Куб прогнозов сохранен: {path}")
+        return path
+    
+    @classmethod
+    def load(cls, path=None):
+        path = Path(path or ML_CONFIG.get('forecast_cube', {}).get('path') or MODELS_DIR / 'forecast_cube.npz')
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            return cls(meta['axes'], data['values'], meta['current_year'])
+    
+    @classmethod
+    def load_or_build(cls, path=None):
+        """Сохраненный куб текущего года или новый расчет (с сохранением)"""
+        try:
+            cube = cls.load(path)
+            if cube.current_year == datetime.now().year:
+                return cube
+            logger.info(f"🔄 Куб прогнозов построен в {cube.current_year} году, пересчет")
+        except (OSError, KeyError, ValueError):
+            logger.info("🔄 Куб прогнозов не найден, расчет")
+        cube = cls.build()
+        try:
+            cube.save(path)
+        except OSError as e:
+            logger.warning(f"⚠️ Не удалось сохранить куб прогнозов: {e}")
+        return cube
+    
+    def stats(self):
+        requests = self.hits + self.fallbacks
+        return {'hits': self.hits, 'fallbacks': self.fallbacks,
+                'hit_rate': self.hits / requests if requests else 0.0}
+
+def evaluate_cube(cube, n_samples=2000, random_state=42):
+    """Точность и скорость куба против прямого расчета на случайном вводе со слайдеров
+    
+    Возвращает максимальную и среднюю абсолютную ошибку вероятности и зарплаты
+    (после округления, как на странице) и время одного ответа в микросекундах.
+    """
+    rng = np.random.RandomState(random_state)
+    axes = cube.axes
+    samples = [{
+        'faculty': rng.choice(axes['faculty']),
+        'university': rng.choice(axes['university']),
+        'graduation_year': int(rng.choice(axes['graduation_year'])),
+        'gpa': round(float(rng.uniform(5.0, 10.0)), 1),
+        'internships': int(rng.randint(0, 11)),
+        'projects': int(rng.randint(0, 16)),
+        'certificates': int(rng.randint(0, 11)),
+        'english_level': rng.choice(axes['english_level']),
+        'current_year': cube.current_year
+    } for _ in range(n_samples)]
+    
+    start = time.perf_counter()
+    cube_results = [cube.forecast(**sample) for sample in samples]
+    cube_us = (time.perf_counter() - start) / n_samples * 1e6
+    start = time.perf_counter()
+    live_results = [forecast_career(**sample) for sample in samples]
+    live_us = (time.perf_counter() - start) / n_samples * 1e6
+    
+    report = {'n_samples': n_samples, 'cube_us': cube_us, 'live_us': live_us}
+    for name in OUTPUTS:
+        errors = np.abs([c[name] - l[name] for c, l in zip(cube_results, live_results)])
+        report[f'{name}_max_error'] = float(errors.max())
+        report[f'{name}_mean_error'] = float(errors.mean())
+    logger.info(f"🏁 Куб: {cube_us:.0f} мкс против {live_us:.0f} мкс; ошибка вероятности "
+                f"макс {report['employment_probability_max_error']:.3f} (сред "
+                f"{report['employment_probability_mean_error']:.4f}), зарплаты макс "
+                f"{report['salary_prediction_max_error']:.0f} BYN (сред {report['salary_prediction_mean_error']:.1f})")
+    return report
+
+if __name__ == "__main__":
+    import argparse
+    
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Расчет куба прогнозов страницы 'Прогнозирование'")
+    parser.add_argument('--output', help="путь к .npz (по умолчанию - из ML_CONFIG['forecast_cube'])")
+    parser.add_argument('--evaluate', type=int, default=2000, metavar='N',
+                        help="проверить точность на N случайных вводах (0 - без проверки)")
+    args = parser.parse_args()
+    
+    forecast_cube = ForecastCube.build()
+    forecast_cube.save(args.output)
+    if args.evaluate:
+        print(evaluate_cube(forecast_cube, args.evaluate))
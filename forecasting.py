@@ -0,0 +1,343 @@
+# forecasting.py
+"""
+Прогноз карьерных перспектив для страницы "Прогнозирование"
+
+Базовая оценка по факультету и показателям студента, коррекция на престиж
+университета и корректировка на годы до выпуска (статистика rabota.by).
+Функции не зависят от Streamlit, поэтому результат можно кэшировать
+между сессиями (см. prediction_cache.py); forecast_sweep считает кривые чувствительности.
+"""
+
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from sensitivity import sweep
+
+# Рост отраслей по статистике rabota.by
+INDUSTRY_GROWTH_RATES = {
+    'ИТ': {
+        'salary_growth': 0.11,  # Высокий рост в IT
+        'employment_growth': 0.04,
+        'premium_bonus': 0.15   # Дополнительный бонус для престижных вузов
+    },
+    'Медицина': {
+        'salary_growth': 0.09,
+        'employment_growth': 0.03,
+        'premium_bonus': 0.10
+    },
+    'Инженерия': {
+        'salary_growth': 0.07,
+        'employment_growth': 0.025,
+        'premium_bonus': 0.08
+    },
+    'Экономика': {
+        'salary_growth': 0.06,
+        'employment_growth': 0.02,
+        'premium_bonus': 0.07
+    },
+    'Педагогика': {
+        'salary_growth': 0.14,  # Самый высокий рост из-за дефицита
+        'employment_growth': 0.06,
+        'premium_bonus': 0.12
+    },
+    'Юриспруденция': {
+        'salary_growth': 0.065,
+        'employment_growth': 0.022,
+        'premium_bonus': 0.08
+    }
+}
+
+DEFAULT_GROWTH = {'salary_growth': 0.06, 'employment_growth': 0.02, 'premium_bonus': 0.05}
+
+# Престиж университета (данные из статистики rabota.by)
+PRESTIGE_FACTORS = {
+    'БГУ': 1.25,    # Высший уровень
+    'БГУИР': 1.30,  # Лучший для IT
+    'БГМУ': 1.20,   # Лучший для медицины
+    'БНТУ': 1.15,
+    'БГЭУ': 1.12,
+    'БГПУ': 1.18,   # Лучший для педагогики
+    'ГрГУ': 1.05,
+    'ВГУ': 1.03,
+    'ГГТУ': 1.02,
+    'ПГУ': 1.00
+}
+
+UNIVERSITY_CORRECTIONS = {
+    'БГУ': {
+        'employment_mult': 1.18,
+        'salary_mult': 1.22,
+        'prestige': 'высший',
+        'description': 'Флагманский университет Беларуси'
+    },
+    'БГУИР': {
+        'employment_mult': 1.22,
+        'salary_mult': 1.28,
+        'prestige': 'высший',
+        'description': 'Лидер IT-образования в стране'
+    },
+    'БГМУ': {
+        'employment_mult': 1.20,
+        'salary_mult': 1.20,
+        'prestige': 'высший',
+        'description': 'Ведущий медицинский университет'
+    },
+    'БНТУ': {
+        'employment_mult': 1.14,
+        'salary_mult': 1.16,
+        'prestige': 'высокий',
+        'description': 'Лучший технический университет'
+    },
+    'БГЭУ': {
+        'employment_mult': 1.12,
+        'salary_mult': 1.14,
+        'prestige': 'высокий',
+        'description': 'Ведущий экономический университет'
+    },
+    'БГПУ': {
+        'employment_mult': 1.25,
+        'salary_mult': 1.12,
+        'prestige': 'высокий',
+        'description': 'Лучший педагогический университет'
+    },
+    'ГрГУ': {
+        'employment_mult': 1.06,
+        'salary_mult': 1.06,
+        'prestige': 'средний',
+        'description': 'Крупный региональный университет'
+    },
+    'ВГУ': {
+        'employment_mult': 1.04,
+        'salary_mult': 1.04,
+        'prestige': 'средний',
+        'description': 'Университет с сильными традициями'
+    },
+    'ГГТУ': {
+        'employment_mult': 1.03,
+        'salary_mult': 1.03,
+        'prestige': 'средний',
+        'description': 'Технический университет в Гомеле'
+    },
+    'ПГУ': {
+        'employment_mult': 1.00,
+        'salary_mult': 1.00,
+        'prestige': 'базовый',
+        'description': 'Региональный университет'
+    }
+}
+
+DEFAULT_CORRECTION = {
+    'employment_mult': 1.0,
+    'salary_mult': 1.0,
+    'prestige': 'базовый',
+    'description': 'Университет'
+}
+
+# Дополнительные коррекции для профильных факультетов
+SPECIAL_COMBINATIONS = {
+    ('БГУИР', 'ИТ'): {'employment_mult': 1.28, 'salary_mult': 1.32},
+    ('БГМУ', 'Медицина'): {'employment_mult': 1.25, 'salary_mult': 1.22},
+    ('БГПУ', 'Педагогика'): {'employment_mult': 1.30, 'salary_mult': 1.15},
+    ('БГЭУ', 'Экономика'): {'employment_mult': 1.16, 'salary_mult': 1.20},
+    ('БНТУ', 'Инженерия'): {'employment_mult': 1.18, 'salary_mult': 1.20},
+    ('БГУ', 'Юриспруденция'): {'employment_mult': 1.15, 'salary_mult': 1.18},
+}
+
+# Базовая вероятность трудоустройства по факультету
+BASE_EMPLOYMENT_RATES = {
+    'ИТ': 0.88,
+    'Медицина': 0.92,
+    'Инженерия': 0.85,
+    'Экономика': 0.82,
+    'Педагогика': 0.95,  # Высокий из-за дефицита
+    'Юриспруденция': 0.80
+}
+
+# Базовые зарплаты по факультету (BYN)
+BASE_SALARIES = {
+    'ИТ': 2500,
+    'Медицина': 2200,
+    'Инженерия': 2300,
+    'Экономика': 1900,
+    'Педагогика': 1800,
+    'Юриспруденция': 2100
+}
+
+ENGLISH_FACTORS = {'A1': 0.0, 'A2': 0.01, 'B1': 0.03, 'B2': 0.05, 'C1': 0.07, 'C2': 0.09}
+
+# Ограничения для реалистичности
+EMPLOYMENT_BOUNDS = (0.4, 0.97)
+SALARY_BOUNDS = (1000, 10000)
+
+def calculate_future_adjustment(target_year, faculty, university, current_year=None):
+    """Корректировка прогноза на годы до выпуска с учетом отрасли и престижа вуза"""
+    current_year = current_year or datetime.now().year
+    years_ahead = target_year - current_year
+    
+    if years_ahead <= 0:
+        return {'salary_multiplier': 1.0, 'employment_boost': 0.0}
+    
+    growth = INDUSTRY_GROWTH_RATES.get(faculty, DEFAULT_GROWTH)
+    prestige_factor = PRESTIGE_FACTORS.get(university, 1.0)
+    
+    if faculty == 'Педагогика':
+        # Педагогика: ускоренный рост из-за дефицита
+        salary_multiplier = (1 + growth['salary_growth']) ** years_ahead
+        salary_multiplier *= (1 + (prestige_factor - 1) * 0.8) ** years_ahead
+    elif faculty == 'ИТ' and years_ahead > 3:
+        # ИТ: быстрый рост первые 3 года, затем стабильный
+        early_growth = (1 + growth['salary_growth']) ** min(years_ahead, 3)
+        late_growth = (1 + growth['salary_growth'] * 0.8) ** max(years_ahead - 3, 0)
+        salary_multiplier = early_growth * late_growth
+        salary_multiplier *= (1 + (prestige_factor - 1) * 1.0) ** years_ahead
+    else:
+        # Стандартный рост с учетом престижа
+        salary_multiplier = (1 + growth['salary_growth']) ** years_ahead
+        salary_multiplier *= (1 + (prestige_factor - 1) * 0.6) ** years_ahead
+    
+    # Рост вероятности трудоустройства
+    employment_boost = growth['employment_growth'] * years_ahead
+    employment_boost += (prestige_factor - 1) * 0.03 * years_ahead
+    
+    return {
+        'salary_multiplier': min(salary_multiplier, 4.0),
+        'employment_boost': min(employment_boost, 0.4),
+        'prestige_factor': prestige_factor
+    }
+
+def apply_university_correction(university, faculty, base_employment, base_salary, clip=True):
+    """Коррекция прогноза на престиж университета
+    
+    Возвращает (вероятность, зарплата, уровень престижа, описание вуза); base_employment
+    и base_salary могут быть массивами. clip=False - без ограничения вероятности сверху.
+    """
+    correction = dict(UNIVERSITY_CORRECTIONS.get(university, DEFAULT_CORRECTION))
+    
+    special_corr = SPECIAL_COMBINATIONS.get((university, faculty))
+    if special_corr is not None:
+        correction['employment_mult'] = max(correction['employment_mult'], special_corr['employment_mult'])
+        correction['salary_mult'] = max(correction['salary_mult'], special_corr['salary_mult'])
+    
+    corrected_employment = base_employment * correction['employment_mult']
+    if clip:
+        corrected_employment = np.minimum(EMPLOYMENT_BOUNDS[1], corrected_employment)
+    corrected_salary = base_salary * correction['salary_mult']
+    
+    return corrected_employment, corrected_salary, correction['prestige'], correction['description']
+
+def clip_forecast(employment_prob, salary_pred):
+    """Ограничения вероятности и зарплаты для реалистичности"""
+    employment_prob = np.maximum(EMPLOYMENT_BOUNDS[0], np.minimum(EMPLOYMENT_BOUNDS[1], employment_prob))
+    salary_pred = np.maximum(SALARY_BOUNDS[0], np.minimum(SALARY_BOUNDS[1], salary_pred))
+    return employment_prob, salary_pred
+
+def forecast_values(faculty, university, graduation_year, gpa, internships, projects, certificates,
+                    english_level, current_year=None, clip=True):
+    """Вероятность трудоустройства и зарплата без округления
+    
+    gpa, internships, projects и certificates могут быть массивами NumPy одной формы:
+    так куб прогнозов (forecast_cube.py) считает всю сетку по непрерывным осям
+    одним вызовом на комбинацию факультета, вуза, года и уровня английского.
+    clip=False возвращает значения до ограничений: они линейны по непрерывным осям,
+    а clip_forecast от них дает тот же результат, что и clip=True (промежуточные
+    ограничения сверху поглощаются итоговым, так как множители не меньше 1).
+    Возвращает (вероятности, зарплаты, уровень престижа, описание вуза).
+    """
+    current_year = current_year or datetime.now().year
+    
+    # Начинаем с базовых значений факультета
+    employment_prob = BASE_EMPLOYMENT_RATES.get(faculty, 0.8)
+    salary_pred = BASE_SALARIES.get(faculty, 2000)
+    
+    # Коррекции на основе данных студента
+    employment_prob += (gpa - 6.0) * 0.03
+    salary_pred += (gpa - 6.0) * 150
+    
+    employment_prob += internships * 0.04
+    salary_pred += internships * 200
+    
+    employment_prob += projects * 0.02
+    salary_pred += projects * 100
+    
+    employment_prob += certificates * 0.015
+    salary_pred += certificates * 80
+    
+    english_factor = ENGLISH_FACTORS.get(english_level, 0.03)
+    employment_prob += english_factor
+    salary_pred += english_factor * 300
+    
+    employment_prob, salary_pred, prestige_level, uni_description = apply_university_correction(
+        university, faculty, employment_prob, salary_pred, clip
+    )
+    
+    # Корректировка для будущих годов с учетом университета
+    if graduation_year > current_year:
+        future_adjustment = calculate_future_adjustment(graduation_year, faculty, university, current_year)
+        salary_pred = salary_pred * future_adjustment['salary_multiplier']
+        employment_prob = employment_prob * (1 + future_adjustment['employment_boost'])
+        if clip:
+            employment_prob = np.minimum(EMPLOYMENT_BOUNDS[1], employment_prob)
+    
+    if clip:
+        employment_prob, salary_pred = clip_forecast(employment_prob, salary_pred)
+    
+    return employment_prob, salary_pred, prestige_level, uni_description
+
+def forecast_career(faculty, university, graduation_year, gpa, internships, projects, certificates,
+                    english_level, current_year=None):
+    """Прогноз вероятности трудоустройства и зарплаты выпускника
+    
+    Возвращает словарь: employment_probability, salary_prediction, prestige_level,
+    university_description.
+    """
+    employment_prob, salary_pred, prestige_level, uni_description = forecast_values(
+        faculty, university, graduation_year, gpa, internships, projects, certificates,
+        english_level, current_year
+    )
+    return {
+        'employment_probability': round(float(employment_prob), 3),
+        'salary_prediction': round(float(salary_pred), 0),
+        'prestige_level': prestige_level,
+        'university_description': uni_description
+    }
+
+def forecast_batch(students, current_year=None):
+    """Прогноз для DataFrame студентов без округления
+    
+    Строки группируются по факультету, вузу, году выпуска и уровню английского,
+    внутри группы прогноз считается одним векторизованным вызовом forecast_values.
+    Возвращает DataFrame employment_probability, salary_prediction с индексом students.
+    """
+    discrete = ['faculty', 'university', 'graduation_year', 'english_level']
+    predictions = pd.DataFrame(index=students.index, columns=['employment_probability', 'salary_prediction'],
+                               dtype=float)
+    for (faculty, university, graduation_year, english_level), group in students.groupby(discrete, sort=False):
+        employment_prob, salary_pred, _, _ = forecast_values(
+            faculty, university, graduation_year, group['gpa'].to_numpy(dtype=float),
+            group['internships'].to_numpy(dtype=float), group['projects'].to_numpy(dtype=float),
+            group['certificates'].to_numpy(dtype=float), english_level, current_year
+        )
+        predictions.loc[group.index, 'employment_probability'] = employment_prob
+        predictions.loc[group.index, 'salary_prediction'] = salary_pred
+    return predictions
+
+def forecast_sweep(faculty, university, graduation_year, gpa, internships, projects, certificates,
+                   english_level, axes, current_year=None):
+    """Кривые чувствительности прогноза по осям axes (см. sensitivity.sweep)
+    
+    Например, axes={'gpa': None, 'internships': range(0, 6)} - вся сетка GPA со
+    слайдера для 0-5 стажировок одним расчетом. Возвращает DataFrame: оси,
+    employment_probability, salary_prediction и их изменение относительно ввода.
+    """
+    base_student = {
+        'faculty': faculty,
+        'university': university,
+        'graduation_year': graduation_year,
+        'gpa': gpa,
+        'internships': internships,
+        'projects': projects,
+        'certificates': certificates,
+        'english_level': english_level
+    }
+    return sweep(lambda grid: forecast_batch(grid, current_year), base_student, axes)
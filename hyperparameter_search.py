@@ -0,0 +1,169 @@
+# hyperparameter_search.py
+"""
+Поиск гиперпараметров с ограничением по времени и числу проб
+(successive halving по подвыборкам данных и числу деревьев + медианный прунер)
+"""
+
+import math
+import time
+import numpy as np
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import ParameterSampler, StratifiedKFold
+import logging
+
+logger = logging.getLogger(__name__)
+
+class BudgetedHyperparameterSearch:
+    """Поиск гиперпараметров, укладывающийся в бюджет времени и проб
+    
+    Все кандидаты сначала оцениваются на малой подвыборке с урезанным числом
+    деревьев, и на каждом следующем этапе (rung) остается лучшая 1/reduction_factor
+    часть кандидатов с увеличенным в reduction_factor раз ресурсом. Внутри этапа
+    кандидат останавливается после очередного фолда, если его текущий средний
+    скор хуже медианы других кандидатов этого этапа после того же числа фолдов.
+    timeout ограничивает перебор; финальное обучение лучшей конфигурации
+    на всех данных выполняется после него. initial_params - конфигурации
+    (например, лучшие из прошлых поисков), которые проверяются первыми.
+    """
+    
+    def __init__(self, estimator, param_distributions, n_trials=20, timeout=3600,
+                 cv=3, scoring='roc_auc', direction='maximize', reduction_factor=3,
+                 min_resource_samples=500, min_trials_for_pruning=5, random_state=42,
+                 initial_params=None):
+        self.estimator = estimator
+        self.param_distributions = param_distributions
+        self.n_trials = n_trials
+        self.timeout = timeout
+        self.cv = cv
+        self.scoring = scoring
+        self.direction = direction
+        self.reduction_factor = reduction_factor
+        self.min_resource_samples = min_resource_samples
+        self.min_trials_for_pruning = min_trials_for_pruning
+        self.random_state = random_state
+        self.initial_params = initial_params
+        
+        self.best_params_ = None
+        self.best_score_ = None
+        self.best_estimator_ = None
+        self.trials_ = []
+        self.trials_per_second_ = 0.0
+        self.elapsed_ = 0.0
+        self.timed_out_ = False
+    
+    def fit(self, X, y):
+        """Запуск поиска и дообучение лучшей конфигурации на всех данных"""
+        start_time = time.time()
+        deadline = start_time + self.timeout if self.timeout else None
+        X, y = np.asarray(X), np.asarray(y)
+        
+        # Стартовые конфигурации (только с известными поиску параметрами) + случайные
+        candidates = [dict(params) for params in (self.initial_params or [])
+                      if set(params) <= set(self.param_distributions)][:self.n_trials]
+        n_sampled = self.n_trials - len(candidates)
+        if n_sampled > 0:
+            candidates += list(ParameterSampler(
+                self.param_distributions, n_iter=n_sampled, random_state=self.random_state
+            ))
+        n_rungs = max(1, int(math.floor(math.log(len(candidates), self.reduction_factor))) + 1)
+        
+        # Вложенные стратифицированные подвыборки: строки малого этапа входят в большие
+        order = self._stratified_order(y)
+        cv = StratifiedKFold(n_splits=self.cv, shuffle=True, random_state=self.random_state)
+        scorer = get_scorer(self.scoring)
+        sign = 1.0 if self.direction == 'maximize' else -1.0
+        
+        self.trials_ = [{'trial': i, 'params': params, 'rung': -1, 'score': None,
+                         'state': 'waiting', 'fit_time': 0.0}
+                        for i, params in enumerate(candidates)]
+        survivors = list(range(len(candidates)))
+        best_rung_scores = {}
+        
+        for rung in range(n_rungs):
+            fraction = self.reduction_factor ** (rung - n_rungs + 1)
+            n_samples = min(len(y), max(int(len(y) * fraction), self.min_resource_samples))
+            rows = np.sort(order[:n_samples])
+            X_rung, y_rung = X[rows], y[rows]
+            folds = list(cv.split(X_rung, y_rung))
+            
+            step_scores = [[] for _ in folds]
+            rung_scores = {}
+            
+            for trial_id in survivors:
+                if deadline and time.time() > deadline:
+                    self.timed_out_ = True
+                    break
+                
+                trial = self.trials_[trial_id]
+                trial['rung'] = rung
+                trial['state'] = 'running'
+                estimator = self._build_estimator(trial['params'], fraction)
+                fold_scores = []
+                
+                for step, (train_idx, val_idx) in enumerate(folds):
+                    fit_start = time.time()
+                    model = clone(estimator).fit(X_rung[train_idx], y_rung[train_idx])
+                    trial['fit_time'] += time.time() - fit_start
+                    fold_scores.append(sign * scorer(model, X_rung[val_idx], y_rung[val_idx]))
+                    
+                    # Медианный прунер: сравниваем с кандидатами этапа после того же числа фолдов
+                    running_score = np.mean(fold_scores)
+                    other_scores = list(step_scores[step])
+                    step_scores[step].append(running_score)
+                    if (step < len(folds) - 1 and
+                            len(other_scores) >= self.min_trials_for_pruning and
+                            running_score < np.median(other_scores)):
+                        trial['state'] = 'pruned'
+                        break
+                
+                trial['score'] = sign * float(np.mean(fold_scores))
+                if trial['state'] != 'pruned':
+                    trial['state'] = 'completed'
+                    rung_scores[trial_id] = np.mean(fold_scores)
+            
+            if rung_scores:
+                best_rung_scores = rung_scores
+            if self.timed_out_ or len(rung_scores) <= 1:
+                break
+            
+            n_keep = max(1, len(rung_scores) // self.reduction_factor)
+            survivors = sorted(rung_scores, key=rung_scores.get, reverse=True)[:n_keep]
+        
+        if not best_rung_scores:
+            raise RuntimeError("Ни одна конфигурация не была оценена в отведенное время")
+        
+        best_trial = max(best_rung_scores, key=best_rung_scores.get)
+        self.best_params_ = self.trials_[best_trial]['params']
+        self.best_score_ = self.trials_[best_trial]['score']
+        self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_).fit(X, y)
+        
+        self.elapsed_ = time.time() - start_time
+        n_evaluated = sum(1 for t in self.trials_ if t['state'] in ('completed', 'pruned'))
+        self.trials_per_second_ = n_evaluated / self.elapsed_ if self.elapsed_ > 0 else 0.0
+        
+        n_pruned = sum(1 for t in self.trials_ if t['state'] == 'pruned')
+        logger.info(f"⏱️ Поиск: {n_evaluated} проб ({n_pruned} остановлено досрочно) за "
+                    f"{self.elapsed_:.1f} с, {self.trials_per_second_:.2f} проб/с"
+                    f"{' - достигнут лимит времени' if self.timed_out_ else ''}")
+        return self
+    
+    def _build_estimator(self, params, fraction):
+        """Кандидат с урезанным пропорционально этапу числом деревьев"""
+        params = dict(params)
+        if fraction < 1:
+            if 'n_estimators' in params:
+                params['n_estimators'] = max(10, int(params['n_estimators'] * fraction))
+            elif 'max_estimators' in self.estimator.get_params(deep=False):
+                # Модели с ранней остановкой: урезаем верхнюю границу числа деревьев
+                params['max_estimators'] = max(10, int(self.estimator.get_params()['max_estimators'] * fraction))
+        return clone(self.estimator).set_params(**params)
+    
+    def _stratified_order(self, y):
+        """Перестановка строк, в любом префиксе которой сохраняются доли классов"""
+        rng = np.random.RandomState(self.random_state)
+        ranks = np.empty(len(y))
+        for cls in np.unique(y):
+            idx = np.flatnonzero(y == cls)
+            ranks[idx] = (rng.permutation(len(idx)) + rng.random_sample(len(idx))) / len(idx)
+        return np.argsort(ranks, kind='stable')
@@ -0,0 +1,200 @@
+# hyperparameter_store.py
+"""
+Хранилище результатов поиска гиперпараметров между переобучениями
+
+Каждый поиск дописывается одной JSON-строкой: отпечаток данных, набор признаков,
+все пробы (параметры, скор, время обучения) и лучшая конфигурация. Следующие
+обучения стартуют с лучших прошлых конфигураций или пропускают поиск целиком,
+если данные почти не изменились.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+import logging
+
+from config import ML_CONFIG, MODELS_DIR
+
+logger = logging.getLogger(__name__)
+
+N_QUANTILE_BINS = 10
+MAX_DISCRETE_VALUES = 32
+PSI_EPSILON = 1e-4
+
+def feature_set_key(feature_names=None, n_features=None):
+    """Ключ набора признаков: хэш имен признаков (или только их количества)"""
+    source = ','.join(feature_names) if feature_names is not None else f'n_features={n_features}'
+    return hashlib.sha1(source.encode('utf-8')).hexdigest()[:12]
+
+def _midpoint_edges(values, quantile_edges):
+    """Границы бинов в серединах между соседними значениями, ближайших к квантилям
+    
+    Граница не совпадает ни с одним значением выборки, поэтому дискретные признаки,
+    слегка сдвинутые повторной стандартизацией, попадают в те же бины.
+    """
+    distinct = np.unique(values)
+    if len(distinct) < 2:
+        return np.empty(0)
+    midpoints = (distinct[:-1] + distinct[1:]) / 2
+    nearest = np.clip(np.searchsorted(midpoints, quantile_edges), 0, len(midpoints) - 1)
+    return np.unique(midpoints[nearest])
+
+def _bin_fractions(values, edges):
+    """Доли значений в бинах, заданных границами edges"""
+    counts = np.bincount(np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1)
+    return counts / max(len(values), 1)
+
+def _feature_profile(values):
+    """Распределение признака: доли по значениям (дискретный) или по квантильным бинам"""
+    distinct, counts = np.unique(values, return_counts=True)
+    if len(distinct) <= MAX_DISCRETE_VALUES:
+        return {'values': distinct.tolist(), 'fractions': np.round(counts / len(values), 6).tolist()}
+    
+    quantiles = np.linspace(0, 1, N_QUANTILE_BINS + 1)[1:-1]
+    edges = _midpoint_edges(distinct, np.quantile(values, quantiles))
+    return {'edges': edges.tolist(), 'fractions': np.round(_bin_fractions(values, edges), 6).tolist()}
+
+def _feature_fractions(profile, values):
+    """Доли новой выборки в бинах профиля признака"""
+    if 'values' not in profile:
+        return _bin_fractions(values, np.asarray(profile['edges']))
+    
+    # Значения target-энкодингов смещаются между обучениями, а их порядок - нет:
+    # при том же числе значений сравниваем доли по рангу значения
+    distinct, counts = np.unique(values, return_counts=True)
+    if len(distinct) == len(profile['values']):
+        return counts / len(values)
+    reference = np.asarray(profile['values'])
+    return _bin_fractions(values, (reference[:-1] + reference[1:]) / 2)
+
+def _population_stability_index(expected, actual):
+    expected = np.clip(np.asarray(expected), PSI_EPSILON, None)
+    actual = np.clip(np.asarray(actual), PSI_EPSILON, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+def data_fingerprint(X, y, feature_names=None, sample_size=100_000, random_state=42):
+    """Отпечаток выборки: размер, доля класса 1 и распределение каждого признака"""
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y)
+    if len(X) > sample_size:
+        rows = np.random.RandomState(random_state).choice(len(X), sample_size, replace=False)
+        X, y = X[rows], y[rows]
+    
+    fingerprint = {
+        'n_rows': int(len(X)),
+        'n_features': int(X.shape[1]),
+        'feature_set': feature_set_key(feature_names, X.shape[1]),
+        'positive_rate': float(np.mean(y)),
+        'features': [_feature_profile(X[:, j]) for j in range(X.shape[1])]
+    }
+    fingerprint['hash'] = hashlib.sha1(
+        json.dumps(fingerprint, sort_keys=True).encode('utf-8')
+    ).hexdigest()[:16]
+    return fingerprint
+
+def drift_score(fingerprint, X, y=None):
+    """Средний PSI признаков (и целевой переменной) относительно выборки отпечатка
+    
+    0 - распределения совпадают; по общепринятой шкале PSI < 0.1 - изменения
+    незначительны, > 0.25 - распределение сильно сдвинулось.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    if X.shape[1] != fingerprint['n_features']:
+        return np.inf
+    
+    scores = [
+        _population_stability_index(profile['fractions'], _feature_fractions(profile, X[:, j]))
+        for j, profile in enumerate(fingerprint['features'])
+    ]
+    if y is not None:
+        reference_rate = fingerprint['positive_rate']
+        current_rate = float(np.mean(y))
+        scores.append(_population_stability_index(
+            [1 - reference_rate, reference_rate], [1 - current_rate, current_rate]
+        ))
+    return float(np.mean(scores))
+
+def _to_json(value):
+    """Приведение numpy-типов параметров к JSON"""
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+class HyperparameterStore:
+    """Локальное JSON-lines хранилище поисков гиперпараметров"""
+    
+    def __init__(self, path=None):
+        settings = ML_CONFIG.get('hyperparameter_store', {})
+        self.path = Path(path or settings.get('path', MODELS_DIR / 'hyperparameter_store.jsonl'))
+    
+    def record_search(self, model_type, fingerprint, trials, best_params, best_score):
+        """Сохранение поиска со всеми пробами"""
+        record = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'model_type': model_type,
+            'feature_set': fingerprint['feature_set'],
+            'fingerprint': fingerprint,
+            'best_params': best_params,
+            'best_score': best_score,
+            'trials': trials
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            line = (json.dumps(record, ensure_ascii=False, default=_to_json) + '\n').encode('utf-8')
+            # Одна запись с O_APPEND: строки параллельных воркеров планировщика не перемешиваются
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+            logger.info(f"💾 Поиск {model_type} сохранен: {len(trials)} проб → {self.path}")
+        except OSError as e:
+            logger.warning(f"⚠️ Не удалось сохранить результаты поиска: {e}")
+    
+    def load(self, model_type=None, feature_set=None):
+        """Сохраненные поиски (от старых к новым) с фильтром по модели и набору признаков"""
+        if not self.path.exists():
+            return []
+        
+        records = []
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Недописанная строка прерванного обучения
+                if model_type is not None and record.get('model_type') != model_type:
+                    continue
+                if feature_set is not None and record.get('feature_set') != feature_set:
+                    continue
+                records.append(record)
+        return records
+    
+    def latest_search(self, model_type, feature_set):
+        """Последний поиск для модели и набора признаков"""
+        records = self.load(model_type, feature_set)
+        return records[-1] if records else None
+    
+    def best_configurations(self, model_type, feature_set, top_k=5):
+        """Лучшие прошлые конфигурации для старта нового поиска
+        
+        Сначала лучшие конфигурации поисков от новых к старым, затем завершенные
+        пробы с самого дальнего этапа и лучшим скором.
+        """
+        records = self.load(model_type, feature_set)[::-1]
+        candidates = [record['best_params'] for record in records]
+        for record in records:
+            completed = [t for t in record.get('trials', []) if t.get('state') == 'completed']
+            completed.sort(key=lambda t: (t.get('rung', 0), t.get('score') or -np.inf), reverse=True)
+            candidates.extend(t['params'] for t in completed)
+        
+        unique, seen = [], set()
+        for params in candidates:
+            key = json.dumps(params, sort_keys=True, default=_to_json)
+            if key not in seen:
+                seen.add(key)
+                unique.append(params)
+        return unique[:top_k]
@@ -2,10 +2,13 @@
 Обновленный основной пайплайн с улучшенными моделями
 """
 
+import argparse
 import logging
 import sys
 from pathlib import Path
 
+import pandas as pd
+
 # Добавляем пути для импорта
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
@@ -17,7 +20,7 @@ from enhanced_predictor import EnhancedEmploymentPredictor
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def main():
+def main(resume=False):
     """Обновленный основной пайплайн с улучшенными моделями"""
     
     logger.info("🚀 Запуск улучшенного пайплайна ML моделей...")
@@ -40,7 +43,7 @@ def main():
         
         # Обучение улучшенных моделей
         logger.info("🎯 Обучение улучшенных моделей...")
-        success = enhanced_predictor.train(graduates_df)
+        success = enhanced_predictor.train(graduates_df, resume=resume)
         
         if success:
             logger.info("✅ Обучение завершено успешно!")
@@ -55,15 +58,15 @@ def main():
                 for feature, importance in feature_importance:
                     logger.info(f"   {feature}: {importance:.4f}")
             
-            # Демонстрация прогнозирования
+            # Демонстрация прогнозирования (одним пакетом)
             logger.info("🔮 Тестирование прогнозирования...")
             test_data = graduates_df.iloc[:3]  # Тестируем на 3 примерах
-            for i in range(len(test_data)):
-                student_data = test_data.iloc[[i]]
-                probability = enhanced_predictor.predict_employment_probability(student_data)
-                actual_employment = student_data['employed'].iloc[0]
-                
-                logger.info(f"   Студент {i+1}: Прогноз={probability:.1%}, Факт={'Трудоустроен' if actual_employment else 'Не трудоустроен'}")
+            scored = enhanced_predictor.score_cohort(test_data)
+            if scored is not None:
+                for i, row in scored.iterrows():
+                    logger.info(f"   Студент {i+1}: Прогноз={row['employment_probability']:.1%}, "
+                                f"Зарплата={row['salary_prediction']:.0f} BYN, "
+                                f"Факт={'Трудоустроен' if row['employed'] else 'Не трудоустроен'}")
             
             # Метрики производительности
             metrics = enhanced_predictor.get_model_performance()
@@ -81,5 +84,68 @@ def main():
         import traceback
         logger.error(traceback.format_exc())
 
+def update(new_cohort_path):
+    """Дообучение сохраненных моделей на новой когорте выпускников"""
+    
+    logger.info(f"🔁 Дообучение на новой когорте: {new_cohort_path}")
+    
+    try:
+        new_cohort_df = pd.read_csv(new_cohort_path)
+        logger.info(f"✅ Загружено {len(new_cohort_df)} записей новой когорты")
+        
+        enhanced_predictor = EnhancedEmploymentPredictor(use_ensemble=True)
+        enhanced_predictor.load_models()
+        
+        # История нужна только для полного переобучения, если дообучение не пройдет проверку
+        graduates_df = RealDataLoader().load_graduates_data()
+        
+        if enhanced_predictor.update(new_cohort_df, graduates_df):
+            enhanced_predictor.save_models()
+            last_update = enhanced_predictor.advanced_predictor.last_update_ or {}
+            logger.info(f"✅ Модели обновлены (режим: {last_update.get('mode', 'unknown')})")
+        else:
+            logger.error("❌ Дообучение моделей не удалось")
+            
+    except Exception as e:
+        logger.error(f"❌ Критическая ошибка дообучения: {e}")
+        import traceback
+        logger.error(traceback.format_exc())
+
+def score(cohort_path, output_path=None):
+    """Ночная оценка когорты сохраненными моделями: результат - CSV рядом с исходным файлом"""
+    
+    output_path = output_path or Path(cohort_path).with_name(f"{Path(cohort_path).stem}_scored.csv")
+    logger.info(f"🔮 Оценка когорты: {cohort_path} → {output_path}")
+    
+    try:
+        enhanced_predictor = EnhancedEmploymentPredictor(use_ensemble=True)
+        enhanced_predictor.load_models()
+        
+        if enhanced_predictor.score_cohort(cohort_path, output_path) is not None:
+            logger.info(f"✅ Когорта оценена: {output_path}")
+        else:
+            logger.error("❌ Оценка когорты не удалась")
+            
+    except Exception as e:
+        logger.error(f"❌ Критическая ошибка оценки когорты: {e}")
+        import traceback
+        logger.error(traceback.format_exc())
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Обучение улучшенных ML моделей")
+    parser.add_argument('--update', metavar='CSV',
+                        help="дообучить сохраненные модели на новой когорте вместо полного обучения")
+    parser.add_argument('--resume', action='store_true',
+                        help="продолжить прерванное обучение с последнего сохраненного этапа")
+    parser.add_argument('--score', metavar='CSV',
+                        help="оценить когорту сохраненными моделями (вероятность, зарплата, версия модели)")
+    parser.add_argument('--output', metavar='CSV',
+                        help="файл результатов для --score (по умолчанию <имя>_scored.csv)")
+    args = parser.parse_args()
+    
+    if args.score:
+        score(args.score, args.output)
+    elif args.update:
+        update(args.update)
+    else:
+        main(resume=args.resume)
\ No newline at end of file
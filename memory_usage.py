@@ -0,0 +1,52 @@
+# memory_usage.py
+"""
+Пиковое потребление памяти (peak RSS) по этапам обучения
+
+Пик берется из resource.getrusage: это максимум за всю жизнь процесса, поэтому
+для каждого этапа видно, насколько он поднял максимум. Воркеры loky живут
+дольше этапа и в RUSAGE_CHILDREN не попадают - пик учитывает только основной
+процесс (большие массивы передаются воркерам через memmap и сюда уже входят).
+На Windows модуля resource нет, и отчет остается пустым.
+"""
+
+import sys
+import time
+import logging
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+def peak_rss_mb():
+    """Пиковый RSS текущего процесса в МБ (None, если платформа не поддерживает)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss - в килобайтах на Linux и в байтах на macOS
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+class StageMemoryReport:
+    """Пик RSS после каждого этапа и прирост пика относительно предыдущего этапа"""
+    
+    def __init__(self):
+        self.stages = {}
+        self._last_peak = peak_rss_mb()
+        self._last_time = time.time()
+    
+    def mark(self, stage):
+        """Завершение этапа stage: запись пика памяти и длительности"""
+        peak = peak_rss_mb()
+        now = time.time()
+        if peak is not None:
+            self.stages[stage] = {
+                'peak_rss_mb': round(peak, 1),
+                'peak_growth_mb': round(peak - self._last_peak, 1),
+                'seconds': round(now - self._last_time, 2)
+            }
+            logger.info(f"📈 Этап '{stage}': пик RSS {peak:.0f} МБ (+{peak - self._last_peak:.0f} МБ), "
+                        f"{now - self._last_time:.1f} с")
+        self._last_peak, self._last_time = peak, now
+        return self
@@ -0,0 +1,216 @@
+# model_bundle.py
+"""
+Пакет модели: манифест и отдельные файлы компонентов
+
+Каждое сохранение пишется в новый каталог <каталог пакета>/<версия пакета>/ -
+по файлу joblib на компонент (признаки, ансамбль, модель зарплаты...) и
+manifest.json с версией формата, версией пакета и модели, размерами файлов и
+метаданными. manifest.json в корне пакета указывает на текущую версию. Версия
+пакета уникальна (время и случайный суффикс), поэтому повторное сохранение,
+даже в ту же секунду и той же версии модели, никогда не перезаписывает файлы,
+которые другие процессы держат отображенными в память.
+
+Файлы пишутся без сжатия, поэтому массивы NumPy внутри компонентов
+загружаются через joblib.load(mmap_mode='r') как отображения файла: воркеры
+Streamlit и сервиса оценки делят одни страницы памяти. Компоненты
+загружаются при первом обращении (LazyComponent): страница без прогнозов не
+читает ансамбль вовсе. Процесс, начавший работу со старой версией, догружает
+компоненты из каталога своей версии, даже если рядом уже сохранена новая.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+import joblib
+import logging
+
+from config import ML_CONFIG
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_FORMAT_VERSION = 2  # 2 - каталог версии назван bundle_version, а не model_version
+MANIFEST_FILE = 'manifest.json'
+
+def new_version_id():
+    """Уникальная версия: время до секунды для читаемости и случайный суффикс"""
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+def _write_json(path, data):
+    """Запись JSON через временный файл и атомарную замену"""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+def bundle_exists(directory):
+    return (Path(directory) / MANIFEST_FILE).exists()
+
+def _created(version_dir):
+    with open(version_dir / MANIFEST_FILE, encoding='utf-8') as f:
+        return datetime.fromisoformat(json.load(f)['created'])
+
+def save_bundle(directory, components, model_version=None, metadata=None, keep_versions=None):
+    """Сохранение компонентов (словарь имя -> объект) новой версией пакета
+    
+    Компоненты None пропускаются. Манифест текущей версии заменяется последним,
+    поэтому читатели видят либо старую, либо полностью записанную новую версию.
+    keep_versions - сколько последних версий оставить на диске (не меньше 1,
+    новая версия не удаляется никогда); None - из ML_CONFIG['model_bundle'],
+    где None означает не удалять старые версии. Возвращает манифест.
+    """
+    settings = ML_CONFIG.get('model_bundle', {})
+    if keep_versions is None:
+        keep_versions = settings.get('keep_versions', 3)
+    if keep_versions is not None and keep_versions < 1:
+        raise ValueError(f"keep_versions должно быть не меньше 1, получено {keep_versions}")
+    
+    directory = Path(directory)
+    bundle_version = new_version_id()
+    version_dir = directory / bundle_version
+    directory.mkdir(parents=True, exist_ok=True)
+    version_dir.mkdir()  # каталог уже существующей версии не перезаписывается (FileExistsError)
+    
+    entries = {}
+    for name, component in components.items():
+        if component is None:
+            continue
+        path = version_dir / f'{name}.joblib'
+        tmp_path = path.with_suffix('.tmp')
+        joblib.dump(component, tmp_path)  # без сжатия: массивы можно отобразить в память
+        os.replace(tmp_path, path)
+        entries[name] = {'file': path.name, 'bytes': path.stat().st_size}
+    
+    manifest = {
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'bundle_version': bundle_version,
+        'model_version': model_version or bundle_version,
+        'created': datetime.now().isoformat(timespec='microseconds'),
+        'components': entries,
+        'metadata': metadata or {}
+    }
+    _write_json(version_dir / MANIFEST_FILE, manifest)
+    _write_json(directory / MANIFEST_FILE, manifest)
+    
+    # Старые версии удаляются по времени создания, кроме keep_versions последних
+    # (их могут догружать живые процессы)
+    if keep_versions is not None:
+        versions = sorted((path for path in directory.iterdir()
+                           if path.is_dir() and (path / MANIFEST_FILE).exists()), key=_created)
+        for old_dir in versions[:-keep_versions]:
+            if old_dir != version_dir:
+                shutil.rmtree(old_dir, ignore_errors=True)
+    
+    total_mb = sum(entry['bytes'] for entry in entries.values()) / 1024 ** 2
+    logger.info(f"💾 Пакет модели {manifest['model_version']} сохранен: {len(entries)} компонентов, "
+                f"{total_mb:.1f} МБ → {version_dir}")
+    return manifest
+
+class ModelBundle:
+    """Чтение пакета модели: манифест сразу, компоненты - по запросу
+    
+    version - версия пакета (имя каталога); по умолчанию - текущая.
+    """
+    
+    def __init__(self, directory, version=None, mmap_mode=None):
+        settings = ML_CONFIG.get('model_bundle', {})
+        self.directory = Path(directory)
+        self.mmap_mode = mmap_mode if mmap_mode is not None else settings.get('mmap_mode', 'r')
+        manifest_path = (self.directory / version / MANIFEST_FILE) if version else (self.directory / MANIFEST_FILE)
+        with open(manifest_path, encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('format_version', 0) > BUNDLE_FORMAT_VERSION:
+            raise ValueError(f"Пакет модели формата {self.manifest['format_version']} новее поддерживаемого "
+                             f"({BUNDLE_FORMAT_VERSION})")
+        self.version_dir = self.directory / self.bundle_version
+        self._components = {}
+        self._lock = threading.Lock()
+    
+    @property
+    def bundle_version(self):
+        # В пакетах формата 1 каталог версии назван версией модели
+        return self.manifest.get('bundle_version', self.manifest['model_version'])
+    
+    @property
+    def model_version(self):
+        return self.manifest['model_version']
+    
+    @property
+    def metadata(self):
+        return self.manifest.get('metadata', {})
+    
+    def has(self, name):
+        return name in self.manifest['components']
+    
+    def load(self, name):
+        """Компонент name (загружается один раз на процесс)"""
+        if name in self._components:
+            return self._components[name]
+        with self._lock:
+            if name not in self._components:
+                entry = self.manifest['components'][name]
+                path = self.version_dir / entry['file']
+                if path.stat().st_size != entry['bytes']:
+                    raise ValueError(f"Файл компонента {path} не совпадает с манифестом")
+                start = time.time()
+                self._components[name] = joblib.load(path, mmap_mode=self.mmap_mode)
+                logger.info(f"📂 Компонент '{name}' загружен за {time.time() - start:.2f} с "
+                            f"(версия {self.model_version})")
+        return self._components[name]
+    
+    def loaded_components(self):
+        return list(self._components)
+    
+    def __getstate__(self):
+        # Загруженные компоненты и блокировка не сериализуются: копия читает пакет заново
+        return {'directory': self.directory, 'version': self.bundle_version, 'mmap_mode': self.mmap_mode}
+    
+    def __setstate__(self, state):
+        self.__init__(state['directory'], state['version'], state['mmap_mode'])
+
+class LazyComponent:
+    """Атрибут класса, значение которого загружается из пакета при первом обращении
+    
+    Пакет берется из атрибута экземпляра _bundle; пока значение не присвоено и не
+    загружено, обращение читает компонент с тем же именем (или возвращает None,
+    если его нет в пакете).
+    """
+    
+    def __set_name__(self, owner, name):
+        self.name = name
+    
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        if self.name not in instance.__dict__:
+            bundle = instance.__dict__.get('_bundle')
+            has_component = bundle is not None and bundle.has(self.name)
+            instance.__dict__[self.name] = bundle.load(self.name) if has_component else None
+        return instance.__dict__[self.name]
+    
+    def __set__(self, instance, value):
+        instance.__dict__[self.name] = value
+
+def attach_bundle(instance, bundle, lazy_names):
+    """Привязка пакета к объекту: компоненты lazy_names будут загружены при обращении"""
+    instance.__dict__['_bundle'] = bundle
+    for name in lazy_names:
+        instance.__dict__.pop(name, None)
+
+if __name__ == "__main__":
+    import argparse
+    
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Перевод сохраненной модели в пакет с манифестом")
+    parser.add_argument('--model-dir', default='models_enhanced')
+    args = parser.parse_args()
+    
+    from enhanced_predictor import EnhancedEmploymentPredictor
+    enhanced_predictor = EnhancedEmploymentPredictor()
+    enhanced_predictor.load_models(args.model_dir)
+    if enhanced_predictor.is_trained:
+        enhanced_predictor.save_models(args.model_dir)
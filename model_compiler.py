@@ -0,0 +1,523 @@
+# model_compiler.py
+"""
+Компиляция обученного пайплайна в плоские массивы NumPy для быстрого CPU-инференса
+
+Деревья XGBoost, LightGBM и RandomForest выгружаются в общие массивы узлов
+(признак, порог, потомки, направление пропусков, значение листа), а
+предобработка (медианы импьютера, масштабирование, бины), калибраторы и
+логистическая мета-модель - в несколько векторов. Прогноз - векторизованный
+обход всех деревьев сразу для пачки строк. Скомпилированная модель сохраняется
+в .npz и загружается без xgboost, lightgbm и scikit-learn - нужен только NumPy.
+
+Обход выигрывает у бустингов на малых пачках (одиночные прогнозы, микропакеты
+сервиса оценки) и проигрывает на больших, поэтому AdvancedEmploymentPredictor
+отправляет в нее только пачки до ML_CONFIG['model_compiler']['max_rows'] строк.
+"""
+
+import json
+import time
+from pathlib import Path
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+NODE_ARRAYS = ('feature', 'threshold', 'children', 'default_left', 'leaf_value', 'roots')
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-z))
+
+def _float32_thresholds(threshold, strict):
+    """Пороги float32, для которых x <= порог совпадает с исходным сравнением float32-признака
+    
+    strict: x < t (t - float32, XGBoost) эквивалентно x <= ближайшее меньшее float32;
+    иначе x <= t (t - float64, LightGBM и scikit-learn) эквивалентно x <= наибольшее float32 <= t.
+    """
+    threshold = np.asarray(threshold, dtype=np.float64)
+    threshold32 = threshold.astype(np.float32)
+    lower = threshold32 >= threshold if strict else threshold32 > threshold
+    threshold32[lower] = np.nextafter(threshold32[lower], np.float32(-np.inf))
+    return threshold32
+
+class CompiledTrees:
+    """Деревья одной модели в плоских массивах узлов
+    
+    Хранятся только внутренние узлы всех деревьев подряд: признак, порог float32
+    (x > порог - вправо), направление пропуска и пара потомков в children.
+    Отрицательный потомок ~k - лист k со значением leaf_value[k]. Обход идет
+    по уровням сразу для всех пар (строка, дерево), еще не дошедших до листа.
+    aggregation - 'sum' (отступ бустинга) или 'mean' (вероятности леса), link -
+    'sigmoid' или 'identity'; float32_sum - последовательное сложение во float32
+    от base_score по деревьям, как в XGBoost.
+    """
+    
+    def __init__(self, feature, threshold, children, default_left, leaf_value, roots,
+                 aggregation='sum', link='identity', base_score=0.0, float32_sum=False, chunk_size=4096):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.default_left = default_left
+        self.leaf_value = leaf_value
+        self.roots = roots
+        self.aggregation = aggregation
+        self.link = link
+        self.base_score = float(base_score)
+        self.float32_sum = bool(float32_sum)
+        self.chunk_size = chunk_size
+    
+    @classmethod
+    def from_trees(cls, trees, strict=False, **params):
+        """Склейка деревьев: дерево - словарь массивов локальных узлов, у листа left == -1"""
+        arrays = {name: [] for name in NODE_ARRAYS}
+        n_internal = n_leaves = 0
+        
+        for tree in trees:
+            left = np.asarray(tree['left'], dtype=np.int64)
+            right = np.asarray(tree['right'], dtype=np.int64)
+            is_leaf = left < 0
+            internal, leaves = np.flatnonzero(~is_leaf), np.flatnonzero(is_leaf)
+            
+            # Сквозная нумерация: внутренние узлы - 0, 1, ..., листья - ~0, ~1, ...
+            index = np.empty(len(left), dtype=np.int64)
+            index[internal] = n_internal + np.arange(len(internal))
+            index[leaves] = ~(n_leaves + np.arange(len(leaves)))
+            
+            arrays['roots'].append(index[0])
+            arrays['feature'].append(np.asarray(tree['feature'])[internal])
+            arrays['threshold'].append(_float32_thresholds(np.asarray(tree['threshold'])[internal], strict))
+            arrays['children'].append(np.column_stack([index[left[internal]], index[right[internal]]]).ravel())
+            arrays['default_left'].append(np.asarray(tree['default_left'], dtype=bool)[internal])
+            arrays['leaf_value'].append(np.asarray(tree['value'], dtype=np.float64)[leaves])
+            n_internal += len(internal)
+            n_leaves += len(leaves)
+        
+        return cls(
+            feature=np.concatenate(arrays['feature']).astype(np.int32),
+            threshold=np.concatenate(arrays['threshold']),
+            children=np.concatenate(arrays['children']).astype(np.int32),
+            default_left=np.concatenate(arrays['default_left']),
+            leaf_value=np.concatenate(arrays['leaf_value']),
+            roots=np.asarray(arrays['roots'], dtype=np.int32),
+            **params
+        )
+    
+    @property
+    def n_trees(self):
+        return len(self.roots)
+    
+    def apply(self, X):
+        """Номера листов (n, n_trees) для C-непрерывной float32-матрицы признаков"""
+        n_rows, n_features = X.shape
+        nodes = np.tile(self.roots, n_rows)
+        row_offsets = np.repeat(np.arange(n_rows, dtype=np.int64) * n_features, self.n_trees)
+        flat_X = X.ravel()
+        has_missing = flat_X.dtype.kind == 'f' and np.isnan(flat_X).any()
+        
+        # Активные пары (строка, дерево) - еще не в листе; за шаг каждая спускается на уровень
+        active = np.flatnonzero(nodes >= 0)
+        while active.size:
+            node = nodes[active]
+            values = flat_X[row_offsets[active] + self.feature[node]]
+            go_right = values > self.threshold[node]
+            if has_missing:
+                go_right = np.where(np.isnan(values), ~self.default_left[node], go_right)
+            node = self.children[2 * node + go_right]
+            nodes[active] = node
+            active = active[node >= 0]
+        return (~nodes).reshape(n_rows, self.n_trees)
+    
+    def raw(self, X):
+        """Сумма (или среднее) значений листов по деревьям плюс base_score"""
+        X = np.ascontiguousarray(X, dtype=X.dtype if X.dtype == np.uint8 else np.float32)
+        output = np.empty(len(X))
+        for start in range(0, len(X), self.chunk_size):
+            leaf_values = self.leaf_value[self.apply(X[start:start + self.chunk_size])]
+            if self.aggregation == 'mean':
+                aggregated = leaf_values.mean(axis=1) + self.base_score
+            elif self.float32_sum:
+                terms = np.column_stack([np.full(len(leaf_values), self.base_score), leaf_values])
+                aggregated = np.cumsum(terms.astype(np.float32), axis=1, dtype=np.float32)[:, -1]
+            else:
+                aggregated = leaf_values.sum(axis=1) + self.base_score
+            output[start:start + len(aggregated)] = aggregated
+        return output
+    
+    def predict(self, X):
+        raw = self.raw(X)
+        return _sigmoid(raw) if self.link == 'sigmoid' else raw
+    
+    def to_arrays(self, prefix):
+        arrays = {f'{prefix}{name}': getattr(self, name) for name in NODE_ARRAYS}
+        params = {'aggregation': self.aggregation, 'link': self.link,
+                  'base_score': self.base_score, 'float32_sum': self.float32_sum}
+        return arrays, params
+    
+    @classmethod
+    def from_arrays(cls, arrays, prefix, params):
+        return cls(**{name: arrays[f'{prefix}{name}'] for name in NODE_ARRAYS}, **params)
+
+def _xgboost_trees(model, link, feature_map=None):
+    """Деревья XGBoost из JSON-модели бустера (пороги и листья - float32)"""
+    booster = model.get_booster()
+    dump = json.loads(booster.save_raw(raw_format='json'))
+    trees = []
+    for tree in dump['learner']['gradient_booster']['model']['trees']:
+        if any(tree.get('split_type', [])):
+            raise ValueError("Категориальные разбиения XGBoost не поддерживаются")
+        conditions = np.asarray(tree['split_conditions'], dtype=np.float32).astype(np.float64)
+        trees.append({
+            'feature': _map_features(tree['split_indices'], feature_map),
+            'threshold': conditions,
+            'left': tree['left_children'],
+            'right': tree['right_children'],
+            'default_left': tree['default_left'],
+            'value': conditions  # у листа в split_conditions хранится значение листа
+        })
+    compiled = CompiledTrees.from_trees(trees, strict=True, aggregation='sum', link=link, float32_sum=True)
+    
+    # base_score хранится в пространстве вероятности; отступ считается во float32, как в XGBoost
+    config = json.loads(booster.save_config())['learner']['learner_model_param']
+    base_score = np.float32(str(config['base_score']).strip('[]'))
+    if link == 'sigmoid':
+        base_score = np.log(base_score / (np.float32(1) - base_score))
+    compiled.base_score = float(base_score)
+    return compiled
+
+def _lightgbm_trees(model, link, feature_map=None):
+    """Деревья LightGBM из dump_model()"""
+    dump = model.booster_.dump_model()
+    trees = []
+    for info in dump['tree_info']:
+        nodes = {name: [] for name in ('feature', 'threshold', 'left', 'right', 'default_left', 'value')}
+        stack = [(info['tree_structure'], None, None)]
+        while stack:
+            node, parent, side = stack.pop()
+            index = len(nodes['left'])
+            if parent is not None:
+                nodes[side][parent] = index
+            if 'leaf_value' in node:
+                for name, value in (('feature', 0), ('threshold', 0.0), ('left', -1), ('right', -1),
+                                    ('default_left', False), ('value', node['leaf_value'])):
+                    nodes[name].append(value)
+                continue
+            if node.get('decision_type', '<=') != '<=':
+                raise ValueError("Категориальные разбиения LightGBM не поддерживаются")
+            # missing_type None: пропуск сравнивается как 0
+            default_left = (node['default_left'] if node.get('missing_type') != 'None'
+                            else 0.0 <= node['threshold'])
+            for name, value in (('feature', node['split_feature']), ('threshold', node['threshold']),
+                                ('left', -1), ('right', -1), ('default_left', default_left), ('value', 0.0)):
+                nodes[name].append(value)
+            stack.append((node['right_child'], index, 'right'))
+            stack.append((node['left_child'], index, 'left'))
+        nodes['feature'] = _map_features(nodes['feature'], feature_map)
+        trees.append(nodes)
+    aggregation = 'mean' if dump.get('average_output') else 'sum'
+    return CompiledTrees.from_trees(trees, aggregation=aggregation, link=link)
+
+def _sklearn_forest_trees(model, feature_map=None):
+    """Деревья случайного леса scikit-learn: листья - доля класса 1 (или среднее для регрессии)"""
+    trees = []
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        if hasattr(model, 'classes_'):
+            counts = tree.value[:, 0, :]
+            value = counts[:, -1] / np.maximum(counts.sum(axis=1), 1e-12)
+        else:
+            value = tree.value[:, 0, 0]
+        trees.append({
+            'feature': _map_features(np.maximum(tree.feature, 0), feature_map),
+            'threshold': tree.threshold,
+            'left': tree.children_left,
+            'right': tree.children_right,
+            'default_left': getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count, dtype=bool)),
+            'value': value
+        })
+    return CompiledTrees.from_trees(trees, aggregation='mean', link='identity')
+
+def _map_features(features, feature_map):
+    """Перевод индексов признаков подматрицы модели в индексы общей матрицы"""
+    features = np.asarray(features, dtype=np.int64)
+    return features if feature_map is None else np.asarray(feature_map)[features]
+
+def compile_tree_model(model, feature_map=None):
+    """CompiledTrees для XGBoost/LightGBM/RandomForest (в том числе в обертке ранней остановки)"""
+    while hasattr(model, 'estimator_') and not hasattr(model, 'estimators_'):
+        model = model.estimator_  # EarlyStoppingBoostedClassifier
+    
+    name = type(model).__name__
+    link = 'sigmoid' if name.endswith('Classifier') else 'identity'
+    if name in ('XGBClassifier', 'XGBRegressor'):
+        return _xgboost_trees(model, link, feature_map)
+    if name in ('LGBMClassifier', 'LGBMRegressor'):
+        return _lightgbm_trees(model, link, feature_map)
+    if name in ('RandomForestClassifier', 'RandomForestRegressor',
+                'ExtraTreesClassifier', 'ExtraTreesRegressor'):
+        return _sklearn_forest_trees(model, feature_map)
+    raise ValueError(f"Модель {name} не поддерживается компилятором")
+
+class CompiledEmploymentModel:
+    """Скомпилированный пайплайн: предобработка → деревья → калибровка → мета-модель
+    
+    На вход - числовые признаки до препроцессора (колонки feature_names, как после
+    FeatureEngineeringTransformer). Без мета-модели (одиночная модель) вероятность -
+    откалиброванный прогноз единственной базовой модели.
+    """
+    
+    def __init__(self, feature_names, medians, means, scales, bin_edges, base_models, calibrators,
+                 meta_coef=None, meta_intercept=0.0, salary_model=None, salary_log_target=False,
+                 model_version=None):
+        self.feature_names = list(feature_names)
+        self.medians = medians
+        self.means = means
+        self.scales = scales
+        self.bin_edges = bin_edges
+        self.base_models = base_models
+        self.calibrators = calibrators
+        self.meta_coef = meta_coef
+        self.meta_intercept = float(meta_intercept)
+        self.salary_model = salary_model
+        self.salary_log_target = bool(salary_log_target)
+        self.model_version = model_version
+    
+    def transform(self, features):
+        """Импутация, масштабирование и бины - как у обученного препроцессора"""
+        if hasattr(features, 'columns'):
+            features = features[self.feature_names].to_numpy(dtype=np.float64)
+        values = np.asarray(features, dtype=np.float64)
+        values = np.where(np.isnan(values), self.medians, values)
+        X = np.ascontiguousarray((values - self.means) / self.scales, dtype=np.float32)
+        if self.bin_edges is None:
+            return X
+        binned = np.empty(X.shape, dtype=np.uint8)
+        for j, edges in enumerate(self.bin_edges):
+            binned[:, j] = np.searchsorted(edges, X[:, j], side='right')
+        return binned
+    
+    def predict_processed(self, X):
+        """Вероятность трудоустройства по уже подготовленной матрице признаков"""
+        probabilities = np.column_stack([model.predict(X) for model in self.base_models])
+        if self.calibrators:
+            probabilities = np.column_stack([
+                np.interp(probabilities[:, j], x, y) for j, (x, y) in enumerate(self.calibrators)
+            ])
+        if self.meta_coef is None:
+            return probabilities[:, 0]
+        return _sigmoid(probabilities @ self.meta_coef + self.meta_intercept)
+    
+    def predict_salary_processed(self, X):
+        if self.salary_model is None:
+            return np.full(len(X), np.nan)
+        salary = self.salary_model.predict(X)
+        return np.exp(salary) if self.salary_log_target else salary
+    
+    def predict_employment_probability(self, features):
+        return self.predict_processed(self.transform(features))
+    
+    def predict_batch(self, features):
+        """Вероятность трудоустройства и зарплата одним проходом предобработки"""
+        X = self.transform(features)
+        return {'employment_probability': self.predict_processed(X),
+                'salary_prediction': self.predict_salary_processed(X)}
+    
+    def save(self, path):
+        """Сохранение в .npz (только массивы NumPy и JSON-описание, без pickle)"""
+        arrays = {'medians': self.medians, 'means': self.means, 'scales': self.scales}
+        meta = {'feature_names': self.feature_names, 'meta_intercept': self.meta_intercept,
+                'salary_log_target': self.salary_log_target, 'model_version': self.model_version,
+                'base_models': [], 'n_calibrators': len(self.calibrators),
+                'n_bin_edges': None if self.bin_edges is None else len(self.bin_edges)}
+        for i, model in enumerate(self.base_models):
+            model_arrays, params = model.to_arrays(f'base{i}_')
+            arrays.update(model_arrays)
+            meta['base_models'].append(params)
+        for i, (x, y) in enumerate(self.calibrators):
+            arrays[f'calibrator{i}_x'], arrays[f'calibrator{i}_y'] = x, y
+        for j, edges in enumerate(self.bin_edges or []):
+            arrays[f'bin_edges{j}'] = edges
+        if self.meta_coef is not None:
+            arrays['meta_coef'] = self.meta_coef
+        if self.salary_model is not None:
+            model_arrays, meta['salary_model'] = self.salary_model.to_arrays('salary_')
+            arrays.update(model_arrays)
+        
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(path, meta=np.array(json.dumps(meta, ensure_ascii=False)), **arrays)
+        logger.info(f"💾 Скомпилированная модель сохранена в {path}")
+        return path
+    
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            arrays = dict(data)
+        meta = json.loads(str(arrays['meta']))
+        bin_edges = None
+        if meta['n_bin_edges'] is not None:
+            bin_edges = [arrays[f'bin_edges{j}'] for j in range(meta['n_bin_edges'])]
+        salary_params = meta.get('salary_model')
+        return cls(
+            feature_names=meta['feature_names'],
+            medians=arrays['medians'], means=arrays['means'], scales=arrays['scales'],
+            bin_edges=bin_edges,
+            base_models=[CompiledTrees.from_arrays(arrays, f'base{i}_', params)
+                         for i, params in enumerate(meta['base_models'])],
+            calibrators=[(arrays[f'calibrator{i}_x'], arrays[f'calibrator{i}_y'])
+                         for i in range(meta['n_calibrators'])],
+            meta_coef=arrays.get('meta_coef'),
+            meta_intercept=meta['meta_intercept'],
+            salary_model=(CompiledTrees.from_arrays(arrays, 'salary_', salary_params)
+                          if salary_params else None),
+            salary_log_target=meta['salary_log_target'],
+            model_version=meta.get('model_version')
+        )
+
+def _preprocessor_statistics(feature_engineer):
+    """Медианы, средние и масштабы препроцессора (ColumnTransformer или потокового)"""
+    preprocessor = feature_engineer.preprocessor
+    if hasattr(preprocessor, 'statistics_'):  # StreamingNumericPreprocessor
+        return preprocessor.statistics_, preprocessor.scaler_.mean_, preprocessor.scaler_.scale_
+    pipeline = preprocessor.named_transformers_['num']
+    return (pipeline.named_steps['imputer'].statistics_,
+            pipeline.named_steps['scaler'].mean_, pipeline.named_steps['scaler'].scale_)
+
+def compile_predictor(predictor):
+    """Компиляция обученного AdvancedEmploymentPredictor (ансамбль или одиночная модель)"""
+    if not predictor.is_trained:
+        raise ValueError("Модель не обучена")
+    
+    engineer = predictor.feature_engineer
+    medians, means, scales = _preprocessor_statistics(engineer)
+    binner = getattr(engineer, 'binner', None)
+    
+    if predictor.use_ensemble and predictor.ensemble_predictor is not None:
+        stacking = predictor.ensemble_predictor.ensemble_model
+        meta_model = stacking.final_estimator_
+        if not hasattr(meta_model, 'coef_'):
+            raise ValueError(f"Мета-модель {type(meta_model).__name__} не поддерживается компилятором")
+        base_models = [compile_tree_model(model) for model in stacking.estimators_]
+        calibrators = [(c.x_, c.y_) for c in stacking.calibrators_]
+        meta_coef, meta_intercept = meta_model.coef_[0], meta_model.intercept_[0]
+    else:
+        model = predictor.model
+        base_models = [compile_tree_model(model.model)]
+        calibrators = [(model.calibrator_.x_, model.calibrator_.y_)] if model.is_calibrated else []
+        meta_coef, meta_intercept = None, 0.0
+    
+    salary_model, salary_log_target = None, False
+    regressor = getattr(predictor, 'salary_model', None)
+    if regressor is not None:
+        salary_model = compile_tree_model(regressor.estimator_, feature_map=regressor.feature_columns_)
+        salary_log_target = regressor.log_target
+    
+    compiled = CompiledEmploymentModel(
+        feature_names=engineer.get_feature_names(),
+        medians=np.asarray(medians, dtype=np.float64),
+        means=np.asarray(means, dtype=np.float64),
+        scales=np.asarray(scales, dtype=np.float64),
+        bin_edges=None if binner is None else [np.asarray(edges) for edges in binner.bin_edges_],
+        base_models=base_models, calibrators=calibrators,
+        meta_coef=meta_coef, meta_intercept=meta_intercept,
+        salary_model=salary_model, salary_log_target=salary_log_target,
+        model_version=getattr(predictor, 'model_version', None)
+    )
+    n_trees = sum(model.n_trees for model in base_models)
+    logger.info(f"⚙️ Модель скомпилирована: {len(base_models)} базовых моделей, {n_trees} деревьев")
+    return compiled
+
+def numeric_features(predictor, df):
+    """Числовые признаки до препроцессора (вход скомпилированной модели)"""
+    engineer = predictor.feature_engineer
+    df = engineer.add_missing_columns(df)
+    transformed = engineer.feature_transformer.transform(df, features=engineer.numeric_features)
+    return transformed[engineer.get_feature_names()]
+
+def _reference_predictions(predictor, df):
+    """Прогноз исходных моделей на тех же данных, что получает скомпилированная модель"""
+    if not predictor.is_trained:
+        raise ValueError("Исходный пайплайн не вернул прогноз: модель не обучена")
+    original = predictor.predict_batch(predictor.feature_engineer.add_missing_columns(df), use_compiled=False)
+    if original is None:
+        raise ValueError("Исходный пайплайн не вернул прогноз: модель не обучена или данные не подходят")
+    return original
+
+def verify_compiled(predictor, compiled, df, atol=5e-4, rtol=1e-5):
+    """Сравнение прогнозов скомпилированной модели с исходным пайплайном
+    
+    Возвращает отчет: максимальные расхождения вероятности (абсолютное) и зарплаты
+    (относительное), время обоих вариантов и passed - все ли в пределах допуска.
+    XGBoost суммирует листья во float32, и разница порядка 1e-7 на отдельных строках
+    усиливается ступенями изотонического калибратора - отсюда допуск 5e-4 по вероятности.
+    """
+    start = time.time()
+    original = _reference_predictions(predictor, df)
+    original_seconds = time.time() - start
+    
+    features = numeric_features(predictor, df)
+    start = time.time()
+    predictions = compiled.predict_batch(features)
+    compiled_seconds = time.time() - start
+    
+    probability_diff = float(np.max(np.abs(
+        predictions['employment_probability'] - original['employment_probability'].to_numpy()
+    )))
+    salary_diff = 0.0
+    if compiled.salary_model is not None:
+        expected = original['salary_prediction'].to_numpy()
+        salary_diff = float(np.max(np.abs(predictions['salary_prediction'] - expected) / np.abs(expected)))
+    
+    report = {
+        'n_rows': len(df),
+        'max_probability_diff': probability_diff,
+        'max_salary_relative_diff': salary_diff,
+        'original_seconds': original_seconds,
+        'compiled_seconds': compiled_seconds,
+        'passed': probability_diff <= atol and salary_diff <= rtol
+    }
+    status = "✅" if report['passed'] else "❌"
+    logger.info(f"{status} Проверка компиляции на {len(df)} строках: Δp={probability_diff:.2e}, "
+                f"Δзарплаты={salary_diff:.2e}, {original_seconds:.3f} с → {compiled_seconds:.3f} с")
+    return report
+
+def benchmark_compiled(predictor, compiled, df, batch_sizes=(1, 100, 10_000)):
+    """Время прогноза исходного пайплайна и скомпилированной модели по размерам пачки
+    
+    Возвращает словарь {размер пачки: {'original_ms', 'compiled_ms'}} (время одного вызова).
+    """
+    features = numeric_features(predictor, df)
+    results = {}
+    for batch_size in batch_sizes:
+        batch, batch_features = df.iloc[:batch_size], features.iloc[:batch_size]
+        start = time.time()
+        _reference_predictions(predictor, batch)
+        original_ms = (time.time() - start) * 1000
+        start = time.time()
+        compiled.predict_batch(batch_features)
+        compiled_ms = (time.time() - start) * 1000
+        
+        results[len(batch)] = {'original_ms': original_ms, 'compiled_ms': compiled_ms}
+        logger.info(f"🏁 Пачка {len(batch)} строк: {original_ms:.1f} мс → {compiled_ms:.1f} мс "
+                    f"(x{original_ms / compiled_ms:.1f})")
+    return results
+
+if __name__ == "__main__":
+    import argparse
+    import pandas as pd
+    from enhanced_predictor import EnhancedEmploymentPredictor
+    
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Компиляция сохраненной модели в массивы NumPy")
+    parser.add_argument('--model-dir', default='models_enhanced')
+    parser.add_argument('--output', default='models_enhanced/compiled_model.npz')
+    parser.add_argument('--verify', metavar='CSV', help="проверить совпадение прогнозов на данных из CSV")
+    args = parser.parse_args()
+    
+    enhanced_predictor = EnhancedEmploymentPredictor()
+    enhanced_predictor.load_models(args.model_dir)
+    compiled_model = compile_predictor(enhanced_predictor.advanced_predictor)
+    compiled_model.save(args.output)
+    if args.verify:
+        verification_data = pd.read_csv(args.verify)
+        loaded_model = CompiledEmploymentModel.load(args.output)
+        verify_compiled(enhanced_predictor.advanced_predictor, loaded_model, verification_data)
+        benchmark_compiled(enhanced_predictor.advanced_predictor, loaded_model, verification_data)
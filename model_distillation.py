@@ -0,0 +1,207 @@
+# model_distillation.py
+"""
+Дистилляция ансамбля в быструю модель для интерактивных прогнозов
+
+Стекинг EnsembleEmploymentPredictor (несколько бустингов, лес, калибраторы,
+мета-модель) точен, но на одного студента отвечает десятки миллисекунд.
+Ученик - неглубокий LightGBM с целевой функцией cross_entropy - обучается на
+вероятностях ансамбля (а не на исходных метках) по большой синтетической
+выборке RealisticDataProvider на тех же признаках AdvancedFeatureEngineer.
+Отчет о верности (максимальное и среднее отклонение от ансамбля, разница
+ROC-AUC) и ускорении сохраняется вместе с учеником; интерактивные прогнозы
+переходят на ученика, только если отчет прошел пороги ML_CONFIG['distillation'].
+"""
+
+import time
+import numpy as np
+from lightgbm import LGBMRegressor
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+import logging
+
+from config import ML_CONFIG
+from parallelism import get_parallelism_budget
+
+logger = logging.getLogger(__name__)
+
+# Показатели студента, которые перемешиваются в части выборки (ввод со слайдеров)
+AUGMENTED_COLUMNS = ('gpa', 'internships', 'projects', 'certificates')
+
+DEFAULT_STUDENT_PARAMS = {
+    'n_estimators': 300,
+    'num_leaves': 15,
+    'max_depth': 4,
+    'learning_rate': 0.1,
+    'min_child_samples': 20,
+    'verbose': -1
+}
+
+def distillation_sample(n_samples=None, augment_fraction=None, random_state=42):
+    """Синтетическая выборка выпускников для дистилляции
+    
+    Строки берутся из RealisticDataProvider; в доле augment_fraction строк
+    показатели AUGMENTED_COLUMNS независимо перемешиваются между строками,
+    чтобы ученик видел и сочетания, редкие в статистике, но возможные на странице.
+    """
+    from data_provider import RealisticDataProvider
+    
+    settings = ML_CONFIG.get('distillation', {})
+    n_samples = n_samples or settings.get('n_samples', 100_000)
+    augment_fraction = settings.get('augment_fraction', 0.3) if augment_fraction is None else augment_fraction
+    
+    sample = RealisticDataProvider().generate_real_graduates(n_samples).reset_index(drop=True)
+    rng = np.random.RandomState(random_state)
+    augmented = rng.rand(len(sample)) < augment_fraction
+    for column in AUGMENTED_COLUMNS:
+        if column in sample.columns:
+            values = sample.loc[augmented, column].to_numpy()
+            sample.loc[augmented, column] = rng.permutation(values)
+    
+    logger.info(f"🎓 Выборка для дистилляции: {len(sample):,} строк, перемешано {int(augmented.sum()):,}")
+    return sample
+
+class DistilledEmploymentModel:
+    """Неглубокий бустинг, повторяющий вероятности ансамбля
+    
+    teacher_version - версия модели-учителя: после переобучения или дообновления
+    ученик устаревает и не используется, пока дистилляция не будет повторена.
+    """
+    
+    def __init__(self, params=None, random_state=42):
+        self.params = {**DEFAULT_STUDENT_PARAMS, **(params or {})}
+        self.random_state = random_state
+        self.model = None
+        self.teacher_version = None
+        self.report_ = {}
+    
+    def fit(self, X, teacher_probability, teacher_version=None):
+        model = LGBMRegressor(objective='cross_entropy', random_state=self.random_state, **self.params)
+        get_parallelism_budget().configure_estimator(model)
+        model.fit(X, np.clip(teacher_probability, 0.0, 1.0))
+        self.model = model
+        self.teacher_version = teacher_version
+        return self
+    
+    def predict_employment_probability(self, X):
+        return np.clip(self.model.predict(X), 0.0, 1.0)
+    
+    @property
+    def passed(self):
+        return bool(self.report_.get('passed', False))
+
+def fidelity_report(teacher_probability, student_probability, y_true=None, thresholds=None):
+    """Верность ученика: отклонения от учителя и разница ROC-AUC по истинным меткам
+    
+    Порог ставится на 99-й перцентиль отклонения, а не на максимум: калиброванный
+    стекинг дает единичные резкие выбросы, которые неглубокий ученик не повторяет,
+    но которые почти не встречаются на реальном вводе. Максимум попадает в отчет.
+    """
+    settings = ML_CONFIG.get('distillation', {})
+    thresholds = {
+        'p99_abs_deviation': settings.get('p99_abs_deviation', 0.1),
+        'mean_abs_deviation': settings.get('mean_abs_deviation', 0.015),
+        'max_auc_delta': settings.get('max_auc_delta', 0.005),
+        **(thresholds or {})
+    }
+    deviation = np.abs(np.asarray(student_probability) - np.asarray(teacher_probability))
+    report = {
+        'n_rows': len(deviation),
+        'max_abs_deviation': float(deviation.max()),
+        'mean_abs_deviation': float(deviation.mean()),
+        'p99_abs_deviation': float(np.quantile(deviation, 0.99)),
+        'auc_delta': None
+    }
+    passed = (report['p99_abs_deviation'] <= thresholds['p99_abs_deviation']
+              and report['mean_abs_deviation'] <= thresholds['mean_abs_deviation'])
+    
+    if y_true is not None and len(np.unique(y_true)) == 2:
+        teacher_auc = roc_auc_score(y_true, teacher_probability)
+        student_auc = roc_auc_score(y_true, student_probability)
+        report.update(teacher_auc=float(teacher_auc), student_auc=float(student_auc),
+                      auc_delta=float(teacher_auc - student_auc))
+        passed = passed and report['auc_delta'] <= thresholds['max_auc_delta']
+    
+    report['thresholds'] = thresholds
+    report['passed'] = bool(passed)
+    return report
+
+def _teacher(predictor):
+    """Модель, которую повторяет ученик: ансамбль или одиночная модель предсказателя"""
+    if predictor.use_ensemble and predictor.ensemble_predictor is not None:
+        return predictor.ensemble_predictor
+    return predictor.model
+
+def _best_time(function, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def measure_latency(predictor, student, df, batch_sizes=(1, 100, 10_000), repeats=5):
+    """Время прогноза учителя и ученика (вместе с подготовкой признаков) в миллисекундах"""
+    teacher = _teacher(predictor)
+    latency = {}
+    for batch_size in batch_sizes:
+        batch = df.head(batch_size)
+        prepare = lambda: predictor.feature_engineer.prepare_features(batch, fit=False)[0]
+        teacher_s = _best_time(lambda: teacher.predict_employment_probability(prepare()), repeats)
+        student_s = _best_time(lambda: student.predict_employment_probability(prepare()), repeats)
+        latency[len(batch)] = {'teacher_ms': teacher_s * 1e3, 'student_ms': student_s * 1e3,
+                               'speedup': teacher_s / student_s}
+        logger.info(f"⏱️ {len(batch):>6} строк: ансамбль {teacher_s * 1e3:.1f} мс, "
+                    f"ученик {student_s * 1e3:.1f} мс (x{teacher_s / student_s:.1f})")
+    return latency
+
+def distill_predictor(predictor, sample=None, n_samples=None, target_column='employed', test_size=0.2):
+    """Дистилляция обученного AdvancedEmploymentPredictor
+    
+    sample - DataFrame выпускников (по умолчанию - distillation_sample). Ученик
+    учится на вероятностях учителя по train-части, верность проверяется на
+    отложенной части (ROC-AUC - по колонке target_column, если она есть).
+    Возвращает ученика с отчетом в report_ (passed - прошел ли он пороги).
+    """
+    settings = ML_CONFIG.get('distillation', {})
+    if sample is None:
+        sample = distillation_sample(n_samples, random_state=predictor.random_state)
+    teacher = _teacher(predictor)
+    
+    start = time.time()
+    X, _, _ = predictor.feature_engineer.prepare_features(sample, fit=False)
+    teacher_probability = teacher.predict_employment_probability(X)
+    y_true = sample[target_column].to_numpy() if target_column in sample.columns else None
+    
+    train_idx, test_idx = train_test_split(np.arange(len(X)), test_size=test_size,
+                                           random_state=predictor.random_state)
+    student = DistilledEmploymentModel(settings.get('params'), predictor.random_state)
+    student.fit(X[train_idx], teacher_probability[train_idx], predictor.model_version)
+    
+    report = fidelity_report(teacher_probability[test_idx], student.predict_employment_probability(X[test_idx]),
+                             None if y_true is None else y_true[test_idx])
+    report['fit_seconds'] = time.time() - start
+    report['latency'] = measure_latency(predictor, student, sample.iloc[test_idx])
+    student.report_ = report
+    
+    status = "✅ прошел пороги" if report['passed'] else "⚠️ не прошел пороги, остается ансамбль"
+    auc_text = f", ΔROC-AUC {report['auc_delta']:.4f}" if report['auc_delta'] is not None else ""
+    logger.info(f"🏁 Ученик {status}: отклонение макс {report['max_abs_deviation']:.4f}, "
+                f"p99 {report['p99_abs_deviation']:.4f}, сред {report['mean_abs_deviation']:.4f}{auc_text}")
+    return student
+
+if __name__ == "__main__":
+    import argparse
+    
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Дистилляция ансамбля в быструю модель для дашборда")
+    parser.add_argument('--model-dir', default='models_enhanced')
+    parser.add_argument('--n-samples', type=int, default=None,
+                        help="размер синтетической выборки (по умолчанию - из ML_CONFIG['distillation'])")
+    args = parser.parse_args()
+    
+    from enhanced_predictor import EnhancedEmploymentPredictor
+    enhanced_predictor = EnhancedEmploymentPredictor()
+    enhanced_predictor.load_models(args.model_dir)
+    if enhanced_predictor.is_trained:
+        enhanced_predictor.advanced_predictor.distill(n_samples=args.n_samples)
+        enhanced_predictor.save_models(args.model_dir)
@@ -0,0 +1,360 @@
+# model_explanations.py
+"""
+Объяснения прогнозов: вклад каждого признака в вероятность трудоустройства студента
+
+Вклады базовых моделей считаются атрибуцией по пути в деревьях: изменение
+ожидаемого значения узла на каждом разбиении приписывается признаку
+разбиения. Сумма вкладов вдоль пути зависит только от листа, поэтому для всех
+листьев всех деревьев она считается один раз в разреженную таблицу, а
+объяснение пакета строк - это номера их листов (pred_leaf / apply) и одно
+умножение разреженных матриц. Точный TreeSHAP XGBoost/LightGBM (pred_contribs)
+доступен как ML_CONFIG['explanations']['method'] = 'tree_shap'.
+
+Вклады базовых моделей переносятся через калибраторы и мета-модель стекинга
+правилом пропорционального масштабирования, поэтому сумма вкладов строки плюс
+базовое значение в точности равна вероятности ансамбля. Все, что не зависит
+от строк, хранится в ModelExplainer и пересчитывается только при смене версии модели.
+"""
+
+import json
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from xgboost import DMatrix
+import logging
+
+from config import ML_CONFIG
+
+logger = logging.getLogger(__name__)
+
+CONTRIBUTION_PREFIX = 'contrib_'
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-z))
+
+def _rescale(contributions, delta_out, delta_in):
+    """Масштабирование вкладов так, чтобы их сумма стала равна delta_out"""
+    ratio = np.divide(delta_out, delta_in, out=np.zeros_like(delta_out, dtype=np.float64),
+                      where=np.abs(delta_in) > 1e-12)
+    return contributions * ratio[:, None]
+
+def _xgboost_nodes(model):
+    """Узлы деревьев XGBoost: потомки, признак, значение листа, покрытие (сумма гессиана)"""
+    dump = json.loads(model.get_booster().save_raw(raw_format='json'))
+    trees = []
+    for tree in dump['learner']['gradient_booster']['model']['trees']:
+        left = np.asarray(tree['left_children'], dtype=np.int64)
+        trees.append({
+            'left': left,
+            'right': np.asarray(tree['right_children'], dtype=np.int64),
+            'feature': np.asarray(tree['split_indices'], dtype=np.int64),
+            'value': np.asarray(tree['split_conditions'], dtype=np.float64),  # у листа - значение листа
+            'cover': np.asarray(tree['sum_hessian'], dtype=np.float64),
+            'leaf_nodes': None  # pred_leaf возвращает номер узла
+        })
+    return trees
+
+def _lightgbm_nodes(model):
+    """Узлы деревьев LightGBM из dump_model() в порядке обхода в глубину
+
+    Покрытие - число обучающих строк в узле, как в TreeSHAP LightGBM (а не сумма гессиана).
+    """
+    trees = []
+    for info in model.booster_.dump_model()['tree_info']:
+        nodes = {name: [] for name in ('left', 'right', 'feature', 'value', 'cover')}
+        leaf_nodes = {}
+        stack = [(info['tree_structure'], None, None)]
+        while stack:
+            node, parent, side = stack.pop()
+            index = len(nodes['left'])
+            if parent is not None:
+                nodes[side][parent] = index
+            if 'leaf_value' in node:
+                leaf_nodes[node.get('leaf_index', 0)] = index
+                for name, value in (('left', -1), ('right', -1), ('feature', 0),
+                                    ('value', node['leaf_value']), ('cover', node.get('leaf_count', 1))):
+                    nodes[name].append(value)
+                continue
+            for name, value in (('left', -1), ('right', -1), ('feature', node['split_feature']),
+                                ('value', node['internal_value']), ('cover', node['internal_count'])):
+                nodes[name].append(value)
+            stack.append((node['right_child'], index, 'right'))
+            stack.append((node['left_child'], index, 'left'))
+        tree = {name: np.asarray(values, dtype=np.float64 if name in ('value', 'cover') else np.int64)
+                for name, values in nodes.items()}
+        # pred_leaf возвращает номер листа, а не узла
+        tree['leaf_nodes'] = np.array([leaf_nodes[i] for i in range(len(leaf_nodes))], dtype=np.int64)
+        trees.append(tree)
+    return trees
+
+def _forest_nodes(model):
+    """Узлы деревьев леса scikit-learn: значение узла - доля класса 1"""
+    trees = []
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        counts = tree.value[:, 0, :]
+        trees.append({
+            'left': tree.children_left.astype(np.int64),
+            'right': tree.children_right.astype(np.int64),
+            'feature': np.maximum(tree.feature, 0).astype(np.int64),
+            'value': counts[:, -1] / np.maximum(counts.sum(axis=1), 1e-12),
+            'cover': tree.weighted_n_node_samples.astype(np.float64),
+            'leaf_nodes': None  # apply() возвращает номер узла
+        })
+    return trees
+
+def _node_means(tree):
+    """Ожидаемое значение каждого узла: среднее листьев поддерева, взвешенное покрытием
+    
+    Потомки во всех форматах имеют больший номер, чем родитель, поэтому узлы
+    обрабатываются от последнего к первому.
+    """
+    left, right, cover = tree['left'], tree['right'], tree['cover']
+    means = tree['value'].copy()
+    for node in range(len(left) - 1, -1, -1):
+        if left[node] >= 0:
+            l, r = left[node], right[node]
+            weight = cover[l] + cover[r]
+            means[node] = ((cover[l] * means[l] + cover[r] * means[r]) / weight if weight > 0
+                           else (means[l] + means[r]) / 2)
+    return means
+
+class TreeContributions:
+    """Вклады признаков одной древесной модели в ее сырой прогноз
+    
+    Сырой прогноз - отступ (логит) для XGBoost/LightGBM и вероятность для леса;
+    вклады строки в сумме с expected_ дают сырой прогноз.
+    
+    method='path' (по умолчанию) - атрибуция по пути: изменение ожидаемого
+    значения при переходе в потомка приписывается признаку разбиения. Вклады
+    каждого листа (сумма по его пути) считаются при создании объекта в одну
+    разреженную таблицу, и объяснение строки - это номера ее листов и сумма
+    строк таблицы. method='tree_shap' - точный TreeSHAP XGBoost/LightGBM
+    (pred_contribs; для леса - атрибуция по пути): согласованнее при
+    взаимодействиях признаков, но на порядки медленнее на глубоких деревьях.
+    """
+    
+    def __init__(self, model, n_features, method='path'):
+        while hasattr(model, 'estimator_') and not hasattr(model, 'estimators_'):
+            model = model.estimator_  # EarlyStoppingBoostedClassifier
+        self.model = model
+        self.n_features = n_features
+        self.method = method
+        name = type(model).__name__
+        
+        if name == 'XGBClassifier':
+            self.kind, self.link, trees = 'xgboost', 'sigmoid', _xgboost_nodes(model)
+        elif name == 'LGBMClassifier':
+            self.kind, self.link, trees = 'lightgbm', 'sigmoid', _lightgbm_nodes(model)
+        elif name in ('RandomForestClassifier', 'ExtraTreesClassifier'):
+            self.kind, self.link, trees = 'forest', 'identity', _forest_nodes(model)
+        else:
+            raise ValueError(f"Модель {name} не поддерживается объяснениями")
+        
+        self._build_leaf_table(trees)
+        # Сдвиг сырого прогноза, не зависящий от деревьев (base_score XGBoost): по одной строке
+        probe = np.zeros((1, n_features))
+        self._offset = float(self._raw_prediction(probe)[0] - self._tree_sum(self._leaf_rows(probe))[0])
+        self.expected_ = self._offset + self._tree_weight * self._root_means.sum()
+        if method == 'tree_shap' and self.kind != 'forest':
+            # Базовое значение TreeSHAP - его собственный столбец смещения
+            phi, raw = self.contributions(probe)
+            self.expected_ = float(raw[0] - phi[0].sum())
+    
+    def _build_leaf_table(self, trees):
+        """Таблица вкладов листьев (узлы всех деревьев × признаки) и фоновые значения"""
+        self._tree_weight = 1.0 / len(trees) if self.kind == 'forest' else 1.0
+        offsets = np.cumsum([0] + [len(tree['left']) for tree in trees])
+        parents, features, means, is_leaf = [], [], [], []
+        for offset, tree in zip(offsets, trees):
+            parent = np.full(len(tree['left']), -1, dtype=np.int64)
+            internal = np.flatnonzero(tree['left'] >= 0)
+            parent[tree['left'][internal]] = offset + internal
+            parent[tree['right'][internal]] = offset + internal
+            parents.append(parent)
+            features.append(tree['feature'])
+            means.append(_node_means(tree))
+            is_leaf.append(tree['left'] < 0)
+        parent, feature = np.concatenate(parents), np.concatenate(features)
+        mean, leaves = np.concatenate(means), np.flatnonzero(np.concatenate(is_leaf))
+        
+        # Подъем от всех листьев к корням сразу: ребро (узел <- родитель) дает вклад признаку родителя
+        rows, cols, data = [], [], []
+        table_rows, current = leaves, leaves
+        while len(current):
+            up = parent[current]
+            active = up >= 0
+            table_rows, current, up = table_rows[active], current[active], up[active]
+            rows.append(table_rows)
+            cols.append(feature[up])
+            data.append((mean[current] - mean[up]) * self._tree_weight)
+            current = up
+        
+        self._leaf_table = sparse.csr_matrix(
+            (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(len(parent), self.n_features)
+        )
+        self._leaf_values = mean * self._tree_weight
+        self._root_means = mean[offsets[:-1]]
+        self._offsets = offsets[:-1]
+        self._leaf_nodes = [tree['leaf_nodes'] for tree in trees]
+    
+    def _leaf_rows(self, X):
+        """Номера строк таблицы (узлов-листьев) для каждой строки X и каждого дерева"""
+        if self.kind == 'xgboost':
+            leaves = self.model.get_booster().predict(DMatrix(X), pred_leaf=True).astype(np.int64)
+        elif self.kind == 'lightgbm':
+            leaves = np.asarray(self.model.booster_.predict(X, pred_leaf=True), dtype=np.int64)
+            leaves = np.column_stack([nodes[leaves[:, t]] for t, nodes in enumerate(self._leaf_nodes)])
+        else:
+            leaves = self.model.apply(X).astype(np.int64)
+        return leaves.reshape(len(X), -1) + self._offsets
+    
+    def _tree_sum(self, leaf_rows):
+        return self._leaf_values[leaf_rows].sum(axis=1)
+    
+    def _raw_prediction(self, X):
+        if self.kind == 'xgboost':
+            return self.model.get_booster().predict(DMatrix(X), output_margin=True).astype(np.float64)
+        if self.kind == 'lightgbm':
+            return np.asarray(self.model.booster_.predict(X, raw_score=True), dtype=np.float64)
+        return self.model.predict_proba(X)[:, 1]
+    
+    def contributions(self, X):
+        """Вклады признаков (n_rows, n_features) и сырой прогноз (n_rows,)"""
+        if self.method == 'tree_shap' and self.kind != 'forest':
+            if self.kind == 'xgboost':
+                raw = self.model.get_booster().predict(DMatrix(X), pred_contribs=True)
+            else:
+                raw = self.model.booster_.predict(X, pred_contrib=True)
+            raw = np.asarray(raw, dtype=np.float64)
+            return raw[:, :-1], raw.sum(axis=1)
+        
+        leaf_rows = self._leaf_rows(X)
+        n_rows, n_trees = leaf_rows.shape
+        indicator = sparse.csr_matrix(
+            (np.ones(leaf_rows.size), leaf_rows.ravel(), np.arange(0, leaf_rows.size + 1, n_trees)),
+            shape=(n_rows, self._leaf_table.shape[0])
+        )
+        contributions = (indicator @ self._leaf_table).toarray()
+        return contributions, self._offset + self._tree_sum(leaf_rows)
+    
+    def to_probability(self, raw):
+        return _sigmoid(raw) if self.link == 'sigmoid' else raw
+
+class ModelExplainer:
+    """Объяснения прогнозов обученного AdvancedEmploymentPredictor
+    
+    Строится один раз на версию модели (model_version): фоновые значения всех
+    базовых моделей, откалиброванные ожидаемые вероятности и базовая вероятность
+    ансамбля считаются при создании. method - 'path' или 'tree_shap' (см.
+    TreeContributions), по умолчанию из ML_CONFIG['explanations'].
+    """
+    
+    def __init__(self, predictor, method=None):
+        self.method = method or ML_CONFIG.get('explanations', {}).get('method', 'path')
+        self.model_version = getattr(predictor, 'model_version', None)
+        self.feature_names = list(predictor.feature_engineer.get_feature_names())
+        n_features = len(self.feature_names)
+        
+        if predictor.use_ensemble and predictor.ensemble_predictor is not None:
+            stacking = predictor.ensemble_predictor.ensemble_model
+            meta_model = stacking.final_estimator_
+            if not hasattr(meta_model, 'coef_'):
+                raise ValueError(f"Мета-модель {type(meta_model).__name__} не поддерживается объяснениями")
+            self.base_models = [TreeContributions(model, n_features, self.method) for model in stacking.estimators_]
+            self.calibrators = list(stacking.calibrators_)
+            self.meta_coef, self.meta_intercept = meta_model.coef_[0], float(meta_model.intercept_[0])
+        else:
+            model = predictor.model
+            self.base_models = [TreeContributions(model.model, n_features, self.method)]
+            self.calibrators = [model.calibrator_] if model.is_calibrated else []
+            self.meta_coef, self.meta_intercept = None, 0.0
+        
+        # Фон: ожидаемые значения базовых моделей после калибровки и базовая вероятность
+        self.expected_raw_ = np.array([model.expected_ for model in self.base_models])
+        self.expected_calibrated_ = self._calibrate([
+            np.array([model.to_probability(raw)]) for model, raw in zip(self.base_models, self.expected_raw_)
+        ])
+        self.base_value_ = float(self._combine(self.expected_calibrated_)[0])
+        logger.info(f"🔎 Объяснения готовы для модели {self.model_version}: {len(self.base_models)} базовых моделей, "
+                    f"базовая вероятность {self.base_value_:.3f}")
+    
+    def _calibrate_one(self, j, probability):
+        return self.calibrators[j].predict(probability) if self.calibrators else probability
+    
+    def _calibrate(self, probabilities):
+        """Откалиброванные вероятности базовых моделей, список массивов"""
+        return [self._calibrate_one(j, probability) for j, probability in enumerate(probabilities)]
+    
+    def _stack_logit(self, calibrated):
+        return self.meta_intercept + sum(coef * p for coef, p in zip(self.meta_coef, calibrated))
+    
+    def _combine(self, calibrated):
+        """Итоговая вероятность по откалиброванным вероятностям базовых моделей"""
+        if self.meta_coef is None:
+            return calibrated[0]
+        return _sigmoid(self._stack_logit(calibrated))
+    
+    def explain_processed(self, X):
+        """Вклады признаков (n_rows, n_features) в вероятность и сама вероятность
+        
+        X - подготовленные признаки (после AdvancedFeatureEngineer.prepare_features).
+        Для каждой строки base_value_ + сумма вкладов = вероятность.
+        """
+        contributions, calibrated = [], []
+        for j, model in enumerate(self.base_models):
+            phi, raw = model.contributions(X)
+            calibrated_j = self._calibrate_one(j, model.to_probability(raw))
+            calibrated.append(calibrated_j)
+            
+            # Изменение входа мета-модели (или вероятности для одиночной модели) относительно фона
+            delta_out = calibrated_j - self.expected_calibrated_[j][0]
+            if self.meta_coef is not None:
+                delta_out = self.meta_coef[j] * delta_out
+            contributions.append(_rescale(phi, delta_out, raw - self.expected_raw_[j]))
+        
+        total = np.sum(contributions, axis=0)
+        probability = self._combine(calibrated)
+        if self.meta_coef is not None:
+            # Из логита стекинга в вероятность
+            logit_delta = self._stack_logit(calibrated) - self._stack_logit(self.expected_calibrated_)
+            total = _rescale(total, probability - self.base_value_, np.asarray(logit_delta))
+        return total, probability
+    
+    def explain_frame(self, X, index=None):
+        """Объяснения в DataFrame: contrib_<признак>, base_value, employment_probability"""
+        contributions, probability = self.explain_processed(X)
+        explanations = pd.DataFrame(contributions, index=index,
+                                    columns=[CONTRIBUTION_PREFIX + name for name in self.feature_names])
+        explanations['base_value'] = self.base_value_
+        explanations['employment_probability'] = probability
+        return explanations
+
+def top_contributions(explanations, top_n=5):
+    """Главные вклады каждой строки в длинном виде: row, rank, feature, contribution
+    
+    Признаки упорядочены по модулю вклада; удобно для вывода "почему такой прогноз".
+    """
+    columns = [column for column in explanations.columns if column.startswith(CONTRIBUTION_PREFIX)]
+    values = explanations[columns].to_numpy()
+    order = np.argsort(-np.abs(values), axis=1)[:, :top_n]
+    rows = np.repeat(explanations.index.to_numpy(), order.shape[1])
+    features = np.asarray([column[len(CONTRIBUTION_PREFIX):] for column in columns])[order].ravel()
+    return pd.DataFrame({
+        'row': rows,
+        'rank': np.tile(np.arange(1, order.shape[1] + 1), len(explanations)),
+        'feature': features,
+        'contribution': np.take_along_axis(values, order, axis=1).ravel()
+    })
+
+def summarize_contributions(explanations):
+    """Сводка по когорте: средний вклад и средний модуль вклада каждого признака"""
+    columns = [column for column in explanations.columns if column.startswith(CONTRIBUTION_PREFIX)]
+    values = explanations[columns]
+    summary = pd.DataFrame({
+        'feature': [column[len(CONTRIBUTION_PREFIX):] for column in columns],
+        'mean_contribution': values.mean().to_numpy(),
+        'mean_abs_contribution': values.abs().mean().to_numpy()
+    })
+    return summary.sort_values('mean_abs_contribution', ascending=False, ignore_index=True)
@@ -14,6 +14,8 @@ from sklearn.calibration import calibration_curve
 import logging
 from datetime import datetime
 import json
+from sklearn.base import clone
+from parallelism import get_parallelism_budget
 
 logger = logging.getLogger(__name__)
 
@@ -36,13 +38,20 @@ class ModelValidator:
                 'average_precision': 'average_precision'
             }
             
-            cv_results = cross_validate(
-                model, X, y,
-                cv=StratifiedKFold(n_splits=min(cv_strategy, 5), shuffle=True, random_state=42),
-                scoring=scoring_metrics,
-                return_train_score=True,
-                n_jobs=-1
-            )
+            # Фолды параллельно, потоки модели делятся между ними
+            n_splits = min(cv_strategy, 5)
+            budget = get_parallelism_budget()
+            model = clone(model)
+            n_jobs = budget.configure_nested(model, n_splits)
+            
+            with budget.limit(n_splits):
+                cv_results = cross_validate(
+                    model, X, y,
+                    cv=StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42),
+                    scoring=scoring_metrics,
+                    return_train_score=True,
+                    n_jobs=n_jobs
+                )
             
             self.cv_results = cv_results
             
@@ -78,10 +87,15 @@ class ModelValidator:
             n_folds = min(5, len(np.unique(y)))  # Ограничиваем количество фолдов
             cv_strategy = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=42)
             
+            # 5 размеров выборки на каждый фолд - столько независимых обучений
+            budget = get_parallelism_budget()
+            model = clone(model)
+            n_jobs = budget.configure_nested(model, n_folds * 5)
+            
             train_sizes, train_scores, test_scores = learning_curve(
                 model, X, y, 
                 cv=cv_strategy,  # 🔥 ИСПРАВЛЕНО: передаем объект StratifiedKFold
-                n_jobs=-1,
+                n_jobs=n_jobs,
                 train_sizes=np.linspace(0.1, 1.0, 5),
                 scoring='accuracy',
                 random_state=42
@@ -348,11 +348,16 @@ project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
 from config import MODELS_DIR, ML_CONFIG
+from model_bundle import LazyComponent, ModelBundle, attach_bundle, bundle_exists, save_bundle
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class EmploymentPredictor:
+    # При загрузке из пакета модели читаются при первом прогнозе
+    salary_model = LazyComponent()
+    employment_model = LazyComponent()
+    
     def __init__(self):
         self.models_dir = MODELS_DIR
         self.salary_model = None
@@ -542,24 +547,34 @@ class EmploymentPredictor:
             return None
     
     def save_models(self):
-        """Сохранение моделей"""
+        """Сохранение моделей пакетом (манифест и отдельные файлы компонентов)"""
         try:
-            if self.salary_model:
-                joblib.dump(self.salary_model, self.models_dir / 'salary_model.pkl')
-            if self.employment_model:
-                joblib.dump(self.employment_model, self.models_dir / 'employment_model.pkl')
-            if hasattr(self, 'scaler'):
-                joblib.dump(self.scaler, self.models_dir / 'scaler.pkl')
-            if self.label_encoders:
-                joblib.dump(self.label_encoders, self.models_dir / 'label_encoders.pkl')
+            components = {
+                'salary_model': self.salary_model,
+                'employment_model': self.employment_model,
+                'scaler': getattr(self, 'scaler', None),
+                'label_encoders': self.label_encoders or None
+            }
+            save_bundle(self.models_dir / 'bundle', components,
+                        metadata={'feature_names': list(self.feature_names)})
             
             logger.info("✅ Модели успешно сохранены")
         except Exception as e:
             logger.error(f"❌ Ошибка сохранения моделей: {e}")
     
     def load_models(self):
-        """Загрузка моделей"""
+        """Загрузка моделей: из пакета (модели - при первом прогнозе) или из старых .pkl"""
         try:
+            if bundle_exists(self.models_dir / 'bundle'):
+                bundle = ModelBundle(self.models_dir / 'bundle')
+                self.scaler = bundle.load('scaler') if bundle.has('scaler') else StandardScaler()
+                self.label_encoders = bundle.load('label_encoders') if bundle.has('label_encoders') else {}
+                self.feature_names = bundle.metadata.get('feature_names', [])
+                attach_bundle(self, bundle, ('salary_model', 'employment_model'))
+                self.is_trained = True
+                logger.info(f"✅ Модели загружены из пакета {bundle.model_version}")
+                return
+            
             self.salary_model = joblib.load(self.models_dir / 'salary_model.pkl')
             self.employment_model = joblib.load(self.models_dir / 'employment_model.pkl')
             self.scaler = joblib.load(self.models_dir / 'scaler.pkl')
@@ -612,6 +627,15 @@ class SimplePredictor:
             'Педагогика': {'salary': 1.09, 'employment': 1.04},
             'Юриспруденция': {'salary': 1.045, 'employment': 1.012}
         }
+        # Ограничения зарплаты по рынку
+        self.salary_limits = {
+            'ИТ': (800, 6000),
+            'Медицина': (700, 5000), 
+            'Инженерия': (800, 4500),
+            'Экономика': (600, 3500),
+            'Педагогика': (500, 4000),  # ВЫШЕ ПРЕДЕЛ ИЗ-ЗА РОСТА СПРОСА
+            'Юриспруденция': (700, 3800)
+        }
     
     def predict_salary_simple(self, faculty, gpa, internships, projects, certificates, 
                             english_level, graduation_year, programming_skills=0, 
@@ -643,39 +667,89 @@ class SimplePredictor:
         current_year = 2025
         if graduation_year > current_year:
             years_ahead = graduation_year - current_year
-            if faculty == 'Педагогика':
-                growth_multiplier = 1.09 ** years_ahead
-            elif faculty == 'ИТ':
-                # ИТ: замедление после 5 лет
-                if years_ahead <= 5:
-                    growth_multiplier = 1.06 ** years_ahead
-                else:
-                    early_growth = 1.06 ** 5
-                    late_growth = 1.03 ** (years_ahead - 5)
-                    growth_multiplier = early_growth * late_growth
-            elif faculty == 'Медицина':
-                # Медицина: стабильный высокий рост
-                growth_multiplier = 1.07 ** years_ahead
-            else:
-                # Остальные: стандартный рост
-                growth_rate = self.yearly_growth_rates.get(faculty, {'salary': 1.04})['salary']
-                growth_multiplier = growth_rate ** years_ahead
-            
-            total_salary = total_salary * growth_multiplier
+            total_salary = total_salary * self._growth_multiplier(faculty, years_ahead)
         
         # Ограничения по рынку
-        salary_limits = {
-            'ИТ': (800, 6000),
-            'Медицина': (700, 5000), 
-            'Инженерия': (800, 4500),
-            'Экономика': (600, 3500),
-            'Педагогика': (500, 4000),  # ВЫШЕ ПРЕДЕЛ ИЗ-ЗА РОСТА СПРОСА
-            'Юриспруденция': (700, 3800)
-        }
-        
-        min_salary, max_salary = salary_limits.get(faculty, (600, 3000))
+        min_salary, max_salary = self.salary_limits.get(faculty, (600, 3000))
         return max(min_salary, min(total_salary, max_salary))
     
+    def _growth_multiplier(self, faculty, years_ahead):
+        """Рост зарплаты за years_ahead лет до выпуска с учетом факультета"""
+        if faculty == 'Педагогика':
+            return 1.09 ** years_ahead
+        elif faculty == 'ИТ':
+            # ИТ: замедление после 5 лет
+            if years_ahead <= 5:
+                return 1.06 ** years_ahead
+            early_growth = 1.06 ** 5
+            late_growth = 1.03 ** (years_ahead - 5)
+            return early_growth * late_growth
+        elif faculty == 'Медицина':
+            # Медицина: стабильный высокий рост
+            return 1.07 ** years_ahead
+        # Остальные: стандартный рост
+        growth_rate = self.yearly_growth_rates.get(faculty, {'salary': 1.04})['salary']
+        return growth_rate ** years_ahead
+    
+    @staticmethod
+    def _codes(values):
+        """Коды категорий (факультетов, уровней английского) и их уникальные значения
+        
+        Для колонок с типом category коды уже посчитаны pandas и берутся без прохода по строкам.
+        """
+        if isinstance(getattr(values, 'dtype', None), pd.CategoricalDtype):
+            return values.cat.codes.to_numpy(), list(values.cat.categories)
+        codes, uniques = pd.factorize(np.asarray(values, dtype=object).ravel())
+        return codes, uniques.tolist()
+    
+    @staticmethod
+    def _lookup(codes, uniques, mapping, default):
+        """Значения словаря по кодам категорий: один dict.get на уникальное значение"""
+        table = np.array([mapping.get(value, default) for value in uniques] + [default], dtype=np.float64)
+        return table[codes]  # код -1 (пропуск) берет последнее значение - значение по умолчанию
+    
+    def predict_salary_batch(self, faculty, gpa, internships, projects, certificates,
+                             english_level, graduation_year, programming_skills=0,
+                             research_experience=0, leadership_experience=0,
+                             technical_skills=0, communication_skills=0):
+        """Упрощенный прогноз зарплаты для массивов (колонок DataFrame) студентов
+        
+        Формулы и порядок операций те же, что в predict_salary_simple, а рост по годам
+        берется из той же функции, поэтому результат совпадает со скалярной версией поэлементно.
+        """
+        codes, faculties = self._codes(faculty)
+        english_codes, english_levels = self._codes(english_level)
+        base_salary = self._lookup(codes, faculties, self.faculty_salaries, 1500)
+        
+        # Модификаторы
+        gpa_bonus = (np.asarray(gpa, dtype=np.float64) - 7.0) * 50
+        internships_bonus = np.asarray(internships) * 80
+        projects_bonus = np.asarray(projects) * 50
+        certificates_bonus = np.asarray(certificates) * 60
+        english_bonus = self._lookup(english_codes, english_levels, {'B2': 200, 'C1': 200, 'C2': 200}, 0)
+        skills_bonus = (np.asarray(programming_skills) * 40 + np.asarray(research_experience) * 30 +
+                        np.asarray(leadership_experience) * 35 + np.asarray(technical_skills) * 45 +
+                        np.asarray(communication_skills) * 25)
+        
+        total_salary = (base_salary + gpa_bonus + internships_bonus +
+                        projects_bonus + certificates_bonus + english_bonus + skills_bonus)
+        
+        # Корректировка на будущие годы: таблица роста по уникальным факультетам и годам
+        # (ветки скалярной версии, включая замедление ИТ после 5 лет, считаются один раз на ячейку)
+        years_ahead = np.asarray(graduation_year, dtype=np.float64).ravel() - 2025
+        year_codes, years = pd.factorize(years_ahead)
+        growth_table = np.array([
+            [self._growth_multiplier(faculty_name, years_value) for years_value in years.tolist()] + [np.nan]
+            for faculty_name in faculties + [None]
+        ])
+        growth_multiplier = growth_table[codes, year_codes]  # код -1 года (пропуск) - NaN
+        total_salary = np.where(years_ahead > 0, total_salary * growth_multiplier, total_salary)
+        
+        # Ограничения по рынку
+        min_salary = self._lookup(codes, faculties, {name: limits[0] for name, limits in self.salary_limits.items()}, 600)
+        max_salary = self._lookup(codes, faculties, {name: limits[1] for name, limits in self.salary_limits.items()}, 3000)
+        return np.maximum(min_salary, np.minimum(total_salary, max_salary))
+    
     def predict_employment_simple(self, faculty, gpa, internships, projects, certificates,
                                 job_search_duration, english_level, graduation_year,
                                 programming_skills=0, research_experience=0,
@@ -702,6 +776,31 @@ class SimplePredictor:
                      certificates_effect + skills_effect + english_effect)
         
         return max(0.1, min(0.95, total_prob))
+    
+    def predict_employment_batch(self, faculty, gpa, internships, projects, certificates,
+                                 job_search_duration, english_level, graduation_year,
+                                 programming_skills=0, research_experience=0,
+                                 leadership_experience=0, technical_skills=0,
+                                 communication_skills=0):
+        """Упрощенный прогноз трудоустройства для массивов (колонок DataFrame) студентов"""
+        codes, faculties = self._codes(faculty)
+        english_codes, english_levels = self._codes(english_level)
+        base_prob = self._lookup(codes, faculties, self.faculty_employment, 0.6)
+        
+        # Модификаторы вероятности
+        gpa_effect = (np.asarray(gpa, dtype=np.float64) - 7.0) * 0.03
+        internships_effect = np.asarray(internships) * 0.04
+        projects_effect = np.asarray(projects) * 0.025
+        certificates_effect = np.asarray(certificates) * 0.03
+        skills_effect = (np.asarray(programming_skills) * 0.02 + np.asarray(research_experience) * 0.015 +
+                         np.asarray(leadership_experience) * 0.018 + np.asarray(technical_skills) * 0.022 +
+                         np.asarray(communication_skills) * 0.012)
+        english_effect = self._lookup(english_codes, english_levels, {'B2': 0.05, 'C1': 0.05, 'C2': 0.05}, 0)
+        
+        total_prob = (base_prob + gpa_effect + internships_effect + projects_effect +
+                      certificates_effect + skills_effect + english_effect)
+        
+        return np.maximum(0.1, np.minimum(0.95, total_prob))
 
 
 if __name__ == "__main__":
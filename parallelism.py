@@ -0,0 +1,156 @@
+# parallelism.py
+"""
+Единый бюджет потоков и процессов для обучения моделей
+
+Без него RandomizedSearchCV(n_jobs=-1), StackingClassifier(n_jobs=-1) и
+cross_validate(n_jobs=-1) запускают внешние процессы, каждый из которых
+обучает XGBoost/LightGBM/RandomForest на всех ядрах, и потоков становится
+в десятки раз больше, чем ядер.
+"""
+
+import os
+import time
+from contextlib import contextmanager, nullcontext
+import numpy as np
+from joblib import parallel_config
+from threadpoolctl import threadpool_limits
+import logging
+
+from config import ML_CONFIG
+
+logger = logging.getLogger(__name__)
+
+def _is_meta_estimator(estimator):
+    """Обертка над другими моделями (поиск, стекинг): ее n_jobs - число внешних воркеров
+
+    У XGBoost/LightGBM/RandomForest n_jobs - собственные потоки модели.
+    """
+    for value in estimator.get_params(deep=False).values():
+        if hasattr(value, 'get_params'):
+            return True
+        if isinstance(value, (list, tuple)) and any(
+            hasattr(item[-1] if isinstance(item, tuple) else item, 'get_params') for item in value
+        ):
+            return True
+    return False
+
+class ParallelismBudget:
+    """Разделение ядер между внешними воркерами (поиск, CV) и потоками внутри моделей"""
+    
+    def __init__(self, n_cores=-1, max_outer_jobs=None):
+        available = os.cpu_count() or 1
+        self.n_cores = available if n_cores is None or n_cores <= 0 else min(n_cores, available)
+        self.max_outer_jobs = max_outer_jobs
+    
+    def split(self, n_tasks):
+        """Число внешних воркеров и потоков на воркер для n_tasks независимых задач"""
+        outer = max(1, min(n_tasks, self.n_cores))
+        if self.max_outer_jobs:
+            outer = min(outer, self.max_outer_jobs)
+        inner = max(1, self.n_cores // outer)
+        return outer, inner
+    
+    def configure_estimator(self, estimator, n_threads=None):
+        """Установка числа потоков во всех вложенных моделях (параметры *n_jobs)"""
+        n_threads = n_threads or self.n_cores
+        params = estimator.get_params(deep=True)
+        thread_params = {name: n_threads for name in params if name.endswith('n_jobs')}
+        if thread_params:
+            estimator.set_params(**thread_params)
+        return estimator
+    
+    def configure_nested(self, estimator, n_tasks):
+        """Настройка модели под внешний параллелизм: во всех вложенных моделях inner потоков
+        
+        Возвращает n_jobs для внешнего уровня (RandomizedSearchCV, cross_validate и т.п.).
+        Собственный n_jobs получает outer, только если estimator - обертка над
+        другими моделями (поиск, стекинг); n_jobs бустинга или леса остается inner.
+        """
+        outer, inner = self.split(n_tasks)
+        self.configure_estimator(estimator, inner)
+        if _is_meta_estimator(estimator) and 'n_jobs' in estimator.get_params(deep=False):
+            estimator.set_params(n_jobs=outer)
+        return outer
+    
+    @contextmanager
+    def limit(self, n_tasks=1):
+        """Ограничение BLAS/OpenMP потоков в текущем процессе и в воркерах joblib"""
+        outer, inner = self.split(n_tasks)
+        if outer > 1:
+            workers = parallel_config(backend='loky', n_jobs=outer, inner_max_num_threads=inner)
+        else:
+            workers = nullcontext()
+        with workers, threadpool_limits(limits=self.n_cores if outer == 1 else inner):
+            yield outer, inner
+
+_budget = None
+
+def configure_parallelism(n_cores=None, max_outer_jobs=None):
+    """Однократная настройка глобального бюджета (по умолчанию из ML_CONFIG['parallelism'])"""
+    global _budget
+    settings = ML_CONFIG.get('parallelism', {})
+    _budget = ParallelismBudget(
+        n_cores=settings.get('n_cores', -1) if n_cores is None else n_cores,
+        max_outer_jobs=settings.get('max_outer_jobs') if max_outer_jobs is None else max_outer_jobs
+    )
+    logger.info(f"🧵 Бюджет параллелизма: {_budget.n_cores} ядер")
+    return _budget
+
+def get_parallelism_budget():
+    """Глобальный бюджет параллелизма проекта"""
+    if _budget is None:
+        configure_parallelism()
+    return _budget
+
+def benchmark_parallelism(X=None, y=None, model_type='xgboost', cv_folds=5, random_state=42):
+    """Сравнение времени кросс-валидации: вложенный n_jobs=-1 против бюджета
+    
+    Возвращает словарь со временем обоих вариантов и ускорением.
+    """
+    from sklearn.base import clone
+    from sklearn.datasets import make_classification
+    from sklearn.model_selection import StratifiedKFold, cross_validate
+    from advanced_models import AdvancedEmploymentClassifier
+    
+    if X is None or y is None:
+        X, y = make_classification(n_samples=20000, n_features=23, n_informative=10,
+                                   random_state=random_state)
+    
+    budget = get_parallelism_budget()
+    cv = StratifiedKFold(n_splits=cv_folds, shuffle=True, random_state=random_state)
+    estimator = AdvancedEmploymentClassifier(model_type, random_state)._get_base_model(model_type)
+    # При ранней остановке бустинг обернут в EarlyStoppingBoostedClassifier: предел деревьев - max_estimators
+    size_param = 'max_estimators' if 'max_estimators' in estimator.get_params(deep=False) else 'n_estimators'
+    estimator.set_params(**{size_param: 300})
+    
+    # Вариант без бюджета: все уровни забирают все ядра
+    naive = budget.configure_estimator(clone(estimator), -1)
+    start = time.time()
+    cross_validate(naive, X, y, cv=cv, scoring='roc_auc', n_jobs=-1)
+    naive_time = time.time() - start
+    
+    # Вариант с бюджетом: ядра делятся между фолдами и потоками модели
+    budgeted = clone(estimator)
+    outer = budget.configure_nested(budgeted, cv_folds)
+    start = time.time()
+    with budget.limit(cv_folds):
+        cross_validate(budgeted, X, y, cv=cv, scoring='roc_auc', n_jobs=outer)
+    budgeted_time = time.time() - start
+    
+    results = {
+        'n_cores': budget.n_cores,
+        'outer_jobs': outer,
+        'inner_threads': budget.split(cv_folds)[1],
+        'naive_seconds': naive_time,
+        'budgeted_seconds': budgeted_time,
+        'speedup': naive_time / budgeted_time if budgeted_time > 0 else np.nan
+    }
+    logger.info(f"🏁 Бенчмарк параллелизма ({model_type}, {cv_folds} фолдов): "
+                f"n_jobs=-1 {naive_time:.1f} с, бюджет {budgeted_time:.1f} с, "
+                f"ускорение x{results['speedup']:.2f}")
+    return results
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    for model_type in ['xgboost', 'lightgbm', 'random_forest']:
+        print(benchmark_parallelism(model_type=model_type))
@@ -0,0 +1,95 @@
+# prediction_cache.py
+"""
+Кэш прогнозов для повторяющихся what-if запросов
+
+Ключ - нормализованный набор входных данных плюс версия модели: одинаковый
+ввод из разных сессий Streamlit дает одно вычисление, а после переобучения
+старые записи не совпадают с новыми ключами. Размер ограничен, вытесняются
+давно не использованные записи (LRU).
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+import logging
+
+from config import ML_CONFIG
+
+logger = logging.getLogger(__name__)
+
+def normalize_inputs(inputs, float_digits=2):
+    """Ключ входных данных: отсортированные пары (имя, значение) с приведенными типами
+    
+    Числа с плавающей точкой округляются (7.5 и 7.500000001 со слайдера - один ключ),
+    целые float приводятся к int, строки очищаются от пробелов по краям.
+    """
+    normalized = []
+    for name, value in sorted(inputs.items()):
+        if hasattr(value, 'item'):
+            value = value.item()  # numpy-скаляры
+        if isinstance(value, float):
+            value = round(value, float_digits)
+            if value.is_integer():
+                value = int(value)
+        elif isinstance(value, str):
+            value = value.strip()
+        normalized.append((name, value))
+    return tuple(normalized)
+
+class PredictionCache:
+    """Потокобезопасный LRU-кэш результатов прогноза со статистикой попаданий"""
+    
+    def __init__(self, max_size=None):
+        settings = ML_CONFIG.get('prediction_cache', {})
+        self.max_size = max_size or settings.get('max_size', 1024)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    def get_or_compute(self, inputs, compute, model_version=None):
+        """Результат из кэша или compute() с сохранением в кэш"""
+        key = (model_version, normalize_inputs(inputs))
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(self._entries[key])
+            self.misses += 1
+        
+        # Вычисление вне блокировки: параллельные сессии не ждут чужой прогноз
+        result = compute()
+        with self._lock:
+            self._entries[key] = copy.deepcopy(result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return result
+    
+    def invalidate(self):
+        """Очистка кэша (перезагрузка или переобучение модели)"""
+        with self._lock:
+            n_entries = len(self._entries)
+            self._entries.clear()
+            self.invalidations += 1
+        logger.info(f"🧹 Кэш прогнозов очищен: {n_entries} записей")
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def stats(self):
+        """Статистика кэша: размер, попадания, промахи, доля попаданий, вытеснения"""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
@@ -0,0 +1,143 @@
+# quantile_forest.py
+"""
+Квантильная регрессия зарплаты одним лесом (quantile regression forest)
+
+Один RandomForestRegressor обучается один раз; для каждого дерева в каждом листе
+запоминается таблица квантилей зарплат обучающих строк, попавших в лист. Прогноз
+всех квантилей - усреднение таблиц листов по деревьям, поэтому вся полоса
+P10/P50/P90 получается за один проход по лесу вместо отдельной модели на квантиль.
+"""
+
+import time
+import numpy as np
+from sklearn.base import BaseEstimator, RegressorMixin
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_pinball_loss
+import logging
+
+from parallelism import get_parallelism_budget
+
+logger = logging.getLogger(__name__)
+
+def _leaf_quantiles(leaves, y, quantiles, n_nodes):
+    """Таблица квантилей y по листам одного дерева: (n_nodes, len(quantiles))"""
+    order = np.lexsort((y, leaves))
+    sorted_leaves, sorted_y = leaves[order], y[order]
+    nodes, starts, counts = np.unique(sorted_leaves, return_index=True, return_counts=True)
+    
+    # Линейная интерполяция внутри отсортированного отрезка листа (как np.quantile)
+    positions = starts[:, None] + np.asarray(quantiles)[None, :] * (counts[:, None] - 1)
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.minimum(lower + 1, (starts + counts - 1)[:, None])
+    weight = positions - lower
+    
+    table = np.full((n_nodes, len(quantiles)), np.nan)
+    table[nodes] = sorted_y[lower] * (1 - weight) + sorted_y[upper] * weight
+    return table
+
+class QuantileRegressionForest(RegressorMixin, BaseEstimator):
+    """Лес с таблицами квантилей в листах: все квантили одним прогнозом
+    
+    predict_quantiles возвращает массив (n, len(quantiles)), predict - медиану
+    (или средний квантиль, если 0.5 не задан). Квантили монотонны по построению:
+    в каждой таблице листа они упорядочены, а среднее упорядоченных таблиц упорядочено.
+    """
+    
+    def __init__(self, quantiles=(0.1, 0.5, 0.9), n_estimators=100, min_samples_leaf=20,
+                 max_features=0.5, max_samples=0.3, random_state=42, chunk_size=10_000):
+        self.quantiles = quantiles
+        self.n_estimators = n_estimators
+        self.min_samples_leaf = min_samples_leaf
+        self.max_features = max_features
+        self.max_samples = max_samples
+        self.random_state = random_state
+        self.chunk_size = chunk_size
+    
+    def fit(self, X, y):
+        y = np.asarray(y, dtype=np.float64)
+        self.forest_ = get_parallelism_budget().configure_estimator(RandomForestRegressor(
+            n_estimators=self.n_estimators,
+            min_samples_leaf=self.min_samples_leaf,
+            max_features=self.max_features,
+            max_samples=self.max_samples,
+            random_state=self.random_state
+        )).fit(X, y)
+        
+        # Таблицы строятся по всем обучающим строкам, а не только по бутстрепу дерева
+        leaves = self.forest_.apply(X)
+        node_counts = [tree.tree_.node_count for tree in self.forest_.estimators_]
+        self.leaf_offsets_ = np.concatenate([[0], np.cumsum(node_counts)[:-1]])
+        self.leaf_tables_ = np.vstack([
+            _leaf_quantiles(leaves[:, t], y, self.quantiles, n_nodes)
+            for t, n_nodes in enumerate(node_counts)
+        ]).astype(np.float32)
+        return self
+    
+    @property
+    def feature_importances_(self):
+        return self.forest_.feature_importances_
+    
+    def predict_quantiles(self, X):
+        """Все квантили за один проход по лесу: массив (n, len(quantiles))"""
+        predictions = np.empty((X.shape[0], len(self.quantiles)))
+        for start in range(0, X.shape[0], self.chunk_size):
+            # Частями: промежуточный массив (строки × деревья × квантили) ограничен по памяти
+            leaves = self.forest_.apply(X[start:start + self.chunk_size]) + self.leaf_offsets_
+            predictions[start:start + len(leaves)] = self.leaf_tables_[leaves].mean(axis=1)
+        return predictions
+    
+    def predict(self, X):
+        quantiles = list(self.quantiles)
+        column = quantiles.index(0.5) if 0.5 in quantiles else len(quantiles) // 2
+        return self.predict_quantiles(X)[:, column]
+
+def benchmark_quantile_models(X=None, y=None, quantiles=(0.1, 0.5, 0.9), test_size=0.2, random_state=42):
+    """Один квантильный лес против отдельной LightGBM-модели на каждый квантиль
+    
+    Возвращает словарь {подход: {'fit_seconds', 'predict_seconds', 'pinball': {квантиль: потери}}}.
+    """
+    from lightgbm import LGBMRegressor
+    from sklearn.datasets import make_regression
+    from sklearn.model_selection import train_test_split
+    
+    if X is None or y is None:
+        X, y = make_regression(n_samples=50000, n_features=22, n_informative=10, noise=30,
+                               random_state=random_state)
+        y = 3000 + y * (1 + 0.5 * (X[:, 0] > 0))  # гетероскедастичный шум - разная ширина полосы
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size,
+                                                        random_state=random_state)
+    
+    def separate_models():
+        models = [LGBMRegressor(objective='quantile', alpha=q, random_state=random_state, verbose=-1)
+                  for q in quantiles]
+        return [get_parallelism_budget().configure_estimator(model) for model in models]
+    
+    results = {}
+    for name in ['quantile_forest', 'separate_models']:
+        start = time.time()
+        if name == 'quantile_forest':
+            model = QuantileRegressionForest(quantiles, random_state=random_state).fit(X_train, y_train)
+        else:
+            models = [model.fit(X_train, y_train) for model in separate_models()]
+        fit_seconds = time.time() - start
+        
+        start = time.time()
+        if name == 'quantile_forest':
+            predictions = model.predict_quantiles(X_test)
+        else:
+            predictions = np.column_stack([model.predict(X_test) for model in models])
+        predict_seconds = time.time() - start
+        
+        results[name] = {
+            'fit_seconds': fit_seconds,
+            'predict_seconds': predict_seconds,
+            'pinball': {q: mean_pinball_loss(y_test, predictions[:, i], alpha=q)
+                        for i, q in enumerate(quantiles)}
+        }
+        logger.info(f"🏁 {name}: обучение {fit_seconds:.1f} с, прогноз {predict_seconds:.2f} с, "
+                    f"pinball {', '.join(f'P{int(q * 100)}={loss:.1f}' for q, loss in results[name]['pinball'].items())}")
+    return results
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(benchmark_quantile_models())
@@ -0,0 +1,396 @@
+# scoring_server.py
+"""
+Локальный HTTP-сервис оценки студентов для партнерских порталов
+
+Одиночные запросы POST /predict из разных потоков собираются в микропакеты:
+первый запрос пачки ждет остальных не дольше max_wait_ms, после чего вся пачка
+одним векторизованным вызовом EnhancedEmploymentPredictor.predict_batch
+проходит через признаки и модели, а каждый запрос получает свою строку ответа.
+Запись проверяется и приводится к типам до постановки в очередь (иначе 400);
+если пачка все же не оценилась, запросы оцениваются по одному, и ошибку
+получает только тот, чья запись ее вызвала. В ответе model_source - кто дал
+прогноз (продвинутая или упрощенная модель), model_version - версия
+продвинутой модели или null.
+GET /health - состояние модели, GET /metrics - размеры пачек, задержки, ошибки.
+Сервер построен на стандартной библиотеке (http.server) и слушает только
+локальный адрес по умолчанию.
+"""
+
+import json
+import math
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.request import Request, urlopen
+import numpy as np
+import pandas as pd
+import logging
+
+from config import ML_CONFIG
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 1_000_000
+
+# Поля записи студента, которые модели читают как числа и как текст
+NUMERIC_FIELDS = ('gpa', 'internships', 'projects', 'certificates', 'graduation_year',
+                  'university_prestige', 'field_related', 'salary_byn', 'job_search_duration')
+TEXT_FIELDS = ('university', 'faculty', 'specialization', 'location', 'english_level')
+
+def _to_json(value):
+    """Значение ответа для JSON: numpy-типы в Python, NaN в null"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+def validate_record(payload):
+    """Проверка и приведение типов записи одного студента
+
+    Числовые поля принимают числа и числовые строки ("7.5"), текстовые - строки;
+    null везде означает пропуск. Возвращает новую запись, при ошибке - ValueError.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError('Ожидается JSON-объект с признаками одного студента')
+    
+    record = {}
+    for name, value in payload.items():
+        if isinstance(value, (dict, list)):
+            raise ValueError(f"Поле '{name}' должно быть скалярным значением")
+        if value is None:
+            record[name] = None
+        elif name in NUMERIC_FIELDS:
+            try:
+                number = float(value.strip() if isinstance(value, str) else value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Поле '{name}' должно быть числом, получено {value!r}")
+            if not math.isfinite(number):
+                raise ValueError(f"Поле '{name}' должно быть конечным числом")
+            record[name] = number
+        elif name in TEXT_FIELDS and not isinstance(value, str):
+            raise ValueError(f"Поле '{name}' должно быть строкой, получено {value!r}")
+        else:
+            record[name] = value
+    return record
+
+class _PendingRequest:
+    """Запрос в очереди микропакетов: запись студента и место для ответа"""
+    
+    __slots__ = ('record', 'created', 'done', 'result', 'error')
+    
+    def __init__(self, record):
+        self.record = record
+        self.created = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class MicroBatcher:
+    """Сборка одиночных запросов в пачки для одного вызова модели
+    
+    score_batch(DataFrame) должен вернуть DataFrame с той же длиной и порядком
+    строк. Пачка закрывается, когда набралось max_batch_size запросов или прошло
+    max_wait_ms с прихода первого запроса пачки. Если вызов для пачки упал,
+    запросы оцениваются по одному: ошибка достается только своему запросу.
+    """
+    
+    def __init__(self, score_batch, max_batch_size=None, max_wait_ms=None, latency_window=10_000):
+        settings = ML_CONFIG.get('scoring_server', {})
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size or settings.get('max_batch_size', 64)
+        self.max_wait_ms = settings.get('max_wait_ms', 5) if max_wait_ms is None else max_wait_ms
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=latency_window)
+        self._batch_sizes = deque(maxlen=latency_window)
+        self.n_requests = 0
+        self.n_batches = 0
+        self.n_errors = 0
+        self._running = True
+        self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._worker.start()
+    
+    def submit(self, record, timeout=None):
+        """Оценка одного студента (словарь признаков); блокирует до ответа пачки"""
+        timeout = timeout or ML_CONFIG.get('scoring_server', {}).get('request_timeout', 10)
+        pending = _PendingRequest(record)
+        self._queue.put(pending)
+        if not pending.done.wait(timeout):
+            raise TimeoutError(f"Нет ответа модели за {timeout} с")
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+    
+    def close(self):
+        self._running = False
+        self._queue.put(None)
+        self._worker.join(timeout=5)
+    
+    def _collect_batch(self):
+        """Первый запрос ждется без ограничения, остальные - до закрытия окна пачки"""
+        first = self._queue.get()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                pending = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if pending is None:
+                self._running = False
+                break
+            batch.append(pending)
+        return batch
+    
+    def _run(self):
+        while self._running:
+            batch = self._collect_batch()
+            if batch:
+                self._score(batch)
+    
+    def _score_records(self, batch):
+        predictions = self.score_batch(pd.DataFrame([pending.record for pending in batch]))
+        if predictions is None or len(predictions) != len(batch):
+            raise RuntimeError("Модель не вернула прогноз для пачки")
+        records = predictions.to_dict(orient='records')
+        for pending, result in zip(batch, records):
+            pending.result = {name: _to_json(value) for name, value in result.items()}
+    
+    def _score(self, batch):
+        try:
+            self._score_records(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                logger.error(f"❌ Ошибка оценки запроса: {e}")
+                batch[0].error = e
+            else:
+                logger.warning(f"⚠️ Пачка из {len(batch)} запросов не оценилась ({e}), оценка по одному")
+                for pending in batch:
+                    try:
+                        self._score_records([pending])
+                    except Exception as record_error:
+                        logger.error(f"❌ Ошибка оценки запроса: {record_error}")
+                        pending.error = record_error
+        
+        finished = time.perf_counter()
+        with self._lock:
+            self.n_requests += len(batch)
+            self.n_batches += 1
+            self.n_errors += sum(pending.error is not None for pending in batch)
+            self._batch_sizes.append(len(batch))
+            self._latencies.extend((finished - pending.created) * 1000 for pending in batch)
+        for pending in batch:
+            pending.done.set()
+    
+    def metrics(self):
+        """Счетчики запросов и пачек, средний размер пачки, задержки p50/p95/p99 (мс)"""
+        with self._lock:
+            latencies = np.asarray(self._latencies)
+            batch_sizes = np.asarray(self._batch_sizes)
+            metrics = {
+                'requests': self.n_requests,
+                'batches': self.n_batches,
+                'errors': self.n_errors,
+                'queue_size': self._queue.qsize(),
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait_ms,
+                'mean_batch_size': float(batch_sizes.mean()) if len(batch_sizes) else 0.0
+            }
+        for q in (50, 95, 99):
+            metrics[f'latency_p{q}_ms'] = float(np.percentile(latencies, q)) if len(latencies) else 0.0
+        return metrics
+
+class ScoringRequestHandler(BaseHTTPRequestHandler):
+    """POST /predict, GET /health, GET /metrics"""
+    
+    server_version = 'EmploymentScoring/1.0'
+    
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, self.server.health())
+        elif self.path == '/metrics':
+            self._send_json(200, self.server.batcher.metrics())
+        else:
+            self._send_json(404, {'error': f'Неизвестный путь {self.path}'})
+    
+    def do_POST(self):
+        if self.path != '/predict':
+            self._send_json(404, {'error': f'Неизвестный путь {self.path}'})
+            return
+        if not self.server.predictor.is_trained:
+            self._send_json(503, {'error': 'Модель не обучена'})
+            return
+        
+        length = int(self.headers.get('Content-Length') or 0)
+        if length <= 0 or length > MAX_BODY_BYTES:
+            self._send_json(400, {'error': f'Тело запроса должно быть от 1 до {MAX_BODY_BYTES} байт'})
+            return
+        try:
+            record = validate_record(json.loads(self.rfile.read(length)))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            self._send_json(400, {'error': 'Тело запроса - не JSON'})
+            return
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        
+        try:
+            result = self.server.batcher.submit(record)
+        except TimeoutError as e:
+            self._send_json(504, {'error': str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {'error': str(e)})
+            return
+        self._send_json(200, result)
+    
+    def _send_json(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+class ScoringServer(ThreadingHTTPServer):
+    """HTTP-сервер оценки: поток на соединение, общий микропакетный оценщик"""
+    
+    daemon_threads = True
+    request_queue_size = 128  # очередь listen: пики параллельных подключений партнеров
+    
+    def __init__(self, predictor, host=None, port=None, max_batch_size=None, max_wait_ms=None):
+        settings = ML_CONFIG.get('scoring_server', {})
+        host = host or settings.get('host', '127.0.0.1')
+        port = settings.get('port', 8502) if port is None else port
+        self.predictor = predictor
+        self.batcher = None
+        # Сначала порт: если он занят, поток оценщика не запускается
+        super().__init__((host, port), ScoringRequestHandler)
+        self.batcher = MicroBatcher(self.score_batch, max_batch_size, max_wait_ms)
+        self.started = time.time()
+    
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def score_batch(self, students):
+        """Прогноз пачки с источником: model_source и model_version в каждой строке"""
+        predictions, source, model_version = self.predictor.predict_batch_with_source(students)
+        return predictions.reset_index(drop=True).assign(model_source=source, model_version=model_version)
+    
+    def health(self):
+        return {
+            'status': 'ok' if self.predictor.is_trained else 'model_not_trained',
+            'model_version': self.predictor.model_version,
+            'uptime_seconds': round(time.time() - self.started, 1)
+        }
+    
+    def start_background(self):
+        """Запуск в фоновом потоке (для тестов нагрузки и встраивания)"""
+        thread = threading.Thread(target=self.serve_forever, name='scoring-server', daemon=True)
+        thread.start()
+        logger.info(f"🌐 Сервис оценки запущен: {self.url}")
+        return thread
+    
+    def server_close(self):
+        super().server_close()
+        if self.batcher is not None:
+            self.batcher.close()
+
+def run_load_test(url, records, n_requests=1000, concurrency=32, timeout=30):
+    """Генератор нагрузки: n_requests одиночных POST /predict из concurrency потоков
+    
+    records - список словарей признаков, запросы берут их по кругу. Возвращает
+    пропускную способность (запросов/с), задержки p50/p95 (мс) и число ошибок.
+    """
+    def send(i):
+        body = json.dumps(records[i % len(records)], default=_to_json).encode('utf-8')
+        request = Request(f"{url}/predict", data=body, headers={'Content-Type': 'application/json'})
+        start = time.perf_counter()
+        try:
+            with urlopen(request, timeout=timeout) as response:
+                response.read()
+            ok = True
+        except OSError:
+            ok = False
+        return (time.perf_counter() - start) * 1000, ok
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(send, range(n_requests)))
+    elapsed = time.perf_counter() - start
+    
+    latencies = np.array([latency for latency, _ in results])
+    return {
+        'requests': n_requests,
+        'concurrency': concurrency,
+        'requests_per_second': n_requests / elapsed,
+        'latency_p50_ms': float(np.percentile(latencies, 50)),
+        'latency_p95_ms': float(np.percentile(latencies, 95)),
+        'errors': sum(not ok for _, ok in results)
+    }
+
+def benchmark_scoring_server(predictor, df, n_requests=1000, concurrency=32):
+    """Оценка по одному запросу за вызов модели против микропакетов
+    
+    Возвращает словарь {режим: результат run_load_test + средний размер пачки}.
+    """
+    records = [
+        {name: _to_json(value) for name, value in record.items()}
+        for record in df.drop(columns=['employed'], errors='ignore').head(1000).to_dict(orient='records')
+    ]
+    modes = {
+        'per_request': {'max_batch_size': 1, 'max_wait_ms': 0},
+        'micro_batch': {}
+    }
+    results = {}
+    for mode, params in modes.items():
+        server = ScoringServer(predictor, port=0, **params)
+        server.start_background()
+        try:
+            results[mode] = run_load_test(server.url, records, n_requests, concurrency)
+            results[mode]['mean_batch_size'] = server.batcher.metrics()['mean_batch_size']
+        finally:
+            server.shutdown()
+            server.server_close()
+        logger.info(f"🏁 {mode}: {results[mode]['requests_per_second']:.0f} запросов/с, "
+                    f"p50 {results[mode]['latency_p50_ms']:.1f} мс, p95 {results[mode]['latency_p95_ms']:.1f} мс, "
+                    f"пачка {results[mode]['mean_batch_size']:.1f}")
+    return results
+
+if __name__ == "__main__":
+    import argparse
+    from enhanced_predictor import EnhancedEmploymentPredictor
+    
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Локальный HTTP-сервис оценки трудоустройства")
+    parser.add_argument('--model-dir', default='models_enhanced')
+    parser.add_argument('--host')
+    parser.add_argument('--port', type=int)
+    parser.add_argument('--benchmark', metavar='CSV', help="сравнить одиночные вызовы и микропакеты на данных из CSV")
+    args = parser.parse_args()
+    
+    enhanced_predictor = EnhancedEmploymentPredictor()
+    enhanced_predictor.load_models(args.model_dir)
+    if args.benchmark:
+        print(benchmark_scoring_server(enhanced_predictor, pd.read_csv(args.benchmark)))
+    else:
+        scoring_server = ScoringServer(enhanced_predictor, args.host, args.port)
+        logger.info(f"🌐 Сервис оценки: {scoring_server.url} (POST /predict, GET /health, GET /metrics)")
+        try:
+            scoring_server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            scoring_server.server_close()
@@ -0,0 +1,47 @@
+# tests/conftest.py
+"""Общие настройки тестов: модули проекта лежат в корне репозитория"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+LABEL_COLUMNS = ['employed', 'salary_byn', 'job_search_duration']
+
+@pytest.fixture(scope='session')
+def graduates():
+    import numpy as np
+    from data_provider import RealisticDataProvider
+    np.random.seed(42)  # генератор выпускников использует глобальный np.random
+    return RealisticDataProvider().generate_real_graduates(2000).reset_index(drop=True)
+
+@pytest.fixture(scope='session')
+def trained_predictor(graduates, tmp_path_factory):
+    """Небольшой обученный ансамбль: короткий поиск, мало деревьев, файлы - во временном каталоге"""
+    from config import ML_CONFIG
+    from advanced_models import AdvancedEmploymentPredictor
+    
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setitem(ML_CONFIG, 'hyperparameter_tuning', {**ML_CONFIG['hyperparameter_tuning'],
+                                                        'n_trials': 2, 'timeout': 5})
+        mp.setitem(ML_CONFIG, 'hyperparameter_store', {**ML_CONFIG['hyperparameter_store'], 'enabled': False})
+        mp.setitem(ML_CONFIG, 'checkpointing', {**ML_CONFIG['checkpointing'],
+                                                'directory': tmp_path_factory.mktemp('checkpoints')})
+        mp.setitem(ML_CONFIG, 'early_stopping', {**ML_CONFIG['early_stopping'], 'max_estimators': 50})
+        mp.setitem(ML_CONFIG, 'salary_model', {
+            **ML_CONFIG['salary_model'], 'max_estimators': 50,
+            'quantile_forest': {'n_estimators': 10, 'min_samples_leaf': 20, 'max_samples': 0.3}
+        })
+        predictor = AdvancedEmploymentPredictor(use_ensemble=True)
+        predictor.train(graduates)
+    assert predictor.is_trained
+    return predictor
+
+@pytest.fixture
+def scoring_data(graduates):
+    """Студенты для прогноза: без меток и зарплаты, как в реальной оценке"""
+    return graduates.drop(columns=LABEL_COLUMNS).head(300)
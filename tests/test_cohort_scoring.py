@@ -0,0 +1,36 @@
+# tests/test_cohort_scoring.py
+"""Оценка когорты без исходов трудоустройства: вероятности различаются между студентами"""
+
+import pandas as pd
+import pytest
+
+from advanced_feature_engineer import POST_OUTCOME_COLUMNS, AdvancedFeatureEngineer
+from conftest import LABEL_COLUMNS
+
+def test_model_features_exclude_post_outcome_columns(trained_predictor):
+    features = set(trained_predictor.feature_engineer.numeric_features)
+    assert not features & set(POST_OUTCOME_COLUMNS)
+
+def test_score_cohort_probabilities_vary_without_outcomes(trained_predictor, graduates):
+    # Синтетические вероятности трудоустройства упираются в 0.98, поэтому разброс
+    # небольшой; при подстановке медианы зарплаты он был на уровне ошибки округления (~1e-16)
+    cohort = graduates.drop(columns=LABEL_COLUMNS).head(1000)
+    probabilities = trained_predictor.score_cohort(cohort)['employment_probability']
+    
+    assert probabilities.nunique() > 1
+    assert probabilities.std() > 1e-9
+
+def test_predictions_do_not_depend_on_outcome_columns(trained_predictor, graduates):
+    cohort = graduates.head(300)
+    without_outcomes = trained_predictor.predict_batch(cohort.drop(columns=LABEL_COLUMNS), use_compiled=False)
+    with_outcomes = trained_predictor.predict_batch(cohort.assign(salary_byn=0.0, job_search_duration=365),
+                                                    use_compiled=False)
+    
+    pd.testing.assert_series_equal(without_outcomes['employment_probability'],
+                                   with_outcomes['employment_probability'])
+
+def test_add_missing_columns_refuses_to_impute_outcomes(scoring_data):
+    engineer = AdvancedFeatureEngineer()
+    engineer.numeric_features = ['gpa', 'salary_byn']
+    with pytest.raises(ValueError):
+        engineer.add_missing_columns(scoring_data)
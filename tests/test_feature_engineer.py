@@ -0,0 +1,41 @@
+# tests/test_feature_engineer.py
+"""Потоковая подготовка признаков: совпадение с SimpleImputer и отсутствие временных файлов"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from advanced_feature_engineer import AdvancedFeatureEngineer, StreamingNumericPreprocessor
+
+def test_streaming_preprocessor_skips_all_nan_column_like_simple_imputer():
+    rng = np.random.RandomState(0)
+    X = pd.DataFrame({'a': rng.normal(size=500), 'empty': np.nan, 'b': rng.normal(size=500)})
+    X.loc[::7, 'a'] = np.nan
+    
+    streaming = StreamingNumericPreprocessor(feature_names=list(X.columns))
+    for start in range(0, len(X), 100):
+        streaming.partial_fit(X.iloc[start:start + 100])
+    streaming.finalize()
+    with pytest.warns(UserWarning):
+        expected = make_pipeline(SimpleImputer(strategy='median'), StandardScaler()).fit_transform(X)
+    
+    assert streaming.feature_names_out_ == ['a', 'b']
+    np.testing.assert_allclose(streaming.transform(X), expected, atol=1e-10)
+    np.testing.assert_allclose(streaming.transform(X.to_numpy()), expected, atol=1e-10)
+
+def test_prepare_features_chunked_requires_output_path(graduates):
+    with pytest.raises(ValueError):
+        AdvancedFeatureEngineer().prepare_features_chunked(graduates, output_path=None)
+
+def test_prepare_features_chunked_writes_only_to_output_path(graduates, tmp_path):
+    output_path = tmp_path / 'features.npy'
+    X, y, feature_names = AdvancedFeatureEngineer().prepare_features_chunked(
+        graduates, output_path, chunk_size=500
+    )
+    
+    assert X.shape == (len(graduates), len(feature_names))
+    assert len(y) == len(graduates)
+    assert list(tmp_path.iterdir()) == [output_path]
@@ -0,0 +1,70 @@
+# tests/test_model_bundle.py
+"""Пакет модели: сохранение и загрузка, уникальные версии, удаление старых версий"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from advanced_models import AdvancedEmploymentPredictor
+from model_bundle import MANIFEST_FILE, ModelBundle, save_bundle
+
+def _versions(directory):
+    return sorted(path.name for path in directory.iterdir() if path.is_dir())
+
+def test_components_round_trip_with_mmap(tmp_path):
+    weights = np.arange(1000, dtype=np.float64)
+    manifest = save_bundle(tmp_path, {'weights': weights, 'skipped': None, 'names': ['a', 'b']},
+                           model_version='v1', metadata={'rows': 10})
+    
+    bundle = ModelBundle(tmp_path, mmap_mode='r')
+    
+    assert bundle.model_version == 'v1'
+    assert bundle.bundle_version == manifest['bundle_version']
+    assert bundle.metadata == {'rows': 10}
+    assert not bundle.has('skipped')
+    assert bundle.load('names') == ['a', 'b']
+    loaded = bundle.load('weights')
+    assert isinstance(loaded, np.memmap)
+    np.testing.assert_array_equal(loaded, weights)
+
+def test_repeated_saves_never_overwrite(tmp_path):
+    first = save_bundle(tmp_path, {'value': 1}, model_version='same')
+    old_bundle = ModelBundle(tmp_path)
+    second = save_bundle(tmp_path, {'value': 2}, model_version='same')
+    
+    assert first['bundle_version'] != second['bundle_version']
+    assert old_bundle.load('value') == 1
+    assert ModelBundle(tmp_path).load('value') == 2
+
+def test_keep_versions_prunes_oldest(tmp_path):
+    manifests = [save_bundle(tmp_path, {'value': i}, keep_versions=2) for i in range(4)]
+    
+    assert _versions(tmp_path) == sorted(m['bundle_version'] for m in manifests[-2:])
+
+def test_keep_versions_must_be_positive(tmp_path):
+    with pytest.raises(ValueError):
+        save_bundle(tmp_path, {'value': 1}, keep_versions=0)
+
+def test_reads_format_1_bundle(tmp_path):
+    save_bundle(tmp_path, {'value': 1}, model_version='v1')
+    version_dir = tmp_path / ModelBundle(tmp_path).bundle_version
+    legacy_dir = version_dir.rename(tmp_path / 'v1')
+    manifest = json.loads((legacy_dir / MANIFEST_FILE).read_text(encoding='utf-8'))
+    manifest.pop('bundle_version')
+    manifest['format_version'] = 1
+    (tmp_path / MANIFEST_FILE).write_text(json.dumps(manifest), encoding='utf-8')
+    
+    assert ModelBundle(tmp_path).load('value') == 1
+
+def test_predictor_bundle_round_trip(trained_predictor, scoring_data, tmp_path):
+    trained_predictor.save_model_bundle(tmp_path)
+    loaded = AdvancedEmploymentPredictor()
+    loaded.load_model_bundle(tmp_path)
+    batch = trained_predictor.feature_engineer.add_missing_columns(scoring_data)
+    
+    assert loaded.model_version == trained_predictor.model_version
+    assert loaded.is_trained
+    pd.testing.assert_frame_equal(loaded.predict_batch(batch, use_compiled=False),
+                                  trained_predictor.predict_batch(batch, use_compiled=False))
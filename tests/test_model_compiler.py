@@ -0,0 +1,38 @@
+# tests/test_model_compiler.py
+"""Скомпилированная модель: сверка с исходным пайплайном и малые пачки"""
+
+import numpy as np
+import pytest
+
+from advanced_models import AdvancedEmploymentPredictor
+from model_compiler import CompiledEmploymentModel, compile_predictor, verify_compiled
+
+def test_verify_compiled_on_data_without_label_columns(trained_predictor, scoring_data):
+    report = verify_compiled(trained_predictor, compile_predictor(trained_predictor), scoring_data)
+    
+    assert report['n_rows'] == len(scoring_data)
+    assert report['passed']
+
+def test_verify_compiled_raises_without_reference(trained_predictor, scoring_data):
+    compiled = compile_predictor(trained_predictor)
+    
+    with pytest.raises(ValueError, match="не обучена"):
+        verify_compiled(AdvancedEmploymentPredictor(), compiled, scoring_data)
+
+def test_small_batches_use_compiled_model(trained_predictor, scoring_data):
+    batch = trained_predictor.feature_engineer.add_missing_columns(scoring_data.head(16))
+    compiled = trained_predictor.predict_batch(batch)
+    native = trained_predictor.predict_batch(batch, use_compiled=False)
+    
+    assert trained_predictor.compiled_model_.model_version == trained_predictor.model_version
+    np.testing.assert_allclose(compiled['employment_probability'], native['employment_probability'], atol=5e-4)
+    np.testing.assert_allclose(compiled['salary_prediction'], native['salary_prediction'], rtol=1e-5)
+
+def test_compiled_model_npz_round_trip(trained_predictor, scoring_data, tmp_path):
+    compiled = compile_predictor(trained_predictor)
+    loaded = CompiledEmploymentModel.load(compiled.save(tmp_path / 'compiled.npz'))
+    X, _, _ = trained_predictor.feature_engineer.prepare_features(
+        trained_predictor.feature_engineer.add_missing_columns(scoring_data), fit=False
+    )
+    
+    np.testing.assert_array_equal(loaded.predict_processed(X), compiled.predict_processed(X))
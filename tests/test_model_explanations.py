@@ -0,0 +1,52 @@
+# tests/test_model_explanations.py
+"""Объяснения прогнозов: сумма вкладов плюс базовое значение равна вероятности"""
+
+import numpy as np
+import pytest
+
+from model_explanations import CONTRIBUTION_PREFIX, ModelExplainer, top_contributions
+
+@pytest.fixture
+def batch(trained_predictor, scoring_data):
+    return trained_predictor.feature_engineer.add_missing_columns(scoring_data)
+
+def test_explanations_are_additive_and_match_predictions(trained_predictor, batch):
+    explanations = trained_predictor.explain(batch)
+    contributions = explanations.filter(like=CONTRIBUTION_PREFIX)
+    predictions = trained_predictor.predict_batch(batch, use_compiled=False)
+    
+    assert contributions.shape[1] == len(trained_predictor.feature_engineer.get_feature_names())
+    np.testing.assert_allclose(contributions.sum(axis=1) + explanations['base_value'],
+                               explanations['employment_probability'], atol=1e-10)
+    np.testing.assert_allclose(explanations['employment_probability'],
+                               predictions['employment_probability'], atol=1e-4)
+
+@pytest.mark.parametrize('method', ['path', 'tree_shap'])
+def test_base_model_contributions_sum_to_raw_prediction(trained_predictor, batch, method):
+    explainer = ModelExplainer(trained_predictor, method=method)
+    X, _, _ = trained_predictor.feature_engineer.prepare_features(batch, fit=False)
+    
+    for model in explainer.base_models:
+        phi, raw = model.contributions(X)
+        np.testing.assert_allclose(phi.sum(axis=1) + model.expected_, raw, atol=1e-8)
+    contributions, probability = explainer.explain_processed(X)
+    np.testing.assert_allclose(contributions.sum(axis=1) + explainer.base_value_, probability, atol=1e-10)
+
+def test_explainer_is_rebuilt_for_new_model_version(trained_predictor):
+    explainer = trained_predictor.get_explainer()
+    assert trained_predictor.get_explainer() is explainer
+    
+    version = trained_predictor.model_version
+    try:
+        trained_predictor.model_version = 'другая версия'
+        assert trained_predictor.get_explainer() is not explainer
+    finally:
+        trained_predictor.model_version = version
+
+def test_top_contributions_are_ranked_by_magnitude(trained_predictor, batch):
+    top = top_contributions(trained_predictor.explain(batch.head(3)), top_n=4)
+    
+    assert len(top) == 12
+    for _, row_top in top.groupby('row'):
+        magnitudes = row_top.sort_values('rank')['contribution'].abs().to_numpy()
+        assert np.all(np.diff(magnitudes) <= 0)
@@ -0,0 +1,63 @@
+# tests/test_parallelism.py
+"""Бюджет параллелизма: вложенный n_jobs не должен размножать потоки"""
+
+import pytest
+from lightgbm import LGBMClassifier
+from sklearn.ensemble import RandomForestClassifier, StackingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import RandomizedSearchCV
+from xgboost import XGBClassifier
+
+import parallelism
+from advanced_models import EarlyStoppingBoostedClassifier
+from parallelism import ParallelismBudget
+
+@pytest.fixture
+def budget(monkeypatch):
+    monkeypatch.setattr(parallelism.os, 'cpu_count', lambda: 32)
+    return ParallelismBudget(n_cores=32)
+
+@pytest.mark.parametrize('model', [
+    XGBClassifier(n_jobs=-1),
+    LGBMClassifier(n_jobs=-1),
+    RandomForestClassifier(n_jobs=-1)
+])
+def test_configure_nested_keeps_inner_threads_in_base_model(budget, model):
+    outer = budget.configure_nested(model, n_tasks=8)
+    
+    assert outer == 8
+    assert model.get_params()['n_jobs'] == 4
+    assert outer * model.get_params()['n_jobs'] <= budget.n_cores
+
+def test_configure_nested_early_stopping_wrapper(budget):
+    model = EarlyStoppingBoostedClassifier(XGBClassifier(n_jobs=-1))
+    outer = budget.configure_nested(model, n_tasks=32)
+    
+    assert outer == 32
+    assert model.get_params()['estimator__n_jobs'] == 1
+
+def test_configure_nested_sets_outer_jobs_on_search(budget):
+    search = RandomizedSearchCV(LGBMClassifier(n_jobs=-1), {'num_leaves': [15, 31]}, n_iter=2, n_jobs=-1)
+    outer = budget.configure_nested(search, n_tasks=16)
+    
+    assert outer == 16
+    assert search.n_jobs == 16
+    assert search.estimator.n_jobs == 2
+
+def test_configure_nested_sets_outer_jobs_on_stacking(budget):
+    stacking = StackingClassifier([('rf', RandomForestClassifier(n_jobs=-1))],
+                                  final_estimator=LogisticRegression(), n_jobs=-1)
+    outer = budget.configure_nested(stacking, n_tasks=4)
+    
+    assert stacking.n_jobs == outer == 4
+    assert stacking.estimators[0][1].n_jobs == 8
+
+@pytest.mark.parametrize('model_type', ['xgboost', 'lightgbm', 'random_forest'])
+def test_benchmark_parallelism_runs_with_default_config(model_type):
+    from sklearn.datasets import make_classification
+    
+    X, y = make_classification(n_samples=400, n_features=8, random_state=0)
+    results = parallelism.benchmark_parallelism(X, y, model_type=model_type, cv_folds=2)
+    
+    assert results['naive_seconds'] > 0 and results['budgeted_seconds'] > 0
+    assert results['outer_jobs'] * results['inner_threads'] <= results['n_cores']
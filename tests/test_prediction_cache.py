@@ -0,0 +1,67 @@
+# tests/test_prediction_cache.py
+"""Кэш прогнозов: попадания, ключ по версии модели, вытеснение и очистка"""
+
+import numpy as np
+
+from prediction_cache import PredictionCache, normalize_inputs
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+    
+    def __call__(self):
+        self.calls += 1
+        return {'probability': 0.7, 'recommendations': ['стажировка']}
+
+STUDENT = {'faculty': 'ИТ', 'gpa': 7.5, 'internships': 2}
+
+def test_same_inputs_hit_cache():
+    cache, compute = PredictionCache(max_size=8), Counter()
+    
+    first = cache.get_or_compute(STUDENT, compute, model_version='v1')
+    second = cache.get_or_compute({'internships': np.int64(2), 'gpa': 7.500000001, 'faculty': ' ИТ '},
+                                  compute, model_version='v1')
+    
+    assert compute.calls == 1
+    assert first == second
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+def test_cached_result_is_a_copy():
+    cache, compute = PredictionCache(max_size=8), Counter()
+    
+    cache.get_or_compute(STUDENT, compute)['recommendations'].append('изменено')
+    
+    assert cache.get_or_compute(STUDENT, compute)['recommendations'] == ['стажировка']
+
+def test_new_model_version_misses():
+    cache, compute = PredictionCache(max_size=8), Counter()
+    
+    cache.get_or_compute(STUDENT, compute, model_version='v1')
+    cache.get_or_compute(STUDENT, compute, model_version='v2')
+    
+    assert compute.calls == 2
+
+def test_invalidate_clears_entries():
+    cache, compute = PredictionCache(max_size=8), Counter()
+    cache.get_or_compute(STUDENT, compute)
+    
+    cache.invalidate()
+    cache.get_or_compute(STUDENT, compute)
+    
+    assert compute.calls == 2
+    assert cache.stats()['invalidations'] == 1
+
+def test_least_recently_used_entry_is_evicted():
+    cache, compute = PredictionCache(max_size=2), Counter()
+    for gpa in (6.0, 7.0):
+        cache.get_or_compute({**STUDENT, 'gpa': gpa}, compute)
+    cache.get_or_compute({**STUDENT, 'gpa': 6.0}, compute)  # 6.0 становится свежей
+    cache.get_or_compute({**STUDENT, 'gpa': 8.0}, compute)  # вытесняет 7.0
+    
+    cache.get_or_compute({**STUDENT, 'gpa': 6.0}, compute)
+    
+    assert compute.calls == 3
+    assert len(cache) == 2 and cache.stats()['evictions'] == 1
+
+def test_normalize_inputs_is_order_independent():
+    assert normalize_inputs({'b': 1.0, 'a': 'x'}) == normalize_inputs({'a': 'x ', 'b': 1})
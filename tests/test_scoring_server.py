@@ -0,0 +1,97 @@
+# tests/test_scoring_server.py
+"""Сервис оценки: проверка записей и изоляция ошибок внутри микропакета"""
+
+import json
+import threading
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from enhanced_predictor import EnhancedEmploymentPredictor
+from scoring_server import MicroBatcher, ScoringServer, validate_record
+
+GOOD_RECORD = {'faculty': 'ИТ', 'gpa': 8.1, 'internships': 2, 'projects': 3, 'certificates': 1,
+               'graduation_year': 2024}
+
+@pytest.fixture
+def predictor():
+    # Продвинутая модель не обучена: прогнозы дает упрощенная модель
+    predictor = EnhancedEmploymentPredictor()
+    predictor.is_trained = True
+    return predictor
+
+def test_validate_record_coerces_numbers():
+    record = validate_record({'gpa': ' 7.5 ', 'internships': 2, 'faculty': 'ИТ', 'projects': None})
+    
+    assert record == {'gpa': 7.5, 'internships': 2.0, 'faculty': 'ИТ', 'projects': None}
+
+@pytest.mark.parametrize('payload', [
+    {'gpa': 'high'},
+    {'gpa': float('nan')},
+    {'faculty': 5},
+    {'gpa': [7.5]},
+    ['not', 'an', 'object']
+])
+def test_validate_record_rejects_bad_input(payload):
+    with pytest.raises(ValueError):
+        validate_record(payload)
+
+def test_bad_record_fails_only_its_own_request(predictor):
+    batcher = MicroBatcher(predictor.predict_batch, max_batch_size=8, max_wait_ms=500)
+    results = {}
+    
+    def submit(name, record):
+        try:
+            results[name] = batcher.submit(record, timeout=30)
+        except Exception as e:
+            results[name] = e
+    
+    # Запись в обход validate_record: упрощенная модель падает на строке вместо числа
+    threads = [threading.Thread(target=submit, args=(f'good_{i}', GOOD_RECORD)) for i in range(3)]
+    threads.append(threading.Thread(target=submit, args=('bad', {**GOOD_RECORD, 'gpa': 'high'})))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.close()
+    
+    assert isinstance(results['bad'], Exception)
+    for i in range(3):
+        assert 0.0 <= results[f'good_{i}']['employment_probability'] <= 1.0
+    metrics = batcher.metrics()
+    assert metrics['batches'] == 1 and metrics['errors'] == 1
+
+def _post(url, payload):
+    request = Request(f"{url}/predict", data=json.dumps(payload).encode('utf-8'),
+                      headers={'Content-Type': 'application/json'})
+    try:
+        with urlopen(request, timeout=30) as response:
+            return response.status, json.loads(response.read())
+    except HTTPError as e:
+        return e.code, json.loads(e.read())
+
+def test_server_rejects_bad_payload_and_reports_source(predictor):
+    server = ScoringServer(predictor, port=0, max_wait_ms=0)
+    server.start_background()
+    try:
+        status, body = _post(server.url, {**GOOD_RECORD, 'gpa': 'high'})
+        assert status == 400 and 'gpa' in body['error']
+        
+        status, body = _post(server.url, GOOD_RECORD)
+        assert status == 200
+        assert body['model_source'] == 'simple'
+        assert body['model_version'] is None
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_server_on_busy_port_starts_no_batcher_thread(predictor):
+    first = ScoringServer(predictor, port=0)
+    try:
+        with pytest.raises(OSError):
+            ScoringServer(predictor, port=first.server_address[1])
+    finally:
+        first.server_close()
+    
+    assert not any(thread.name == 'micro-batcher' and thread.is_alive() for thread in threading.enumerate())
@@ -0,0 +1,30 @@
+# tests/test_training_checkpoint.py
+"""Чекпоинты обучения: запуски с разными ключами не мешают друг другу"""
+
+from training_checkpoint import TrainingCheckpoint
+
+def test_resume_restores_saved_stages(tmp_path):
+    TrainingCheckpoint(tmp_path, 'run_a').save('features', [1, 2, 3])
+    
+    checkpoint = TrainingCheckpoint(tmp_path, 'run_a', resume=True)
+    
+    assert checkpoint.has('features')
+    assert checkpoint.load('features') == [1, 2, 3]
+
+def test_fresh_run_keeps_other_runs(tmp_path):
+    TrainingCheckpoint(tmp_path, 'run_a').save('features', 'a')
+    
+    other = TrainingCheckpoint(tmp_path, 'run_b')
+    other.save('features', 'b')
+    other.clear()
+    
+    assert not other.directory.exists()
+    assert TrainingCheckpoint(tmp_path, 'run_a', resume=True).load('features') == 'a'
+
+def test_fresh_run_clears_only_its_own_stages(tmp_path):
+    TrainingCheckpoint(tmp_path, 'run_a').save('features', 'old')
+    
+    checkpoint = TrainingCheckpoint(tmp_path, 'run_a', resume=False)
+    
+    assert not checkpoint.has('features')
+    assert checkpoint.directory == tmp_path / 'run_a'
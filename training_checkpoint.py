@@ -0,0 +1,105 @@
+# training_checkpoint.py
+"""
+Чекпоинты этапов долгого обучения (признаки, базовые модели, OOF-прогнозы, мета-модель)
+
+Каждый завершенный этап сохраняется отдельным joblib-файлом, поэтому прерванное
+обучение продолжается с последнего готового этапа, а не с начала. Этапы запуска
+лежат в подкаталоге <каталог чекпоинтов>/<run_key>/: новое обучение на других
+данных или в другом процессе не трогает чекпоинты чужих запусков.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+import joblib
+import pandas as pd
+import logging
+
+from config import ML_CONFIG, MODELS_DIR
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = 'manifest.json'
+
+def training_run_key(df, **settings):
+    """Ключ запуска: хэш обучающих данных и настроек, влияющих на результат этапов"""
+    digest = hashlib.sha1(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    digest.update(json.dumps(settings, sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+class TrainingCheckpoint:
+    """Чекпоинты одного запуска обучения в подкаталоге run_key общего каталога
+    
+    resume=False начинает запуск заново и удаляет только его собственный
+    подкаталог; чекпоинты других запусков (другие данные или настройки) остаются.
+    """
+    
+    def __init__(self, directory=None, run_key=None, resume=False):
+        settings = ML_CONFIG.get('checkpointing', {})
+        self.root = Path(directory or settings.get('directory', MODELS_DIR / 'checkpoints'))
+        self.run_key = run_key
+        self.directory = self.root / (run_key or 'default')
+        
+        manifest = self._read_manifest()
+        if resume and manifest.get('run_key') == run_key:
+            self.manifest = manifest
+            if self.manifest['stages']:
+                logger.info(f"♻️ Продолжение обучения, готовые этапы: {', '.join(self.manifest['stages'])}")
+        else:
+            if resume:
+                logger.warning("⚠️ Для этих данных и настроек чекпоинтов нет - обучение с начала")
+            self.clear()
+            self.manifest = {'run_key': run_key, 'stages': []}
+    
+    def has(self, stage):
+        return stage in self.manifest['stages'] and self._stage_path(stage).exists()
+    
+    def load(self, stage):
+        logger.info(f"📂 Этап '{stage}' загружен из чекпоинта")
+        return joblib.load(self._stage_path(stage))
+    
+    def save(self, stage, value):
+        """Сохранение этапа: сначала во временный файл, затем атомарная замена"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._stage_path(stage)
+        tmp_path = path.with_suffix('.tmp')
+        joblib.dump(value, tmp_path)
+        os.replace(tmp_path, path)
+        
+        if stage not in self.manifest['stages']:
+            self.manifest['stages'].append(stage)
+        self.manifest['updated'] = datetime.now().isoformat(timespec='seconds')
+        self._write_manifest()
+        logger.info(f"💾 Чекпоинт этапа '{stage}' сохранен")
+    
+    def stage(self, stage, compute):
+        """Значение этапа из чекпоинта или вычисленное compute() и сохраненное"""
+        if self.has(stage):
+            return self.load(stage)
+        value = compute()
+        self.save(stage, value)
+        return value
+    
+    def clear(self):
+        """Удаление чекпоинтов этого запуска (подкаталог run_key)"""
+        if self.directory.exists():
+            shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def _stage_path(self, stage):
+        return self.directory / f'{stage}.joblib'
+    
+    def _read_manifest(self):
+        try:
+            with open(self.directory / MANIFEST_FILE, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+    
+    def _write_manifest(self):
+        tmp_path = self.directory / (MANIFEST_FILE + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.directory / MANIFEST_FILE)
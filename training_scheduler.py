@@ -0,0 +1,163 @@
+# training_scheduler.py
+"""
+Планировщик независимых единиц обучения (поиски по моделям, фолды CV, модели по группам)
+
+Задачи выполняются на пуле процессов joblib (loky) или на любом другом
+зарегистрированном бэкенде joblib - например, 'dask' для кластера из нескольких
+машин. Ядра делятся между воркерами через бюджет параллелизма, а задачи
+раздаются от самых дорогих к дешевым, чтобы воркеры заканчивали одновременно.
+"""
+
+import os
+import time
+from contextlib import nullcontext
+from joblib import Parallel, delayed, parallel_config
+from threadpoolctl import threadpool_limits
+import logging
+
+from config import ML_CONFIG
+from parallelism import configure_parallelism, get_parallelism_budget
+
+logger = logging.getLogger(__name__)
+
+def _run_task(func, args, kwargs, n_threads, isolate):
+    """Выполнение задачи в воркере с бюджетом потоков воркера"""
+    if isolate:
+        # Отдельный процесс: модели внутри задачи берут ровно n_threads потоков
+        budget = configure_parallelism(n_cores=n_threads)
+        for arg in args:
+            if hasattr(arg, 'get_params'):
+                budget.configure_estimator(arg, n_threads)
+    start = time.time()
+    with threadpool_limits(limits=n_threads):
+        result = func(*args, **kwargs)
+    return result, time.time() - start, os.getpid()
+
+class TrainingScheduler:
+    """Параллельное выполнение независимых задач обучения
+    
+    backend - имя бэкенда joblib ('loky' - локальные процессы, 'threading',
+    'dask' и другие зарегистрированные через joblib.register_parallel_backend).
+    n_workers - число воркеров (по умолчанию - ядра бюджета параллелизма для
+    локальных бэкендов). threads_per_worker - потоки на воркер (по умолчанию -
+    ядра, поделенные между воркерами).
+    """
+    
+    def __init__(self, backend=None, n_workers=None, threads_per_worker=None):
+        settings = ML_CONFIG.get('scheduler', {})
+        self.backend = backend or settings.get('backend', 'loky')
+        self.n_workers = n_workers or settings.get('n_workers')
+        self.threads_per_worker = threads_per_worker or settings.get('threads_per_worker')
+        self.tasks = []
+        self.timings_ = {}
+        self._client = None
+    
+    def submit(self, name, func, *args, cost=1.0, min_threads=1, **kwargs):
+        """Добавление задачи: cost - относительная оценка времени, min_threads - минимум потоков"""
+        self.tasks.append({'name': name, 'func': func, 'args': args, 'kwargs': kwargs,
+                           'cost': cost, 'min_threads': min_threads})
+        return self
+    
+    def placement(self):
+        """Число воркеров и потоков на воркер для текущих задач"""
+        n_cores = get_parallelism_budget().n_cores
+        min_threads = max([task['min_threads'] for task in self.tasks] or [1])
+        
+        n_workers = self.n_workers or max(1, n_cores // min_threads)
+        n_workers = max(1, min(n_workers, len(self.tasks)))
+        threads = self.threads_per_worker or max(min_threads, n_cores // n_workers)
+        return n_workers, threads
+    
+    def run(self, callback=None):
+        """Выполнение всех задач; callback(name, result) вызывается по мере готовности
+        
+        Возвращает словарь {имя задачи: результат}; время и процесс каждой задачи - в timings_.
+        """
+        if not self.tasks:
+            return {}
+        
+        # Самые дорогие задачи первыми: воркеры заканчивают примерно одновременно
+        tasks = sorted(self.tasks, key=lambda task: task['cost'], reverse=True)
+        self.tasks = []
+        n_workers, threads = self.placement()
+        start = time.time()
+        results = {}
+        
+        with self._backend_config(n_workers, threads):
+            for task, (result, elapsed, worker) in zip(tasks, self._execute(tasks, n_workers, threads)):
+                self.timings_[task['name']] = {'seconds': elapsed, 'worker': worker}
+                results[task['name']] = result
+                if callback is not None:
+                    callback(task['name'], result)
+        
+        logger.info(f"✅ Планировщик: {len(tasks)} задач за {time.time() - start:.1f} с")
+        return results
+    
+    def _execute(self, tasks, n_workers, threads):
+        """Результаты задач (результат, секунды, процесс) в порядке задач"""
+        if n_workers == 1:
+            # Один воркер - без пула процессов и копирования данных
+            for task in tasks:
+                yield _run_task(task['func'], task['args'], task['kwargs'], threads, isolate=False)
+            return
+        
+        logger.info(f"🗂️ Планировщик: {len(tasks)} задач, {n_workers} воркеров × {threads} потоков "
+                    f"({self.backend})")
+        isolate = self.backend != 'threading'
+        yield from Parallel(n_jobs=n_workers, return_as='generator')(
+            delayed(_run_task)(task['func'], task['args'], task['kwargs'], threads, isolate)
+            for task in tasks
+        )
+    
+    def _backend_config(self, n_workers, threads):
+        """Настройка бэкенда joblib на время выполнения задач"""
+        if n_workers == 1:
+            return nullcontext()
+        self._connect()
+        if self.backend == 'loky':
+            return parallel_config(backend='loky', n_jobs=n_workers, inner_max_num_threads=threads)
+        return parallel_config(backend=self.backend, n_jobs=n_workers)
+    
+    def _connect(self):
+        """Подключение к кластеру dask, если задан адрес планировщика"""
+        address = ML_CONFIG.get('scheduler', {}).get('scheduler_address')
+        if self.backend != 'dask' or not address or self._client is not None:
+            return
+        try:
+            from dask.distributed import Client
+            self._client = Client(address)
+            logger.info(f"🌐 Подключение к кластеру dask: {address}")
+        except ImportError:
+            logger.warning("⚠️ dask.distributed не установлен, используется локальный пул процессов")
+            self.backend = 'loky'
+
+def benchmark_scheduler(X=None, y=None, worker_counts=None, random_state=42):
+    """Время обучения трех базовых моделей ансамбля при разном числе воркеров
+    
+    Возвращает словарь {число воркеров: секунды}.
+    """
+    from sklearn.datasets import make_classification
+    from advanced_models import AdvancedEmploymentClassifier
+    
+    if X is None or y is None:
+        X, y = make_classification(n_samples=20000, n_features=23, n_informative=10,
+                                   random_state=random_state)
+    n_cores = get_parallelism_budget().n_cores
+    worker_counts = worker_counts or sorted({1, min(2, n_cores), min(3, n_cores)})
+    
+    results = {}
+    for n_workers in worker_counts:
+        scheduler = TrainingScheduler(n_workers=n_workers)
+        for model_type in ['xgboost', 'lightgbm', 'random_forest']:
+            model = AdvancedEmploymentClassifier(model_type, random_state)
+            scheduler.submit(model_type, model.fit, X, y, optimize_hyperparams=False, calibrate=False)
+        start = time.time()
+        scheduler.run()
+        results[n_workers] = time.time() - start
+        logger.info(f"🏁 {n_workers} воркеров: {results[n_workers]:.1f} с, "
+                    f"ускорение x{results[worker_counts[0]] / results[n_workers]:.2f}")
+    return results
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(benchmark_scheduler())